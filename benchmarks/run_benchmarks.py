@@ -0,0 +1,406 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Benchmarks of circuit, operator and expression conversions.
+
+Every benchmark converts a parametrized workload and records its throughput (items
+converted per second, taking the best of several runs) and peak memory allocated
+during a single conversion, as measured by tracemalloc. Memory allocated by
+pyquil's native extension is not visible to tracemalloc.
+
+Benchmarks don't need network access. Examples:
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --filter export --output results.json
+    python benchmarks/run_benchmarks.py --scale full --compare results.json
+
+With `--compare`, results are compared to a previously saved run, and the script
+exits with non-zero code if any benchmark regressed by more than `--tolerance`.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from importlib.metadata import version
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+import workloads
+
+from orquestra.integrations.forest.conversions import (
+    apply_pauli_operator,
+    exponentiate_to_pyquil,
+    export_to_pyquil,
+    group_qubitwise_commuting,
+    import_from_pyquil,
+    iter_orq_to_pyquil,
+    orq_to_pyquil,
+    pauli_to_sparse,
+    pyquil_to_orq,
+)
+from orquestra.integrations.forest.conversions._expressions import (
+    expression_from_pyquil,
+)
+from orquestra.integrations.forest.simulation import simulate_wavefunctions
+
+# Prepared benchmark: function to measure and the number of items it converts.
+Prepared = Tuple[Callable[[], Any], int]
+
+
+class Benchmark(NamedTuple):
+    name: str
+    params: Dict[str, int]
+    item: str
+    prepare: Callable[..., Prepared]
+
+    @property
+    def id(self) -> str:
+        params = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{params}]"
+
+
+@dataclass
+class Result:
+    id: str
+    item: str
+    n_items: int
+    seconds: float
+    items_per_second: float
+    peak_memory_bytes: int
+
+
+def _export(circuit_factory):
+    def _prepare(**params) -> Prepared:
+        circuit = circuit_factory(**params)
+        return lambda: export_to_pyquil(circuit), len(circuit.operations)
+
+    return _prepare
+
+
+def _import(circuit_factory):
+    def _prepare(**params) -> Prepared:
+        circuit = circuit_factory(**params)
+        program = export_to_pyquil(circuit)
+        return lambda: import_from_pyquil(program), len(circuit.operations)
+
+    return _prepare
+
+
+def _prepare_orq_to_pyquil(n_terms: int) -> Prepared:
+    operator = workloads.hamiltonian(n_terms)
+    return lambda: orq_to_pyquil(operator), n_terms
+
+
+def _prepare_pyquil_to_orq(n_terms: int) -> Prepared:
+    operator = orq_to_pyquil(workloads.hamiltonian(n_terms))
+    return lambda: pyquil_to_orq(operator), n_terms
+
+
+def _prepare_iter_orq_to_pyquil(n_terms: int) -> Prepared:
+    # Terms are generated while they're converted, so that peak memory shows that
+    # only a single chunk is kept in memory, regardless of the number of terms.
+    def _convert():
+        for _ in iter_orq_to_pyquil(workloads.hamiltonian_terms(n_terms)):
+            pass
+
+    return _convert, n_terms
+
+
+def _prepare_group_qubitwise_commuting(n_terms: int) -> Prepared:
+    operator = workloads.hamiltonian(n_terms)
+    return lambda: group_qubitwise_commuting(operator), n_terms
+
+
+def _prepare_exponentiate_to_pyquil(n_terms: int, steps: int, order: int) -> Prepared:
+    operator = workloads.hamiltonian(n_terms)
+    return (
+        lambda: exponentiate_to_pyquil(operator, 0.1, steps, order),
+        n_terms * steps * order,
+    )
+
+
+def _prepare_pauli_to_sparse(n_terms: int, n_qubits: int) -> Prepared:
+    operator = workloads.hamiltonian(n_terms, n_qubits)
+    return lambda: pauli_to_sparse(operator), n_terms
+
+
+def _prepare_apply_pauli_operator(n_terms: int, n_qubits: int) -> Prepared:
+    operator = workloads.hamiltonian(n_terms, n_qubits)
+    state = np.full(2**n_qubits, 2 ** (-n_qubits / 2), dtype=complex)
+    return lambda: apply_pauli_operator(operator, state), n_terms
+
+
+def _prepare_expression_from_pyquil(n_expressions: int, depth: int) -> Prepared:
+    expressions = workloads.pyquil_expressions(n_expressions, depth)
+    return lambda: [expression_from_pyquil(expr) for expr in expressions], len(
+        expressions
+    )
+
+
+def _prepare_simulate_wavefunctions(
+    n_qubits: int, n_layers: int, batch_size: int
+) -> Prepared:
+    circuit = workloads.qaoa_circuit(n_qubits, n_layers)
+    program = export_to_pyquil(circuit)
+    rng = np.random.default_rng(0)
+    memory_maps = [
+        {str(symbol): [rng.uniform(0, np.pi)] for symbol in circuit.free_symbols}
+        for _ in range(batch_size)
+    ]
+    return (
+        lambda: simulate_wavefunctions(program, memory_maps),
+        len(circuit.operations) * batch_size,
+    )
+
+
+_CIRCUIT_WORKLOADS = {
+    "trotter": (workloads.trotter_circuit, {"n_qubits": 20, "n_steps": 20}),
+    "qaoa": (workloads.qaoa_circuit, {"n_qubits": 20, "n_layers": 10}),
+    "custom_gates": (
+        workloads.custom_gate_circuit,
+        {"n_ops": 5000, "n_defs": 50, "n_qubits": 16},
+    ),
+    "nested_modifiers": (
+        workloads.nested_modifiers_circuit,
+        {"n_ops": 1000, "depth": 6},
+    ),
+}
+
+# Sizing parameter of each circuit workload scaled up in the full benchmark run.
+_CIRCUIT_SIZE_PARAMS = {
+    "trotter": "n_steps",
+    "qaoa": "n_layers",
+    "custom_gates": "n_ops",
+    "nested_modifiers": "n_ops",
+}
+
+_HAMILTONIAN_SIZES = {"small": [10**3], "full": [10**3, 10**4, 10**5, 10**6]}
+
+_GROUPING_SIZES = {"small": [10**3], "full": [10**3, 10**4, 10**5]}
+
+_SCALE_FACTORS = {"small": 1, "full": 10}
+
+_SIMULATION_QUBITS = {"small": 12, "full": 20}
+
+_PAULI_MATRIX_QUBITS = {"small": 12, "full": 16}
+
+
+def benchmarks(scale: str) -> Iterator[Benchmark]:
+    for workload, (factory, params) in _CIRCUIT_WORKLOADS.items():
+        size_param = _CIRCUIT_SIZE_PARAMS[workload]
+        scaled_params = {
+            **params,
+            size_param: params[size_param] * _SCALE_FACTORS[scale],
+        }
+        yield Benchmark(
+            f"export_to_pyquil.{workload}", scaled_params, "op", _export(factory)
+        )
+        yield Benchmark(
+            f"import_from_pyquil.{workload}", scaled_params, "op", _import(factory)
+        )
+
+    for n_terms in _HAMILTONIAN_SIZES[scale]:
+        yield Benchmark(
+            "orq_to_pyquil", {"n_terms": n_terms}, "term", _prepare_orq_to_pyquil
+        )
+        yield Benchmark(
+            "pyquil_to_orq", {"n_terms": n_terms}, "term", _prepare_pyquil_to_orq
+        )
+        yield Benchmark(
+            "iter_orq_to_pyquil",
+            {"n_terms": n_terms},
+            "term",
+            _prepare_iter_orq_to_pyquil,
+        )
+
+    for n_terms in _GROUPING_SIZES[scale]:
+        yield Benchmark(
+            "group_qubitwise_commuting",
+            {"n_terms": n_terms},
+            "term",
+            _prepare_group_qubitwise_commuting,
+        )
+
+    for n_terms in _GROUPING_SIZES[scale]:
+        yield Benchmark(
+            "exponentiate_to_pyquil",
+            {"n_terms": n_terms, "steps": 2, "order": 2},
+            "term",
+            _prepare_exponentiate_to_pyquil,
+        )
+
+    pauli_matrix_params = {"n_terms": 100, "n_qubits": _PAULI_MATRIX_QUBITS[scale]}
+    yield Benchmark(
+        "pauli_to_sparse", pauli_matrix_params, "term", _prepare_pauli_to_sparse
+    )
+    yield Benchmark(
+        "apply_pauli_operator",
+        pauli_matrix_params,
+        "term",
+        _prepare_apply_pauli_operator,
+    )
+
+    yield Benchmark(
+        "simulate_wavefunctions.qaoa",
+        {"n_qubits": _SIMULATION_QUBITS[scale], "n_layers": 4, "batch_size": 8},
+        "gate",
+        _prepare_simulate_wavefunctions,
+    )
+
+    yield Benchmark(
+        "expression_from_pyquil",
+        {"n_expressions": 1000 * _SCALE_FACTORS[scale], "depth": 6},
+        "expression",
+        _prepare_expression_from_pyquil,
+    )
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+
+def _best_time(fn: Callable[[], Any], repeat: int, min_total_time: float) -> float:
+    # Slow benchmarks are run fewer times, once they took `min_total_time` in total,
+    # but every benchmark is measured at least once.
+    times: List[float] = []
+    while not times or (len(times) < repeat and sum(times) < min_total_time):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _peak_memory(fn: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(benchmark: Benchmark, repeat: int, min_total_time: float) -> Result:
+    fn, n_items = benchmark.prepare(**benchmark.params)
+    # The first call warms up caches that persist between conversions.
+    fn()
+    seconds = _best_time(fn, repeat, min_total_time)
+    return Result(
+        id=benchmark.id,
+        item=benchmark.item,
+        n_items=n_items,
+        seconds=seconds,
+        items_per_second=n_items / seconds,
+        peak_memory_bytes=_peak_memory(fn),
+    )
+
+
+def _environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **{
+            package: version(package)
+            for package in ("orquestra-forest", "orquestra-quantum", "pyquil")
+        },
+    }
+
+
+def _format_result(result: Result) -> str:
+    return (
+        f"{result.id:<66} {result.items_per_second:>12,.0f} {result.item + '/s':<12}"
+        f"{result.peak_memory_bytes / 2**20:>10.2f} MiB"
+    )
+
+
+def _regressions(
+    results: List[Result], baseline: Dict[str, Dict[str, Any]], tolerance: float
+) -> List[str]:
+    regressions = []
+    for result in results:
+        if result.id not in baseline:
+            continue
+        base = baseline[result.id]
+        speed_ratio = result.items_per_second / base["items_per_second"]
+        memory_ratio = result.peak_memory_bytes / max(base["peak_memory_bytes"], 1)
+        print(
+            f"{result.id:<66} throughput x{speed_ratio:.2f}, "
+            f"peak memory x{memory_ratio:.2f}"
+        )
+        if speed_ratio < 1 - tolerance or memory_ratio > 1 + tolerance:
+            regressions.append(result.id)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scale",
+        choices=sorted(_SCALE_FACTORS),
+        default="small",
+        help="size of workloads; 'full' includes Hamiltonians of up to 10^6 terms",
+    )
+    parser.add_argument(
+        "--filter", default="", help="run only benchmarks with this in their id"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=_positive_int,
+        default=10,
+        help="maximum number of times each benchmark is run, at least 1",
+    )
+    parser.add_argument(
+        "--min-total-time",
+        type=float,
+        default=5.0,
+        help="stop repeating a benchmark after this many seconds",
+    )
+    parser.add_argument("--output", help="save results to this JSON file")
+    parser.add_argument("--compare", help="JSON file with results to compare to")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="relative slowdown or memory growth reported as regression",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for benchmark in benchmarks(args.scale):
+        if args.filter in benchmark.id:
+            result = run(benchmark, args.repeat, args.min_total_time)
+            print(_format_result(result), flush=True)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "environment": _environment(),
+                    "results": [asdict(result) for result in results],
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {result["id"]: result for result in json.load(f)["results"]}
+        regressions = _regressions(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Generators of deterministic workloads used by the conversion benchmarks."""
+from typing import Iterator
+
+import numpy as np
+import pyquil
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+from orquestra.quantum.operators import PauliSum, PauliTerm
+from pyquil import quilatom
+
+
+def trotter_circuit(n_qubits: int, n_steps: int) -> _circuit.Circuit:
+    """Trotterized evolution under a Heisenberg-like chain, with numeric angles."""
+    rng = np.random.default_rng(0)
+    ops = []
+    for _ in range(n_steps):
+        for i in range(n_qubits - 1):
+            ops.append(_builtin_gates.CNOT(i, i + 1))
+            ops.append(_builtin_gates.RZ(float(rng.uniform(0, np.pi)))(i + 1))
+            ops.append(_builtin_gates.CNOT(i, i + 1))
+        for i in range(n_qubits):
+            ops.append(_builtin_gates.RX(float(rng.uniform(0, np.pi)))(i))
+    return _circuit.Circuit(ops)
+
+
+def qaoa_circuit(n_qubits: int, n_layers: int) -> _circuit.Circuit:
+    """QAOA ansatz for MaxCut on a ring, with symbolic parameters in every layer."""
+    ops = [_builtin_gates.RY(np.pi / 2)(i) for i in range(n_qubits)]
+    for layer in range(n_layers):
+        gamma = sympy.Symbol(f"gamma_{layer}")
+        beta = sympy.Symbol(f"beta_{layer}")
+        for i in range(n_qubits):
+            ops.append(_builtin_gates.ZZ(2 * gamma)(i, (i + 1) % n_qubits))
+        for i in range(n_qubits):
+            ops.append(_builtin_gates.RX(2 * beta)(i))
+    return _circuit.Circuit(ops)
+
+
+def _rotation_gate_defs(n_defs: int):
+    theta = sympy.Symbol("theta")
+    return [
+        _gates.CustomGateDefinition(
+            gate_name=f"CUSTOM_{i}",
+            matrix=sympy.Matrix(
+                [
+                    [sympy.cos(theta), -sympy.sin(theta)],
+                    [sympy.sin(theta), sympy.cos(theta)],
+                ]
+            ),
+            params_ordering=(theta,),
+        )
+        for i in range(n_defs)
+    ]
+
+
+def custom_gate_circuit(n_ops: int, n_defs: int, n_qubits: int) -> _circuit.Circuit:
+    """Circuit made mostly of custom gates, interleaved with some CNOTs."""
+    rng = np.random.default_rng(0)
+    gate_defs = _rotation_gate_defs(n_defs)
+    ops = []
+    for i in range(n_ops):
+        qubit = int(rng.integers(n_qubits))
+        if i % 10 == 0:
+            ops.append(_builtin_gates.CNOT(qubit, (qubit + 1) % n_qubits))
+        else:
+            gate_def = gate_defs[int(rng.integers(n_defs))]
+            ops.append(gate_def(float(rng.uniform(0, np.pi)))(qubit))
+    return _circuit.Circuit(ops)
+
+
+def nested_modifiers_circuit(n_ops: int, depth: int) -> _circuit.Circuit:
+    """Circuit of gates wrapped alternately in `depth` controls and daggers."""
+    rng = np.random.default_rng(0)
+    n_qubits = depth + 1
+    ops = []
+    for _ in range(n_ops):
+        gate = _builtin_gates.RY(float(rng.uniform(0, np.pi)))
+        n_controls = 0
+        for level in range(depth):
+            if level % 2 == 0:
+                gate = gate.controlled(1)
+                n_controls += 1
+            else:
+                gate = gate.dagger
+        ops.append(gate(*range(n_controls + 1)))
+    return _circuit.Circuit(ops, n_qubits)
+
+
+def hamiltonian(n_terms: int, n_qubits: int = 30, locality: int = 4) -> PauliSum:
+    """Random Hamiltonian with `n_terms` Pauli terms acting on `locality` qubits."""
+    rng = np.random.default_rng(0)
+    qubits = np.argsort(rng.random((n_terms, n_qubits)), axis=1)[:, :locality]
+    ops = rng.integers(3, size=(n_terms, locality))
+    coefficients = rng.normal(size=n_terms)
+    return PauliSum(
+        [
+            PauliTerm(
+                {int(q): "XYZ"[op] for q, op in zip(term_qubits, term_ops)},
+                float(coefficient),
+            )
+            for term_qubits, term_ops, coefficient in zip(qubits, ops, coefficients)
+        ]
+    )
+
+
+def hamiltonian_terms(
+    n_terms: int, n_qubits: int = 30, locality: int = 4, block_size: int = 10000
+) -> Iterator[PauliTerm]:
+    """Terms of a random Hamiltonian, generated lazily in blocks of `block_size`."""
+    rng = np.random.default_rng(0)
+    for start in range(0, n_terms, block_size):
+        size = min(block_size, n_terms - start)
+        qubits = np.argsort(rng.random((size, n_qubits)), axis=1)[:, :locality]
+        ops = rng.integers(3, size=(size, locality))
+        coefficients = rng.normal(size=size)
+        for term_qubits, term_ops, coefficient in zip(qubits, ops, coefficients):
+            yield PauliTerm(
+                {int(q): "XYZ"[op] for q, op in zip(term_qubits, term_ops)},
+                float(coefficient),
+            )
+
+
+def pyquil_expressions(n_expressions: int, depth: int):
+    """Nested pyquil expressions, like the ones found in parametrized programs."""
+    params = [pyquil.quil.Parameter(f"theta_{i}") for i in range(8)]
+    expressions = []
+    for i in range(n_expressions):
+        expression = params[i % len(params)]
+        for level in range(depth):
+            if level % 3 == 0:
+                expression = quilatom.quil_cos(expression) * (i + 1)
+            elif level % 3 == 1:
+                expression = expression + params[(i + level) % len(params)]
+            else:
+                expression = expression / 2.0
+        expressions.append(expression)
+    return expressions
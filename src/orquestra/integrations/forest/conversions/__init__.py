@@ -1,5 +1,53 @@
 ################################################################################
 # © Copyright 2021-2022 Zapata Computing Inc.
 ################################################################################
-from ._circuit_conversions import export_to_pyquil, import_from_pyquil
-from ._pauli_conversions import orq_to_pyquil, pyquil_to_orq
+from ._circuit_conversions import (
+    LazyCircuit,
+    clear_expression_cache,
+    clear_gate_definition_cache,
+    export_many_to_pyquil,
+    export_to_pyquil,
+    expression_cache_info,
+    import_from_pyquil,
+    prewarm_gate_definitions,
+    profile_conversions,
+    resize_expression_cache,
+)
+from ._columns import (
+    CircuitColumns,
+    GateKind,
+    circuit_to_columns,
+    columns_to_pyquil,
+    pyquil_to_columns,
+)
+from ._conversion_cache import ConversionCache, ConversionCacheInfo
+from ._disk_cache import DiskConversionCache, DiskConversionCacheInfo
+from ._exponentiation import exponentiate_to_pyquil
+from ._measurement import (
+    MeasurementGroup,
+    group_qubitwise_commuting,
+    measurement_groups,
+)
+from ._parallel import convert_many
+from ._parametric_template import ParametricTemplate, export_parametric_template
+from ._pauli_conversions import (
+    SymplecticPauliSum,
+    orq_to_pyquil,
+    orq_to_symplectic,
+    pyquil_to_orq,
+    pyquil_to_symplectic,
+    symplectic_to_orq,
+    symplectic_to_pyquil,
+)
+from ._pauli_matrices import apply_pauli_operator, pauli_to_sparse
+from ._pauli_streaming import iter_orq_to_pyquil, iter_pyquil_to_orq
+from ._peephole import PeepholeResult, peephole_optimize
+from ._profiling import CacheStats, ConversionProfile, StageStats
+from ._qubit_mapping import (
+    CompactedCircuit,
+    QubitMapping,
+    compact_circuit,
+    expand_circuit,
+)
+from ._quil_file import import_from_quil_file, iter_operations_from_quil_file
+from ._quil_text import export_to_quil_string, write_quil
@@ -1,20 +1,48 @@
 ################################################################################
 # © Copyright 2021-2022 Zapata Computing Inc.
 ################################################################################
-from functools import singledispatch
-from typing import Iterable, Mapping, Tuple, Union
+import inspect
+import operator
+from contextlib import contextmanager
+from functools import partial, singledispatch
+from numbers import Number
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    overload,
+)
 
 import numpy as np
 import pyquil
 import sympy
 from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+from orquestra.quantum.circuits._operations import get_free_symbols
 from orquestra.quantum.circuits.symbolic.sympy_expressions import (
     SYMPY_DIALECT,
     expression_from_sympy,
 )
 from orquestra.quantum.circuits.symbolic.translations import translate_expression
+from pyquil.quilatom import _convert_to_rs_expression
+
+from ._expression_cache import CacheInfo, ExpressionCache
+from ._expressions import QUIL_DIALECT, expression_from_pyquil, pyquil_expression_key
+from ._peephole import peephole_optimize
+from ._profiling import CacheStats, ConversionProfile, count, recording, stage
+from ._qubit_mapping import QubitMapping, compact_circuit, expand_circuit
 
-from ._expressions import QUIL_DIALECT, expression_from_pyquil
+if TYPE_CHECKING:
+    from ._conversion_cache import ConversionCache
+    from ._disk_cache import DiskConversionCache
 
 
 def _n_qubits_by_ops(ops: Iterable[_gates.GateOperation]):
@@ -24,25 +52,206 @@ def _n_qubits_by_ops(ops: Iterable[_gates.GateOperation]):
         return 0
 
 
+def _translate_expression_from_pyquil(pyquil_expr):
+    with stage("expression.import"):
+        return translate_expression(expression_from_pyquil(pyquil_expr), SYMPY_DIALECT)
+
+
+def _translate_expression_to_pyquil(expr: sympy.Expr):
+    with stage("expression.export"):
+        return translate_expression(expression_from_sympy(expr), QUIL_DIALECT)
+
+
+def _sympy_expression_key(expr: sympy.Expr):
+    # Type is part of the key because e.g. sympy.Float(1.0) == sympy.Integer(1).
+    return (type(expr), expr)
+
+
+_IMPORT_EXPRESSION_CACHE = ExpressionCache(
+    _translate_expression_from_pyquil, key=pyquil_expression_key
+)
+_EXPORT_EXPRESSION_CACHE = ExpressionCache(
+    _translate_expression_to_pyquil, key=_sympy_expression_key
+)
+
+
 def _import_expression(pyquil_expr):
-    return translate_expression(expression_from_pyquil(pyquil_expr), SYMPY_DIALECT)
+    # Fast paths for the most common parameters, skipping translation altogether.
+    if isinstance(pyquil_expr, Number):
+        return pyquil_expr
+    if isinstance(pyquil_expr, pyquil.quil.Parameter):
+        return sympy.Symbol(pyquil_expr.name)
+    return _IMPORT_EXPRESSION_CACHE(pyquil_expr)
 
 
 def _export_expression(expr: sympy.Expr):
-    return translate_expression(expression_from_sympy(expr), QUIL_DIALECT)
+    # Fast paths for the most common parameters, skipping translation altogether.
+    # Note that sympy numbers are also instances of Number, hence they are
+    # checked first.
+    if isinstance(expr, sympy.Symbol):
+        return pyquil.quil.Parameter(str(expr))
+    if isinstance(expr, sympy.Integer):
+        return int(expr)
+    if isinstance(expr, (sympy.Float, sympy.Rational)):
+        return float(expr)
+    if isinstance(expr, Number) and not isinstance(expr, sympy.Basic):
+        return expr
+    return _EXPORT_EXPRESSION_CACHE(expr)
+
+
+def _translate_expression_to_quil_text(expr: sympy.Expr) -> str:
+    # Going through the same conversion pyquil uses when constructing gates
+    # guarantees the text is the same as in the output of `pyquil.Program.out()`.
+    with stage("expression.quil_text"):
+        return _convert_to_rs_expression(_export_expression(expr)).to_quil()
+
+
+_QUIL_TEXT_EXPRESSION_CACHE = ExpressionCache(
+    _translate_expression_to_quil_text, key=_sympy_expression_key
+)
+
+
+def _export_expression_as_quil_text(expr: sympy.Expr) -> str:
+    return _QUIL_TEXT_EXPRESSION_CACHE(expr)
+
+
+def expression_cache_info() -> Dict[str, CacheInfo]:
+    """Statistics of caches used for translating gate parameters and matrix elements.
+
+    Returns:
+        Dictionary with "import", "export" and "quil_text" keys, mapping to the
+        statistics of the cache used by `import_from_pyquil`, `export_to_pyquil` and
+        `export_to_quil_string`, respectively.
+    """
+    return {
+        "import": _IMPORT_EXPRESSION_CACHE.cache_info(),
+        "export": _EXPORT_EXPRESSION_CACHE.cache_info(),
+        "quil_text": _QUIL_TEXT_EXPRESSION_CACHE.cache_info(),
+    }
+
+
+@contextmanager
+def profile_conversions() -> Iterator[ConversionProfile]:
+    """Record statistics of conversions executed within the context.
+
+    Recorded stages of `export_to_pyquil` (and other exports to pyquil programs)
+    are "export.declarations", "export.gate_definitions", "export.gates" and
+    "export.program". Stages of `import_from_pyquil` are "import.gate_definitions",
+    "import.gates" and "import.circuit". Translations of expressions that missed the
+    cache are recorded as "expression.import", "expression.export" and
+    "expression.quil_text".
+
+    Stages are recorded only in the thread (or asyncio task) that entered the
+    context. Cache statistics, however, are process-wide. Outside of this context,
+    conversions aren't instrumented.
+
+    Returns:
+        Profile which is filled in while conversions are executed, and complete
+        once the context is exited.
+    """
+    profile = ConversionProfile()
+    caches_before = expression_cache_info()
+    try:
+        with recording(profile):
+            yield profile
+    finally:
+        for name, info in expression_cache_info().items():
+            profile.caches[name] = CacheStats(
+                hits=info.hits - caches_before[name].hits,
+                misses=info.misses - caches_before[name].misses,
+            )
+
+
+def clear_expression_cache():
+    """Clear caches of translated expressions and reset their statistics."""
+    _IMPORT_EXPRESSION_CACHE.cache_clear()
+    _EXPORT_EXPRESSION_CACHE.cache_clear()
+    _QUIL_TEXT_EXPRESSION_CACHE.cache_clear()
+
+
+def resize_expression_cache(maxsize: int):
+    """Set maximal number of translated expressions kept by each of the caches.
+
+    Args:
+        maxsize: new size of the caches. Setting it to 0 disables caching.
+    """
+    _IMPORT_EXPRESSION_CACHE.resize(maxsize)
+    _EXPORT_EXPRESSION_CACHE.resize(maxsize)
+    _QUIL_TEXT_EXPRESSION_CACHE.resize(maxsize)
+
+
+def _is_numeric(elements: Iterable) -> bool:
+    return all(isinstance(element, complex) for element in elements)
+
+
+def _sympy_number_from_complex(real: float, imag: float) -> sympy.Expr:
+    # Equivalent to sympy.sympify(complex(real, imag)), including the structure of
+    # the result, but skips costly evaluation of arithmetic on sympy numbers.
+    if imag == 0:
+        return sympy.Float(real) if real != 0 else sympy.S.Zero
+    imag_part = sympy.Mul._from_args((sympy.Float(imag), sympy.I))
+    if real == 0:
+        return imag_part
+    return sympy.Add._from_args((sympy.Float(real), imag_part))
+
+
+def _import_matrix_element(element):
+    if isinstance(element, complex):
+        return _sympy_number_from_complex(element.real, element.imag)
+    return _import_expression(element)
 
 
 def _import_matrix(pyquil_matrix: np.ndarray):
+    if not _is_numeric(pyquil_matrix.flat):
+        return sympy.Matrix(
+            [
+                [_import_matrix_element(element) for element in row]
+                for row in pyquil_matrix.tolist()
+            ]
+        )
+
+    numeric_matrix = np.asarray(pyquil_matrix, dtype=complex)
     return sympy.Matrix(
         [
-            [_import_expression(element) for element in row]
-            for row in pyquil_matrix.tolist()
+            list(map(_sympy_number_from_complex, real_row, imag_row))
+            for real_row, imag_row in zip(
+                numeric_matrix.real.tolist(), numeric_matrix.imag.tolist()
+            )
         ]
     )
 
 
+def _complex_from_sympy_number(number: sympy.Expr) -> complex:
+    # Numbers of the form a + b*I are destructured directly, as evaluating them
+    # with sympy is slow. Other numbers (e.g. sqrt(2)) are evaluated by sympy.
+    if isinstance(number, sympy.Number):
+        return complex(float(number))
+    if number is sympy.I:
+        return 1j
+    args = number.args
+    if isinstance(number, sympy.Mul) and len(args) == 2 and args[1] is sympy.I:
+        if isinstance(args[0], sympy.Number):
+            return complex(0, float(args[0]))
+    if isinstance(number, sympy.Add) and len(args) == 2:
+        if isinstance(args[0], sympy.Number):
+            return float(args[0]) + _complex_from_sympy_number(args[1])
+    return complex(number)
+
+
+def _export_matrix_element(element: sympy.Expr):
+    if element.free_symbols:
+        return _export_expression(element)
+    return _complex_from_sympy_number(element)
+
+
 def _export_matrix(matrix: sympy.Matrix):
-    return [[_export_expression(element) for element in row] for row in matrix.tolist()]
+    exported = [
+        [_export_matrix_element(element) for element in row] for row in matrix.tolist()
+    ]
+    # Numeric matrices are passed to pyquil as arrays, which it handles faster.
+    if _is_numeric(element for row in exported for element in row):
+        return np.array(exported, dtype=complex)
+    return exported
 
 
 def _import_gate_def(gate_def: pyquil.quilbase.DefGate):
@@ -55,62 +264,276 @@ def _import_gate_def(gate_def: pyquil.quilbase.DefGate):
     )
 
 
-def import_from_pyquil(program: pyquil.Program):
-    custom_names = [gate_def.name for gate_def in program.defined_gates]
-    custom_defs = {
-        gate_def.name: _import_gate_def(gate_def) for gate_def in program.defined_gates
-    }
+def import_from_pyquil(
+    program: pyquil.Program,
+    lazy: bool = False,
+    cache: Optional["ConversionCache"] = None,
+    compact_qubits: bool = False,
+):
+    """Import pyquil program as orquestra circuit.
+
+    Instructions other than gates (e.g. declarations or measurements) are skipped.
+
+    Args:
+        program: program to import.
+        lazy: if True, return `LazyCircuit`, which converts operations only when they
+            are accessed.
+        cache: if given, circuits imported from programs with the same Quil text are
+            taken from this cache. Can't be combined with `lazy`.
+        compact_qubits: if True, qubits used by the program are renumbered to
+            0, 1, ..., and `CompactedCircuit` holding the circuit together with
+            mapping of its qubits to the original ones is returned. The mapping
+            can be passed to `export_to_pyquil` to restore the original qubits.
+            Can't be combined with `lazy`.
+    """
+    if lazy:
+        if cache is not None or compact_qubits:
+            raise ValueError(
+                "Lazy import can't be combined with caching or compacting qubits."
+            )
+        return LazyCircuit(program)
+    circuit = (
+        _import_program(program)
+        if cache is None
+        else cache.imported(program, _import_program)
+    )
+    return compact_circuit(circuit) if compact_qubits else circuit
+
+
+def _import_program(program: pyquil.Program) -> _circuit.Circuit:
+    with stage("import.gate_definitions"):
+        custom_names = [gate_def.name for gate_def in program.defined_gates]
+        custom_defs = {
+            gate_def.name: _import_gate_def(gate_def)
+            for gate_def in program.defined_gates
+        }
     if len(custom_names) != len(custom_defs):
         raise ValueError(
             "Can't import circuits with non-unique gate definition names to orquestra: "
             f"{custom_names}"
         )
 
-    ops = [
-        _import_gate(instr, custom_defs)
-        for instr in program.instructions
-        if isinstance(instr, pyquil.gates.Gate)
-    ]
-    return _circuit.Circuit(ops, _n_qubits_by_ops(ops))
+    with stage("import.gates"):
+        import_handlers = _import_handlers(custom_defs)
+        ops = [
+            _import_gate(instr, import_handlers)
+            for instr in program.instructions
+            if isinstance(instr, pyquil.gates.Gate)
+        ]
+    with stage("import.circuit"):
+        return _circuit.Circuit(ops, _n_qubits_by_ops(ops))
 
 
-def _import_gate(
-    instruction: pyquil.gates.Gate,
-    custom_gate_defs: Mapping[str, _gates.CustomGateDefinition],
-) -> _gates.GateOperation:
-    try:
-        return _import_gate_via_name(instruction)
-    except ValueError:
-        pass
+class _LazyGateDefinitions(Mapping[str, _gates.CustomGateDefinition]):
+    """Gate definitions of a pyquil program, imported on first access."""
 
-    try:
-        return _import_custom_gate(instruction, custom_gate_defs)
-    except ValueError:
-        pass
+    def __init__(self, pyquil_gate_defs: Mapping[str, pyquil.quilbase.DefGate]):
+        self._pyquil_gate_defs = pyquil_gate_defs
+        self._gate_defs: Dict[str, _gates.CustomGateDefinition] = {}
 
-    raise NotImplementedError(
-        f"Importing instruction {instruction} from PyQuil is unsupported."
-    )
+    def __getitem__(self, name: str) -> _gates.CustomGateDefinition:
+        try:
+            return self._gate_defs[name]
+        except KeyError:
+            gate_def = _import_gate_def(self._pyquil_gate_defs[name])
+            self._gate_defs[name] = gate_def
+            return gate_def
 
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._pyquil_gate_defs)
+
+    def __len__(self) -> int:
+        return len(self._pyquil_gate_defs)
+
+
+class _LazyOperations(Sequence[_gates.GateOperation]):
+    """Read-only sequence of operations imported from pyquil gates on first access."""
+
+    def __init__(
+        self, instructions: List[pyquil.gates.Gate], import_handlers: "_DispatchTable"
+    ):
+        self._instructions = instructions
+        self._import_handlers = import_handlers
+        self._operations: List[Optional[_gates.GateOperation]] = [None] * len(
+            instructions
+        )
+
+    def _operation(self, index: int) -> _gates.GateOperation:
+        operation = self._operations[index]
+        if operation is None:
+            operation = _import_gate(self._instructions[index], self._import_handlers)
+            self._operations[index] = operation
+        return operation
+
+    @overload
+    def __getitem__(self, index: int) -> _gates.GateOperation:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[_gates.GateOperation]:
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._operation(i) for i in range(*index.indices(len(self)))]
+        return self._operation(index)
+
+    def __iter__(self) -> Iterator[_gates.GateOperation]:
+        return map(self._operation, range(len(self)))
+
+    def __len__(self) -> int:
+        return len(self._instructions)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class LazyCircuit(_circuit.Circuit):
+    """Circuit imported from pyquil program, with operations converted on demand.
+
+    Each operation is converted from its pyquil instruction when it's accessed for
+    the first time, and then kept. `n_qubits` and `free_symbols` are computed from
+    pyquil instructions without converting them. Gate definitions are imported
+    only when the first operation using them is converted.
+
+    `operations` of this circuit are a read-only sequence. Methods creating new
+    circuits (e.g. `bind`, `inverse` or `+`) return regular `Circuit`s, and so does
+    unpickling.
+
+    Args:
+        program: pyquil program to import.
+    """
+
+    def __init__(self, program: pyquil.Program):
+        pyquil_gate_defs = {
+            gate_def.name: gate_def for gate_def in program.defined_gates
+        }
+        if len(pyquil_gate_defs) != len(program.defined_gates):
+            raise ValueError(
+                "Can't import circuits with non-unique gate definition names to "
+                f"orquestra: {[gate_def.name for gate_def in program.defined_gates]}"
+            )
+
+        self._instructions = [
+            instr
+            for instr in program.instructions
+            if isinstance(instr, pyquil.gates.Gate)
+        ]
+        # Base class keeps operations in a list, but only ever reads them.
+        self._operations = _LazyOperations(  # type: ignore[assignment]
+            self._instructions,
+            _import_handlers(_LazyGateDefinitions(pyquil_gate_defs)),
+        )
+        self._n_qubits = max(
+            (
+                index + 1
+                for instr in self._instructions
+                for index in instr.get_qubit_indices()
+            ),
+            default=0,
+        )
+
+    @property
+    def free_symbols(self) -> List[sympy.Symbol]:
+        seen_symbols = set()
+        symbols_sequence = []
+        for instr in self._instructions:
+            params = tuple(map(_import_expression, instr.params))
+            for symbol in get_free_symbols(params):
+                if symbol not in seen_symbols:
+                    seen_symbols.add(symbol)
+                    symbols_sequence.append(symbol)
+        return symbols_sequence
+
+    def to_circuit(self) -> _circuit.Circuit:
+        """Convert all operations, returning equivalent regular circuit."""
+        return _circuit.Circuit(list(self.operations), self.n_qubits)
+
+    def bind(self, symbols_map: Dict[sympy.Symbol, Any]) -> _circuit.Circuit:
+        return self.to_circuit().bind(symbols_map)
+
+    def inverse(self) -> _circuit.Circuit:
+        return self.to_circuit().inverse()
+
+    def __add__(self, other: Union[_circuit.Circuit, _gates.GateOperation]):
+        return self.to_circuit() + other
+
+    def __reduce__(self):
+        return _circuit.Circuit, (list(self.operations), self.n_qubits)
+
+
+class _DispatchTable(dict):
+    """Mapping of gate names to handlers converting gates with that name.
+
+    Handler for each name is resolved on the first lookup and stored, so that
+    finding out what kind of gate (built-in, custom, unsupported) a name refers to
+    happens once per conversion instead of once per gate.
+    """
+
+    def __init__(self, resolve_handler: Callable[[str], Callable]):
+        super().__init__()
+        self._resolve_handler = resolve_handler
+
+    def __missing__(self, name: str) -> Callable:
+        handler = self[name] = self._resolve_handler(name)
+        return handler
 
-def _ensure_is_gate(
-    gate_ref: _builtin_gates.GateRef, params: Tuple[_gates.Parameter, ...]
-) -> _gates.Gate:
-    if isinstance(gate_ref, _gates.Gate):
-        return gate_ref
-    else:
-        return gate_ref(*params)
 
+def _import_handlers(
+    custom_gate_defs: Mapping[str, _gates.CustomGateDefinition]
+) -> _DispatchTable:
+    return _DispatchTable(lambda name: _resolve_import_handler(name, custom_gate_defs))
+
+
+def _resolve_import_handler(
+    name: str, custom_gate_defs: Mapping[str, _gates.CustomGateDefinition]
+) -> Callable[[pyquil.gates.Gate], _gates.GateOperation]:
+    fallback: Callable[[pyquil.gates.Gate], _gates.GateOperation]
+    if name in custom_gate_defs:
+        fallback = partial(_import_custom_gate, custom_gate_defs[name])
+    else:
+        fallback = _import_unsupported_gate
 
-def _import_gate_via_name(gate: pyquil.gates.Gate) -> _gates.GateOperation:
     try:
-        zq_gate_ref = _builtin_gates.builtin_gate_by_name(gate.name)
+        zq_gate_ref = _builtin_gates.builtin_gate_by_name(name)
     except KeyError:
-        raise ValueError(f"Can't import {gate} as a built-in gate")
+        return fallback
+
+    # Checking against the Gate protocol inspects gate's attributes, including its
+    # matrix, so it's done once per gate name instead of once per instruction.
+    if isinstance(zq_gate_ref, _gates.Gate):
+        return partial(_import_fixed_gate, zq_gate_ref, fallback)
+    return partial(_import_parametric_gate, zq_gate_ref, fallback)
+
+
+def _import_gate(
+    instruction: pyquil.gates.Gate, import_handlers: _DispatchTable
+) -> _gates.GateOperation:
+    return import_handlers[instruction.name](instruction)
+
+
+def _import_fixed_gate(
+    zq_gate: _gates.Gate,
+    fallback: Callable[[pyquil.gates.Gate], _gates.GateOperation],
+    gate: pyquil.gates.Gate,
+) -> _gates.GateOperation:
+    return _import_modified_gate(zq_gate, fallback, gate)
 
+
+def _import_parametric_gate(
+    zq_gate_factory: Callable[..., _gates.Gate],
+    fallback: Callable[[pyquil.gates.Gate], _gates.GateOperation],
+    gate: pyquil.gates.Gate,
+) -> _gates.GateOperation:
     zq_params = tuple(map(_import_expression, gate.params))
-    zq_gate = _ensure_is_gate(zq_gate_ref, zq_params)
+    return _import_modified_gate(zq_gate_factory(*zq_params), fallback, gate)
+
 
+def _import_modified_gate(
+    zq_gate: _gates.Gate,
+    fallback: Callable[[pyquil.gates.Gate], _gates.GateOperation],
+    gate: pyquil.gates.Gate,
+) -> _gates.GateOperation:
     for modifier in gate.modifiers:
         if modifier == "DAGGER":
             zq_gate = zq_gate.dagger
@@ -120,24 +543,24 @@ def _import_gate_via_name(gate: pyquil.gates.Gate) -> _gates.GateOperation:
 
     operation = zq_gate(*all_qubits)
     if not isinstance(operation, _gates.GateOperation):
-        raise ValueError()
+        return fallback(gate)
     return operation
 
 
-def _import_custom_gate(instruction, custom_gate_defs):
-    try:
-        gate_def = custom_gate_defs[instruction.name]
-    except KeyError:
-        raise ValueError(
-            f"Custom gate definition for {instruction} is missing from custom gate "
-            f"defs {custom_gate_defs}"
-        )
-
+def _import_custom_gate(
+    gate_def: _gates.CustomGateDefinition, instruction: pyquil.gates.Gate
+) -> _gates.GateOperation:
     zq_params = tuple(map(_import_expression, instruction.params))
     zq_qubits = _import_pyquil_qubits(instruction.qubits)
     return gate_def(*zq_params)(*zq_qubits)
 
 
+def _import_unsupported_gate(instruction: pyquil.gates.Gate) -> _gates.GateOperation:
+    raise NotImplementedError(
+        f"Importing instruction {instruction} from PyQuil is unsupported."
+    )
+
+
 def _import_pyquil_qubits(qubits):
     return tuple(qubit.index for qubit in qubits)
 
@@ -150,15 +573,6 @@ def _export_orquestra_gate_definition(gate_def: _gates.CustomGateDefinition):
     )
 
 
-def _create_pyquil_custom_gate_definitions(
-    custom_gate_defs: Iterable[_gates.CustomGateDefinition],
-):
-    return {
-        gate_def.gate_name: _export_orquestra_gate_definition(gate_def)
-        for gate_def in custom_gate_defs
-    }
-
-
 @singledispatch
 def _unwrap_gate(gate: _gates.Gate):
     return gate
@@ -194,55 +608,282 @@ def _unique_by(sequence, key):
     return {key(obj): obj for obj in sequence}.values()
 
 
-def _collect_unsupported_builtin_gate_defs(gates: Iterable[_gates.Gate]):
+_ExportedGateDefinition = Tuple[
+    _gates.CustomGateDefinition, pyquil.quilbase.DefGate, Callable
+]
+
+
+def _export_gate_definition_with_constructor(
+    gate_def: _gates.CustomGateDefinition,
+) -> _ExportedGateDefinition:
+    pyquil_gate_def = _export_orquestra_gate_definition(gate_def)
+    return gate_def, pyquil_gate_def, pyquil_gate_def.get_constructor()
+
+
+# Definitions of built-in gates unsupported by pyquil, keyed by gate name and number
+# of parameters. They depend only on the gate's matrix factory, and hence are shared
+# by all conversions in the process.
+_UNSUPPORTED_BUILTIN_GATE_DEFS: Dict[Tuple[str, int], _ExportedGateDefinition] = {}
+
+
+def _unsupported_builtin_gate_definition(
+    gate: _gates.MatrixFactoryGate,
+) -> _ExportedGateDefinition:
+    key = (gate.name, len(gate.params))
+    try:
+        return _UNSUPPORTED_BUILTIN_GATE_DEFS[key]
+    except KeyError:
+        exported = _export_gate_definition_with_constructor(
+            _gate_definition_from_matrix_factory_gate(gate)
+        )
+        return _UNSUPPORTED_BUILTIN_GATE_DEFS.setdefault(key, exported)
+
+
+def _unsupported_builtin_gates() -> List[_gates.MatrixFactoryGate]:
+    gates = []
+    for name in dir(_builtin_gates):
+        if not name.isupper() or hasattr(pyquil.gates, name):
+            continue
+        gate = _builtin_gates.builtin_gate_by_name(name)
+        if callable(gate) and not isinstance(gate, _gates.Gate):
+            # Parametric gates are instantiated with as many symbols as their matrix
+            # factory accepts.
+            matrix_factory = gate().matrix_factory  # type: ignore
+            n_params = len(inspect.signature(matrix_factory).parameters)
+            gate = gate(*(sympy.Symbol(f"theta_{i}") for i in range(n_params)))
+        if isinstance(gate, _gates.MatrixFactoryGate):
+            gates.append(gate)
+    return gates
+
+
+def prewarm_gate_definitions(gates: Optional[Iterable[_gates.Gate]] = None):
+    """Precompute definitions of built-in gates that pyquil doesn't support.
+
+    Such gates (e.g. XX, ZZ or U3) are exported to pyquil as DEFGATEs. Their
+    definitions are computed symbolically on the first export and then reused by
+    all subsequent exports in the process. Prewarming moves this cost out of the
+    first export, e.g. to the start-up of an application.
+
+    Args:
+        gates: gates whose definitions should be computed. Defaults to all built-in
+            gates unsupported by pyquil. Gates supported by pyquil and custom gates
+            are skipped.
+    """
+    for gate in _unsupported_builtin_gates() if gates is None else gates:
+        gate = _unwrap_gate(gate)
+        if _is_builtin_gate(gate) and not _is_supported_by_pyquil(gate):
+            _unsupported_builtin_gate_definition(gate)
+
+
+def clear_gate_definition_cache():
+    """Clear cached definitions of built-in gates that pyquil doesn't support."""
+    _UNSUPPORTED_BUILTIN_GATE_DEFS.clear()
+
+
+class _GateDefinitionsCache:
+    """Gate definitions exported to pyquil, shared between exported circuits.
+
+    Definitions of unsupported built-in gates are keyed by gate name, because
+    built-in gate names are fixed, and they come from the process-wide cache.
+    Exported custom gate definitions are reused only if the same (or an equal)
+    definition is encountered again, since distinct circuits are free to define
+    different gates with the same name.
+    """
+
+    def __init__(self):
+        self._builtin_gate_defs: Dict[str, Optional[_gates.CustomGateDefinition]] = {}
+        self._exported_gate_defs: Dict[str, _ExportedGateDefinition] = {}
+
+    def unsupported_builtin_gate_def(
+        self, gate
+    ) -> Optional[_gates.CustomGateDefinition]:
+        try:
+            return self._builtin_gate_defs[gate.name]
+        except KeyError:
+            gate_def = None
+            if _is_builtin_gate(gate) and not _is_supported_by_pyquil(gate):
+                exported = _unsupported_builtin_gate_definition(gate)
+                gate_def = exported[0]
+                self._exported_gate_defs[gate.name] = exported
+            self._builtin_gate_defs[gate.name] = gate_def
+            return gate_def
+
+    def export(
+        self, gate_def: _gates.CustomGateDefinition
+    ) -> Tuple[pyquil.quilbase.DefGate, Callable]:
+        cached = self._exported_gate_defs.get(gate_def.gate_name)
+        if cached is not None and (cached[0] is gate_def or cached[0] == gate_def):
+            return cached[1], cached[2]
+
+        exported = _export_gate_definition_with_constructor(gate_def)
+        self._exported_gate_defs[gate_def.gate_name] = exported
+        return exported[1], exported[2]
+
+
+def _collect_custom_gate_definitions(
+    circuit: _circuit.Circuit,
+) -> List[_gates.CustomGateDefinition]:
+    # Equivalent to circuit.collect_custom_gate_definitions(), but compares matrices
+    # only of distinct definition objects. Operations of the same custom gate
+    # usually share a single definition, and comparing it with itself is expensive.
+    gate_defs: Dict[str, _gates.CustomGateDefinition] = {}
+    for op in circuit.operations:
+        gate = op.gate
+        if not isinstance(gate, _gates.MatrixFactoryGate) or not isinstance(
+            gate.matrix_factory, _gates.CustomGateMatrixFactory
+        ):
+            continue
+        gate_def = gate.matrix_factory.gate_definition
+        seen_def = gate_defs.setdefault(gate_def.gate_name, gate_def)
+        if seen_def is not gate_def and seen_def != gate_def:
+            raise ValueError(
+                "Different gate definitions with the same name exist: "
+                f"{gate_def.gate_name}."
+            )
+    return sorted(gate_defs.values(), key=operator.attrgetter("gate_name"))
+
+
+def _collect_unsupported_builtin_gate_defs(
+    gates: Iterable[_gates.Gate], gate_defs_cache: _GateDefinitionsCache
+):
     unwrapped_gates = _unique_by(map(_unwrap_gate, gates), key=lambda gate: gate.name)
     return [
-        _gate_definition_from_matrix_factory_gate(gate)
-        for gate in unwrapped_gates
-        if _is_builtin_gate(gate) and not _is_supported_by_pyquil(gate)
+        gate_def
+        for gate_def in map(
+            gate_defs_cache.unsupported_builtin_gate_def, unwrapped_gates
+        )
+        if gate_def is not None
     ]
 
 
-def export_to_pyquil(circuit: _circuit.Circuit) -> pyquil.Program:
-    var_declarations = map(_param_declaration, sorted(map(str, circuit.free_symbols)))
-    custom_gate_definitions = [
-        *circuit.collect_custom_gate_definitions(),
-        *_collect_unsupported_builtin_gate_defs([op.gate for op in circuit.operations]),
-    ]
-    pyquil_gate_definitions = _create_pyquil_custom_gate_definitions(
-        custom_gate_definitions
-    )
+def export_to_pyquil(
+    circuit: _circuit.Circuit,
+    cache: Optional[Union["ConversionCache", "DiskConversionCache"]] = None,
+    optimization_level: int = 0,
+    qubit_mapping: Optional[QubitMapping] = None,
+) -> pyquil.Program:
+    """Export orquestra circuit to pyquil program.
+
+    Args:
+        circuit: circuit to export.
+        cache: if given, programs exported from circuits with the same content are
+            taken from this cache, either in memory or on disk.
+        optimization_level: 0 exports operations as they are, 1 simplifies them
+            first with `peephole_optimize`. Number of removed operations is
+            reported as "export.peephole.removed" counter of `profile_conversions`.
+        qubit_mapping: if given, qubits of the circuit are mapped back to physical
+            qubits with it, e.g. to undo compaction done by `import_from_pyquil`.
+    """
+    if qubit_mapping is not None:
+        circuit = expand_circuit(circuit, qubit_mapping)
+    if optimization_level == 1:
+        with stage("export.peephole"):
+            circuit, n_removed = peephole_optimize(circuit)
+        count("export.peephole.removed", n_removed)
+    elif optimization_level != 0:
+        raise ValueError(
+            f"Optimization level has to be 0 or 1, got {optimization_level}."
+        )
+    if cache is not None:
+        return cache.exported(circuit, _export_single_circuit)
+    return _export_single_circuit(circuit)
+
+
+def _export_single_circuit(circuit: _circuit.Circuit) -> pyquil.Program:
+    return _export_circuit(circuit, _GateDefinitionsCache())
+
+
+def export_many_to_pyquil(
+    circuits: Iterable[_circuit.Circuit],
+) -> Iterator[pyquil.Program]:
+    """Export multiple circuits to pyquil, sharing gate definitions between them.
+
+    Gate definitions (both custom and of the built-in gates unsupported by pyquil)
+    are exported once per batch instead of once per circuit.
+
+    Args:
+        circuits: circuits to export. Can be any iterable, including a generator.
+
+    Returns:
+        Iterator lazily yielding exported programs, in the same order as circuits.
+    """
+    gate_defs_cache = _GateDefinitionsCache()
+    for circuit in circuits:
+        yield _export_circuit(circuit, gate_defs_cache)
+
+
+def _export_circuit(
+    circuit: _circuit.Circuit, gate_defs_cache: _GateDefinitionsCache
+) -> pyquil.Program:
+    with stage("export.declarations"):
+        var_declarations = list(
+            map(_param_declaration, sorted(map(str, circuit.free_symbols)))
+        )
+    with stage("export.gate_definitions"):
+        pyquil_gate_definitions, custom_gate_constructors = _export_gate_definitions(
+            circuit, gate_defs_cache
+        )
+
+    with stage("export.gates"):
+        export_handlers = _export_handlers(custom_gate_constructors)
+        gate_instructions = [
+            _export_gate(op.gate, op.qubit_indices, export_handlers)
+            for op in circuit.operations
+        ]
+    with stage("export.program"):
+        return pyquil.Program(
+            *[*var_declarations, *pyquil_gate_definitions.values(), *gate_instructions]
+        )
+
 
-    gate_instructions = [
-        _export_gate(op.gate, op.qubit_indices, pyquil_gate_definitions)
-        for op in circuit.operations
+def _export_gate_definitions(
+    circuit: _circuit.Circuit, gate_defs_cache: _GateDefinitionsCache
+) -> Tuple[Dict[str, pyquil.quilbase.DefGate], Dict[str, Callable]]:
+    custom_gate_definitions = [
+        *_collect_custom_gate_definitions(circuit),
+        *_collect_unsupported_builtin_gate_defs(
+            [op.gate for op in circuit.operations], gate_defs_cache
+        ),
     ]
-    program = pyquil.Program(
-        *[*var_declarations, *pyquil_gate_definitions.values(), *gate_instructions]
-    )
-    return program
+    pyquil_gate_definitions = {}
+    custom_gate_constructors = {}
+    for gate_def in custom_gate_definitions:
+        pyquil_gate_def, constructor = gate_defs_cache.export(gate_def)
+        pyquil_gate_definitions[gate_def.gate_name] = pyquil_gate_def
+        custom_gate_constructors[gate_def.gate_name] = constructor
+    return pyquil_gate_definitions, custom_gate_constructors
 
 
 def _param_declaration(param_name: str):
     return pyquil.quil.Declare(param_name, "REAL")
 
 
-@singledispatch
-def _export_gate(gate: _gates.Gate, qubit_indices, pyquil_gate_definitions):
+def _export_handlers(custom_gate_constructors: Mapping[str, Callable]):
+    return _DispatchTable(
+        lambda name: _resolve_export_handler(name, custom_gate_constructors)
+    )
+
+
+def _resolve_export_handler(
+    name: str, custom_gate_constructors: Mapping[str, Callable]
+) -> Callable:
     try:
-        return _export_gate_via_name(gate, qubit_indices)
-    except ValueError:
+        return partial(_export_gate_via_pyquil_fn, _pyquil_gate_by_name(name))
+    except AttributeError:
         pass
 
-    return _export_custom_gate(gate, qubit_indices, pyquil_gate_definitions)
+    try:
+        return partial(_export_custom_gate, custom_gate_constructors[name])
+    except KeyError:
+        return _export_gate_with_missing_definition
 
 
-def _export_custom_gate(gate: _gates.Gate, qubit_indices, pyquil_gate_definitions):
-    if gate.name not in pyquil_gate_definitions:
-        raise ValueError(
-            f"Can't export {gate} as custom gate, custom gate definition is missing"
-        )
-    constructor = pyquil_gate_definitions[gate.name].get_constructor()
+@singledispatch
+def _export_gate(gate: _gates.Gate, qubit_indices, export_handlers: _DispatchTable):
+    return export_handlers[gate.name](gate, qubit_indices)
+
+
+def _export_custom_gate(constructor: Callable, gate: _gates.Gate, qubit_indices):
     pyquil_params = list(map(_export_expression, gate.params))
 
     if pyquil_params:
@@ -251,32 +892,33 @@ def _export_custom_gate(gate: _gates.Gate, qubit_indices, pyquil_gate_definition
     return constructor(*qubit_indices)
 
 
+def _export_gate_with_missing_definition(gate: _gates.Gate, qubit_indices):
+    raise ValueError(
+        f"Can't export {gate} as custom gate, custom gate definition is missing"
+    )
+
+
 @_export_gate.register
 def _export_controlled_gate(
-    gate: _gates.ControlledGate, qubit_indices, custom_gate_names
+    gate: _gates.ControlledGate, qubit_indices, export_handlers: _DispatchTable
 ):
     wrapped_qubit_indices = qubit_indices[gate.num_control_qubits :]
     control_qubit_indices = qubit_indices[0 : gate.num_control_qubits]
-    exported = _export_gate(gate.wrapped_gate, wrapped_qubit_indices, custom_gate_names)
+    exported = _export_gate(gate.wrapped_gate, wrapped_qubit_indices, export_handlers)
     for index in reversed(control_qubit_indices):
         exported = exported.controlled(index)
     return exported
 
 
 @_export_gate.register
-def _export_dagger(gate: _gates.Dagger, qubit_indices, custom_gate_names):
-    return _export_gate(gate.wrapped_gate, qubit_indices, custom_gate_names).dagger()
+def _export_dagger(gate: _gates.Dagger, qubit_indices, export_handlers: _DispatchTable):
+    return _export_gate(gate.wrapped_gate, qubit_indices, export_handlers).dagger()
 
 
 def _pyquil_gate_by_name(name):
     return getattr(pyquil.gates, name)
 
 
-def _export_gate_via_name(gate: _gates.Gate, qubit_indices):
-    try:
-        pyquil_fn = _pyquil_gate_by_name(gate.name)
-    except AttributeError:
-        raise ValueError(f"Can't export {gate} to PyQuil as a built-in gate")
-
+def _export_gate_via_pyquil_fn(pyquil_fn: Callable, gate: _gates.Gate, qubit_indices):
     pyquil_params = map(_export_expression, gate.params)
     return pyquil_fn(*pyquil_params, *qubit_indices)
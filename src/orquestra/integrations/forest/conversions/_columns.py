@@ -0,0 +1,350 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Columnar representation of circuits, backed by NumPy arrays.
+
+Instead of one object per gate operation, a circuit is stored as a few flat arrays:
+ids of gate kinds (interned in a small table), qubit indices and numeric gate
+parameters. Since operations can act on different numbers of qubits and take
+different numbers of parameters, qubits and parameters of the i-th operation are
+`qubits[qubit_offsets[i]:qubit_offsets[i + 1]]` and
+`params[param_offsets[i]:param_offsets[i + 1]]`, respectively. Parameters that
+aren't real numbers (e.g. symbolic expressions) are kept in a side table, and
+their entries in `params` are NaN.
+"""
+from dataclasses import dataclass
+from numbers import Real
+from typing import Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+import pyquil
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from ._circuit_conversions import (
+    _collect_custom_gate_definitions,
+    _export_expression,
+    _GateDefinitionsCache,
+    _import_expression,
+    _import_gate_def,
+    _param_declaration,
+    _pyquil_gate_by_name,
+)
+
+CONTROLLED = "CONTROLLED"
+DAGGER = "DAGGER"
+
+
+class GateKind(NamedTuple):
+    """Gate name together with modifiers applied to it.
+
+    Modifiers are ordered from the outermost one, like in Quil. Every "CONTROLLED"
+    modifier adds a single control qubit.
+    """
+
+    name: str
+    modifiers: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, eq=False)
+class CircuitColumns:
+    """Circuit stored as columns of its operations. See module docstring for layout.
+
+    Args:
+        gate_kinds: table of distinct gate kinds used in the circuit.
+        gate_ids: index into `gate_kinds` of every operation.
+        qubit_offsets: start of qubits of every operation in `qubits`, followed by
+            the total number of qubit indices.
+        qubits: qubit indices of all operations, concatenated.
+        param_offsets: start of params of every operation in `params`, followed by
+            the total number of params.
+        params: numeric params of all operations, concatenated. NaN marks params
+            stored in the side table.
+        symbolic_param_positions: positions in `params` of params that aren't real
+            numbers.
+        symbolic_params: params that aren't real numbers, in the same order as
+            `symbolic_param_positions`.
+        gate_definitions: definitions of custom gates used in the circuit.
+        n_qubits: number of qubits in the circuit.
+    """
+
+    gate_kinds: Tuple[GateKind, ...]
+    gate_ids: np.ndarray
+    qubit_offsets: np.ndarray
+    qubits: np.ndarray
+    param_offsets: np.ndarray
+    params: np.ndarray
+    symbolic_param_positions: np.ndarray
+    symbolic_params: Tuple[sympy.Expr, ...]
+    gate_definitions: Tuple[_gates.CustomGateDefinition, ...]
+    n_qubits: int
+
+    @property
+    def n_operations(self) -> int:
+        return len(self.gate_ids)
+
+    @property
+    def free_symbols(self) -> List[sympy.Symbol]:
+        """Symbols used in params, sorted by name."""
+        symbols = set(
+            symbol
+            for param in self.symbolic_params
+            if isinstance(param, sympy.Expr)
+            for symbol in param.free_symbols
+        )
+        return sorted(symbols, key=str)
+
+    def __eq__(self, other: object):
+        if not isinstance(other, CircuitColumns):
+            return NotImplemented
+        return (
+            self.gate_kinds == other.gate_kinds
+            and self.n_qubits == other.n_qubits
+            and self.symbolic_params == other.symbolic_params
+            and self.gate_definitions == other.gate_definitions
+            and all(
+                np.array_equal(getattr(self, name), getattr(other, name))
+                for name in (
+                    "gate_ids",
+                    "qubit_offsets",
+                    "qubits",
+                    "param_offsets",
+                    "symbolic_param_positions",
+                )
+            )
+            and np.array_equal(self.params, other.params, equal_nan=True)
+        )
+
+
+class _ColumnsBuilder:
+    def __init__(self):
+        self.gate_ids: Dict[GateKind, int] = {}
+        self.op_gate_ids: List[int] = []
+        self.qubits: List[int] = []
+        self.qubit_offsets: List[int] = [0]
+        self.params: List[float] = []
+        self.param_offsets: List[int] = [0]
+        self.symbolic_param_positions: List[int] = []
+        self.symbolic_params: List[sympy.Expr] = []
+
+    def add(self, kind: GateKind, qubits: Sequence[int], params: Sequence):
+        self.op_gate_ids.append(self.gate_ids.setdefault(kind, len(self.gate_ids)))
+        self.qubits.extend(qubits)
+        self.qubit_offsets.append(len(self.qubits))
+        for param in params:
+            if isinstance(param, Real):
+                self.params.append(float(param))
+            else:
+                self.symbolic_param_positions.append(len(self.params))
+                self.symbolic_params.append(param)
+                self.params.append(np.nan)
+        self.param_offsets.append(len(self.params))
+
+    def build(
+        self, gate_definitions: Sequence[_gates.CustomGateDefinition], n_qubits: int
+    ) -> CircuitColumns:
+        return CircuitColumns(
+            gate_kinds=tuple(self.gate_ids),
+            gate_ids=np.array(self.op_gate_ids, dtype=np.int32),
+            qubit_offsets=np.array(self.qubit_offsets, dtype=np.int64),
+            qubits=np.array(self.qubits, dtype=np.int32),
+            param_offsets=np.array(self.param_offsets, dtype=np.int64),
+            params=np.array(self.params, dtype=np.float64),
+            symbolic_param_positions=np.array(
+                self.symbolic_param_positions, dtype=np.int64
+            ),
+            symbolic_params=tuple(self.symbolic_params),
+            gate_definitions=tuple(gate_definitions),
+            n_qubits=n_qubits,
+        )
+
+
+def _unwrap_modifiers(gate: _gates.Gate) -> Tuple[_gates.Gate, Tuple[str, ...]]:
+    modifiers: List[str] = []
+    while True:
+        if isinstance(gate, _gates.ControlledGate):
+            modifiers.extend([CONTROLLED] * gate.num_control_qubits)
+        elif isinstance(gate, _gates.Dagger):
+            modifiers.append(DAGGER)
+        else:
+            return gate, tuple(modifiers)
+        gate = gate.wrapped_gate
+
+
+def circuit_to_columns(circuit: _circuit.Circuit) -> CircuitColumns:
+    """Convert orquestra circuit to columnar representation."""
+    builder = _ColumnsBuilder()
+    for op in circuit.operations:
+        gate, modifiers = _unwrap_modifiers(op.gate)
+        builder.add(GateKind(gate.name, modifiers), op.qubit_indices, gate.params)
+    return builder.build(_collect_custom_gate_definitions(circuit), circuit.n_qubits)
+
+
+def _real_if_possible(pyquil_param):
+    # Numbers in pyquil instructions are complex, even if they were given as floats.
+    if isinstance(pyquil_param, complex) and pyquil_param.imag == 0:
+        return pyquil_param.real
+    return _import_expression(pyquil_param)
+
+
+def _is_builtin_gate_name(name: str) -> bool:
+    try:
+        _builtin_gates.builtin_gate_by_name(name)
+    except KeyError:
+        return False
+    return True
+
+
+def pyquil_to_columns(program: pyquil.Program) -> CircuitColumns:
+    """Convert pyquil program to columnar representation.
+
+    Like in `import_from_pyquil`, instructions other than gates are skipped, and
+    gates named like Orquestra's built-in gates are imported as the built-in ones.
+    Definitions of such gates, e.g. the ones `export_to_pyquil` adds for built-in
+    gates missing in pyquil, are dropped.
+    """
+    gate_definitions = [
+        _import_gate_def(gate_def)
+        for gate_def in program.defined_gates
+        if not _is_builtin_gate_name(gate_def.name)
+    ]
+    if len({gate_def.gate_name for gate_def in gate_definitions}) != len(
+        gate_definitions
+    ):
+        raise ValueError(
+            "Can't import circuits with non-unique gate definition names to orquestra: "
+            f"{[gate_def.gate_name for gate_def in gate_definitions]}"
+        )
+
+    builder = _ColumnsBuilder()
+    for instr in program.instructions:
+        if not isinstance(instr, pyquil.gates.Gate):
+            continue
+        if not set(instr.modifiers) <= {CONTROLLED, DAGGER}:
+            raise NotImplementedError(
+                f"Importing instruction {instr} from PyQuil is unsupported."
+            )
+        builder.add(
+            GateKind(instr.name, tuple(instr.modifiers)),
+            instr.get_qubit_indices(),
+            [_real_if_possible(param) for param in instr.params],
+        )
+
+    n_qubits = max(builder.qubits, default=-1) + 1
+    return builder.build(
+        sorted(gate_definitions, key=lambda gate_def: gate_def.gate_name), n_qubits
+    )
+
+
+def _builtin_gate_with_n_params(name: str, n_params: int) -> _gates.Gate:
+    gate_ref = _builtin_gates.builtin_gate_by_name(name)
+    if isinstance(gate_ref, _gates.Gate):
+        return gate_ref
+    return gate_ref(*(sympy.Symbol(f"theta_{i}") for i in range(n_params)))
+
+
+def _pyquil_gate_definitions(
+    columns: CircuitColumns, gate_defs_cache: _GateDefinitionsCache
+) -> List[_gates.CustomGateDefinition]:
+    gate_definitions = list(columns.gate_definitions)
+    defined_names = {gate_def.gate_name for gate_def in gate_definitions}
+
+    # Number of params of an unsupported built-in gate is taken from its first use.
+    gate_ids, first_uses = np.unique(columns.gate_ids, return_index=True)
+    param_counts = np.diff(columns.param_offsets)
+    for gate_id, first_use in zip(gate_ids.tolist(), first_uses.tolist()):
+        name = columns.gate_kinds[gate_id].name
+        if (
+            name in defined_names
+            or not hasattr(_builtin_gates, name)
+            or hasattr(pyquil.gates, name)
+        ):
+            continue
+        gate = _builtin_gate_with_n_params(name, int(param_counts[first_use]))
+        gate_def = gate_defs_cache.unsupported_builtin_gate_def(gate)
+        if gate_def is not None:
+            gate_definitions.append(gate_def)
+            defined_names.add(name)
+    return gate_definitions
+
+
+def _gate_builder(
+    kind: GateKind, custom_gate_constructors: Dict[str, Callable]
+) -> Callable[[list, list], pyquil.gates.Gate]:
+    if kind.name in custom_gate_constructors:
+        constructor = custom_gate_constructors[kind.name]
+
+        def _build_gate(params, qubits):
+            return (constructor(*params) if params else constructor)(*qubits)
+
+    else:
+        try:
+            pyquil_fn = _pyquil_gate_by_name(kind.name)
+        except AttributeError:
+            raise ValueError(
+                f"Can't export {kind.name} as custom gate, custom gate definition is "
+                "missing"
+            )
+
+        def _build_gate(params, qubits):
+            return pyquil_fn(*params, *qubits)
+
+    if not kind.modifiers:
+        return _build_gate
+
+    n_controls = kind.modifiers.count(CONTROLLED)
+    innermost_first = kind.modifiers[::-1]
+
+    def _build_modified_gate(params, qubits):
+        gate = _build_gate(params, qubits[n_controls:])
+        control_index = n_controls
+        for modifier in innermost_first:
+            if modifier == DAGGER:
+                gate = gate.dagger()
+            else:
+                control_index -= 1
+                gate = gate.controlled(qubits[control_index])
+        return gate
+
+    return _build_modified_gate
+
+
+def columns_to_pyquil(columns: CircuitColumns) -> pyquil.Program:
+    """Convert columnar representation of a circuit to pyquil program.
+
+    The result is the same as exporting the equivalent circuit with
+    `export_to_pyquil`.
+    """
+    gate_defs_cache = _GateDefinitionsCache()
+    declarations = [_param_declaration(name) for name in map(str, columns.free_symbols)]
+
+    pyquil_gate_definitions = []
+    custom_gate_constructors = {}
+    for gate_def in _pyquil_gate_definitions(columns, gate_defs_cache):
+        pyquil_gate_def, constructor = gate_defs_cache.export(gate_def)
+        pyquil_gate_definitions.append(pyquil_gate_def)
+        custom_gate_constructors[gate_def.gate_name] = constructor
+
+    builders = [
+        _gate_builder(kind, custom_gate_constructors) for kind in columns.gate_kinds
+    ]
+
+    params: list = columns.params.tolist()
+    for position, param in zip(
+        columns.symbolic_param_positions.tolist(), columns.symbolic_params
+    ):
+        params[position] = _export_expression(param)
+    qubits = columns.qubits.tolist()
+    qubit_offsets = columns.qubit_offsets.tolist()
+    param_offsets = columns.param_offsets.tolist()
+
+    gate_instructions = [
+        builders[gate_id](
+            params[param_offsets[i] : param_offsets[i + 1]],
+            qubits[qubit_offsets[i] : qubit_offsets[i + 1]],
+        )
+        for i, gate_id in enumerate(columns.gate_ids.tolist())
+    ]
+    return pyquil.Program(
+        *[*declarations, *pyquil_gate_definitions, *gate_instructions]
+    )
@@ -0,0 +1,208 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Content-addressed cache of exported programs and imported circuits."""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import pyquil
+import sympy
+from orquestra.quantum.circuits import _circuit
+
+from ._columns import circuit_to_columns
+
+DEFAULT_CONVERSION_CACHE_SIZE = 128
+
+
+class ConversionCacheInfo(NamedTuple):
+    """Statistics of a `ConversionCache`.
+
+    Sizes are measured in gate operations of cached circuits and programs.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+    max_operations: Optional[int]
+    curroperations: int
+
+
+def _hash_array(digest, array):
+    digest.update(len(array).to_bytes(8, "little"))
+    digest.update(array.tobytes())
+
+
+def _hash_text(digest, text: str):
+    encoded = text.encode()
+    digest.update(len(encoded).to_bytes(8, "little"))
+    digest.update(encoded)
+
+
+def circuit_fingerprint(circuit: _circuit.Circuit) -> str:
+    """Digest of circuit's content, equal for circuits exported to the same program.
+
+    Gate parameters and matrices of gate definitions are fingerprinted by their
+    structure (`sympy.srepr`), so e.g. `2 * theta` and `theta + theta` share the
+    fingerprint, but `2 * theta` and `2.0 * theta` don't. Number of qubits isn't
+    fingerprinted, since it doesn't affect exported programs.
+    """
+    columns = circuit_to_columns(circuit)
+    digest = hashlib.sha256()
+    _hash_text(digest, repr(columns.gate_kinds))
+    for array in (
+        columns.gate_ids,
+        columns.qubit_offsets,
+        columns.qubits,
+        columns.param_offsets,
+        columns.params,
+        columns.symbolic_param_positions,
+    ):
+        _hash_array(digest, array)
+    for param in columns.symbolic_params:
+        _hash_text(digest, sympy.srepr(param))
+    for gate_def in columns.gate_definitions:
+        _hash_text(digest, gate_def.gate_name)
+        _hash_text(digest, sympy.srepr(gate_def.matrix))
+        _hash_text(digest, sympy.srepr(gate_def.params_ordering))
+    return digest.hexdigest()
+
+
+def program_fingerprint(program: pyquil.Program) -> str:
+    """Digest of program's Quil text."""
+    return hashlib.sha256(program.out().encode()).hexdigest()
+
+
+def _n_program_operations(program: pyquil.Program) -> int:
+    return len(program.instructions)
+
+
+def _n_circuit_operations(circuit: _circuit.Circuit) -> int:
+    return len(circuit.operations)
+
+
+def _copy_circuit(circuit: _circuit.Circuit) -> _circuit.Circuit:
+    # Operations are immutable, it's only the list of them that can be modified.
+    return _circuit.Circuit(list(circuit.operations), circuit.n_qubits)
+
+
+def _copy_program(program: pyquil.Program) -> pyquil.Program:
+    return program.copy()
+
+
+class ConversionCache:
+    """Least-recently-used cache of conversion results, keyed by content of inputs.
+
+    Pass it as `cache` to `export_to_pyquil` or `import_from_pyquil` to reuse
+    results of converting equal circuits or programs. Cached results are never
+    handed out directly, callers get copies which they are free to modify.
+
+    Args:
+        maxsize: maximal number of cached results. Setting it to 0 disables caching.
+        max_operations: maximal total number of gate operations in cached results,
+            or None for no limit. Results larger than this aren't cached at all.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CONVERSION_CACHE_SIZE,
+        max_operations: Optional[int] = None,
+    ):
+        if maxsize < 0:
+            raise ValueError(f"Cache size has to be non-negative, got {maxsize}.")
+        if max_operations is not None and max_operations < 0:
+            raise ValueError(
+                "Maximal number of operations has to be non-negative, got "
+                f"{max_operations}."
+            )
+        self._maxsize = maxsize
+        self._max_operations = max_operations
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[object, int]]" = (
+            OrderedDict()
+        )
+        self._n_operations = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def exported(
+        self,
+        circuit: _circuit.Circuit,
+        export: Callable[[_circuit.Circuit], pyquil.Program],
+    ) -> pyquil.Program:
+        """Return copy of cached export of circuit, exporting it on cache miss."""
+        return self._get_or_convert(  # type: ignore
+            ("export", circuit_fingerprint(circuit)),
+            lambda: export(circuit),
+            _n_program_operations,
+            _copy_program,
+        )
+
+    def imported(
+        self,
+        program: pyquil.Program,
+        import_: Callable[[pyquil.Program], _circuit.Circuit],
+    ) -> _circuit.Circuit:
+        """Return copy of cached import of program, importing it on cache miss."""
+        return self._get_or_convert(  # type: ignore
+            ("import", program_fingerprint(program)),
+            lambda: import_(program),
+            _n_circuit_operations,
+            _copy_circuit,
+        )
+
+    def _get_or_convert(self, key, convert, n_operations_of, copy):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return copy(entry[0])
+            self._misses += 1
+
+        result = convert()
+        n_operations = n_operations_of(result)
+        if self._maxsize > 0 and (
+            self._max_operations is None or n_operations <= self._max_operations
+        ):
+            stored = copy(result)
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = (stored, n_operations)
+                    self._n_operations += n_operations
+                    self._evict()
+        return result
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize or (
+            self._max_operations is not None
+            and self._n_operations > self._max_operations
+        ):
+            _, (_, n_operations) = self._entries.popitem(last=False)
+            self._n_operations -= n_operations
+            self._evictions += 1
+
+    def cache_info(self) -> ConversionCacheInfo:
+        with self._lock:
+            return ConversionCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                maxsize=self._maxsize,
+                currsize=len(self._entries),
+                max_operations=self._max_operations,
+                curroperations=self._n_operations,
+            )
+
+    def cache_clear(self):
+        """Remove all cached results and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._n_operations = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
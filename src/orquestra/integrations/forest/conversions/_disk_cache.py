@@ -0,0 +1,212 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""On-disk cache of exported programs, shared between processes.
+
+Programs are stored as Quil text in a SQLite database, keyed by the fingerprint of
+the exported circuit and versions of this package and pyquil, so that upgrading
+either of them doesn't serve stale programs. SQLite takes care of locking, which
+makes the cache safe to use from many worker processes at once.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from importlib import metadata
+from typing import Callable, NamedTuple, Optional, Union
+
+import pyquil
+from orquestra.quantum.circuits import _circuit
+
+from ._conversion_cache import circuit_fingerprint
+
+DATABASE_FILE_NAME = "conversions.sqlite"
+
+# Time in seconds to wait for other processes to release the database lock.
+_LOCK_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS programs (
+    fingerprint TEXT NOT NULL,
+    package_version TEXT NOT NULL,
+    pyquil_version TEXT NOT NULL,
+    quil TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (fingerprint, package_version, pyquil_version)
+)
+"""
+
+
+class DiskConversionCacheInfo(NamedTuple):
+    """Statistics of a `DiskConversionCache`.
+
+    Hits, misses and evictions are counted only for lookups made by this process,
+    while sizes describe the whole database.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    currbytes: int
+
+
+def _distribution_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class DiskConversionCache:
+    """Cache of exported programs stored as Quil text in a directory.
+
+    Pass it as `cache` to `export_to_pyquil`. All processes using the same
+    directory share cached programs.
+
+    Programs found in the cache are parsed from Quil text. They describe the same
+    program as freshly exported ones, but can differ from them in representation of
+    numbers, e.g. complex entries of gate matrices can be parsed as expressions.
+
+    Args:
+        directory: directory in which the database is stored. It is created if it
+            doesn't exist.
+        max_age: time in seconds after which cached programs expire, or None if they
+            never do.
+        max_bytes: maximal total size of cached Quil text, or None for no limit.
+            When it's exceeded, the oldest programs are evicted first.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, "os.PathLike[str]"],
+        max_age: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        if max_age is not None and max_age < 0:
+            raise ValueError(f"Maximal age has to be non-negative, got {max_age}.")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError(f"Maximal size has to be non-negative, got {max_bytes}.")
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, DATABASE_FILE_NAME)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._versions = (
+            _distribution_version("orquestra-forest"),
+            _distribution_version("pyquil"),
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        with closing(self._connect()) as connection:
+            # Write-ahead log lets readers proceed while another process writes.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections aren't shared, so that the cache can be used from many
+        # threads and survives forking of worker processes.
+        return sqlite3.connect(self.path, timeout=_LOCK_TIMEOUT, isolation_level=None)
+
+    def exported(
+        self,
+        circuit: _circuit.Circuit,
+        export: Callable[[_circuit.Circuit], pyquil.Program],
+    ) -> pyquil.Program:
+        """Return cached export of circuit, exporting and storing it on cache miss."""
+        key = (circuit_fingerprint(circuit), *self._versions)
+        quil = self._load(key)
+        if quil is not None:
+            self._count(hits=1)
+            return pyquil.Program(quil)
+
+        self._count(misses=1)
+        program = export(circuit)
+        self._store(key, program.out())
+        return program
+
+    def _load(self, key) -> Optional[str]:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT quil, created FROM programs WHERE fingerprint = ? "
+                "AND package_version = ? AND pyquil_version = ?",
+                key,
+            ).fetchone()
+        if row is None or self._is_expired(row[1], time.time()):
+            return None
+        return row[0]
+
+    def _is_expired(self, created: float, now: float) -> bool:
+        return self.max_age is not None and created < now - self.max_age
+
+    def _store(self, key, quil: str):
+        size = len(quil.encode())
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.time()
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO programs VALUES (?, ?, ?, ?, ?, ?)",
+                    (*key, quil, size, now),
+                )
+                evictions = self._evict(connection, now)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        self._count(evictions=evictions)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> int:
+        evictions = 0
+        if self.max_age is not None:
+            evictions += connection.execute(
+                "DELETE FROM programs WHERE created < ?", (now - self.max_age,)
+            ).rowcount
+        if self.max_bytes is not None:
+            # Delete oldest programs until the rest fits into max_bytes.
+            evictions += connection.execute(
+                "DELETE FROM programs WHERE rowid IN ("
+                " SELECT rowid FROM ("
+                "  SELECT rowid, SUM(size) OVER ("
+                "   ORDER BY created DESC, rowid DESC"
+                "  ) AS cumulative_size FROM programs"
+                " ) WHERE cumulative_size > ?"
+                ")",
+                (self.max_bytes,),
+            ).rowcount
+        return evictions
+
+    def _count(self, hits: int = 0, misses: int = 0, evictions: int = 0):
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+            self._evictions += evictions
+
+    def cache_info(self) -> DiskConversionCacheInfo:
+        with closing(self._connect()) as connection:
+            currsize, currbytes = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM programs"
+            ).fetchone()
+        with self._lock:
+            return DiskConversionCacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                currsize=currsize,
+                currbytes=currbytes,
+            )
+
+    def cache_clear(self):
+        """Remove all cached programs, including ones stored by other processes."""
+        with closing(self._connect()) as connection:
+            connection.execute("DELETE FROM programs")
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
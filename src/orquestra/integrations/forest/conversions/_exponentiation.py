@@ -0,0 +1,175 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Trotterized time evolution under Pauli operators, exported directly to pyquil.
+
+Evolution under a single term, exp(-i c t P), is implemented as in pyquil's
+`exponential_map`: qubits are rotated to the Z basis, their parity is computed on
+the last qubit with a ladder of CNOTs, rotated with RZ(2 c t), and both the ladder
+and the basis changes are undone.
+
+The whole product formula is emitted in one pass. Between consecutive terms, CNOTs
+at the start of both ladders that act on qubits with the same Paulis are kept
+instead of being undone and recomputed, and basis changes of qubits measured with
+the same Pauli by both terms cancel out. Consecutive exponentials of the same term
+(e.g. at the middle of a second order step) are merged into one.
+"""
+from functools import lru_cache
+from numbers import Number
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+import pyquil
+import sympy
+
+from ._circuit_conversions import _export_expression, _param_declaration
+from ._pauli_conversions import PauliOperator, _symplectic_terms_ops, _to_symplectic
+
+# Term with Paulis acting on its qubits, in ascending order of qubits.
+_Term = Tuple[Tuple[int, str], ...]
+
+
+# Programs copy instructions they're constructed from, so gates repeated across
+# terms, i.e. basis changes and CNOTs, are created only once and reused.
+@lru_cache(maxsize=4096)
+def _to_z_basis(qubit: int, pauli: str) -> Tuple[pyquil.gates.Gate, ...]:
+    if pauli == "X":
+        return (pyquil.gates.H(qubit),)
+    if pauli == "Y":
+        return (pyquil.gates.RX(np.pi / 2, qubit),)
+    return ()
+
+
+@lru_cache(maxsize=4096)
+def _from_z_basis(qubit: int, pauli: str) -> Tuple[pyquil.gates.Gate, ...]:
+    if pauli == "X":
+        return (pyquil.gates.H(qubit),)
+    if pauli == "Y":
+        return (pyquil.gates.RX(-np.pi / 2, qubit),)
+    return ()
+
+
+@lru_cache(maxsize=4096)
+def _cnot(control: int, target: int) -> pyquil.gates.Gate:
+    return pyquil.gates.CNOT(control, target)
+
+
+def _ladder(term: _Term) -> List[Tuple[int, int]]:
+    return [(control, target) for (control, _), (target, _) in zip(term, term[1:])]
+
+
+def _shared_ladder_length(previous: _Term, term: _Term) -> int:
+    # CNOTs are shared as long as they act on the same qubits with the same Paulis.
+    n_shared_qubits = 0
+    for previous_op, op in zip(previous, term):
+        if previous_op != op:
+            break
+        n_shared_qubits += 1
+    return max(n_shared_qubits - 1, 0)
+
+
+def _basis_changes_between(previous: _Term, term: _Term) -> List[pyquil.gates.Gate]:
+    previous_paulis = dict(previous)
+    paulis = dict(term)
+    gates: List[pyquil.gates.Gate] = []
+    for qubit, pauli in previous:
+        if paulis.get(qubit) != pauli:
+            gates += _from_z_basis(qubit, pauli)
+    for qubit, pauli in term:
+        if previous_paulis.get(qubit) != pauli:
+            gates += _to_z_basis(qubit, pauli)
+    return gates
+
+
+def _suzuki_step(n_terms: int, order: int) -> List[Tuple[int, float]]:
+    """Terms of a single step of the product formula and fractions of their times."""
+    if order == 1:
+        return [(term, 1.0) for term in range(n_terms)]
+    if order == 2:
+        half_step = [(term, 0.5) for term in range(n_terms)]
+        return half_step + half_step[::-1]
+    p = 1 / (4 - 4 ** (1 / (order - 1)))
+    lower_order_step = _suzuki_step(n_terms, order - 2)
+    outer = [(term, p * fraction) for term, fraction in lower_order_step]
+    inner = [(term, (1 - 4 * p) * fraction) for term, fraction in lower_order_step]
+    return outer + outer + inner + outer + outer
+
+
+def _merge_consecutive(sequence: Sequence[Tuple[int, float]]) -> List[List]:
+    merged: List[List] = []
+    for term, fraction in sequence:
+        if merged and merged[-1][0] == term:
+            merged[-1][1] += fraction
+        else:
+            merged.append([term, fraction])
+    return merged
+
+
+def exponentiate_to_pyquil(
+    pauli_operator: PauliOperator,
+    time: Union[float, sympy.Expr] = 1.0,
+    steps: int = 1,
+    order: int = 1,
+) -> pyquil.Program:
+    """Export Trotterized evolution exp(-i H time) under a Hermitian Pauli operator.
+
+    Terms are exponentiated in the order they appear in the operator. Terms acting
+    only with identities contribute just a global phase, and are skipped.
+
+    Args:
+        pauli_operator: Orquestra or pyQuil PauliSum or PauliTerm with real
+            coefficients.
+        time: evolution time. Can be a sympy expression, in which case memory
+            regions are declared for its free symbols, like in `export_to_pyquil`.
+        steps: number of Trotter steps.
+        order: order of the product formula, 1 (Lie-Trotter), 2 (Strang) or any
+            higher even number (Suzuki's recursive formulas).
+
+    Raises:
+        ValueError: if coefficients aren't real or `steps` or `order` are invalid.
+    """
+    if steps < 1:
+        raise ValueError(f"Number of steps has to be positive, got {steps}.")
+    if order < 1 or (order > 2 and order % 2):
+        raise ValueError(f"Order has to be 1 or an even number, got {order}.")
+
+    symplectic = _to_symplectic(pauli_operator)
+    if np.any(np.abs(symplectic.coefficients.imag) > 1e-8):
+        raise ValueError("Only operators with real coefficients can be exponentiated.")
+
+    acting = np.flatnonzero((symplectic.x | symplectic.z).any(axis=1))
+    terms = [tuple(ops.items()) for ops in _symplectic_terms_ops(symplectic)]
+    coefficients = symplectic.coefficients.real.tolist()
+    step = [
+        (int(acting[i]), fraction) for i, fraction in _suzuki_step(len(acting), order)
+    ]
+    sequence = _merge_consecutive(step * steps)
+
+    declarations: List[pyquil.quilbase.Declare] = []
+    if isinstance(time, Number) and not isinstance(time, sympy.Basic):
+        time_per_step: Union[float, sympy.Expr] = float(time) / steps  # type: ignore
+    else:
+        time = sympy.sympify(time)
+        declarations = [
+            _param_declaration(name) for name in sorted(map(str, time.free_symbols))
+        ]
+        time_per_step = time / steps
+
+    instructions: List[pyquil.gates.Gate] = []
+    previous: _Term = ()
+    for term_index, fraction in sequence:
+        term = terms[term_index]
+        n_shared = _shared_ladder_length(previous, term)
+        instructions += [
+            _cnot(*pair) for pair in reversed(_ladder(previous)[n_shared:])
+        ]
+        instructions += _basis_changes_between(previous, term)
+        instructions += [_cnot(*pair) for pair in _ladder(term)[n_shared:]]
+        angle = 2 * coefficients[term_index] * fraction * time_per_step
+        instructions.append(pyquil.gates.RZ(_export_expression(angle), term[-1][0]))
+        previous = term
+
+    instructions += [_cnot(*pair) for pair in reversed(_ladder(previous))]
+    instructions += _basis_changes_between(previous, ())
+
+    return pyquil.Program(*declarations, *instructions)
@@ -0,0 +1,91 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Bounded LRU cache for translations of symbolic expressions."""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+DEFAULT_EXPRESSION_CACHE_SIZE = 4096
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a cache, modelled after `functools.lru_cache`'s `cache_info`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ExpressionCache:
+    """Least-recently-used cache in front of an expression translation function.
+
+    Args:
+        translate: function computing translation of an expression on cache miss.
+        key: function mapping an expression to a hashable cache key. Expressions for
+            which the key can't be hashed are translated without caching.
+        maxsize: maximal number of stored translations. Setting it to 0 disables
+            caching altogether.
+    """
+
+    def __init__(
+        self,
+        translate: Callable[[Any], Any],
+        key: Callable[[Any], Hashable],
+        maxsize: int = DEFAULT_EXPRESSION_CACHE_SIZE,
+    ):
+        if maxsize < 0:
+            raise ValueError(f"Cache size has to be non-negative, got {maxsize}.")
+        self._translate = translate
+        self._key = key
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __call__(self, expression):
+        try:
+            key = self._key(expression)
+            with self._lock:
+                value = self._entries[key]
+                self._entries.move_to_end(key)
+                self._hits += 1
+            return value
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable key, we can't cache it.
+            return self._translate(expression)
+
+        value = self._translate(expression)
+        with self._lock:
+            self._misses += 1
+            if self._maxsize > 0:
+                self._entries[key] = value
+                if len(self._entries) > self._maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._entries)
+            )
+
+    def cache_clear(self):
+        """Remove all stored translations and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def resize(self, maxsize: int):
+        """Change maximal size of this cache, evicting least recently used entries."""
+        if maxsize < 0:
+            raise ValueError(f"Cache size has to be non-negative, got {maxsize}.")
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
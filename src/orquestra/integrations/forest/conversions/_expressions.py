@@ -63,6 +63,29 @@ def function_call_from_pyquil_binary_expression(expression):
     )
 
 
+def pyquil_expression_key(expression):
+    """Hashable key identifying structure of a pyquil expression.
+
+    Compound pyquil expressions define `__eq__` but not `__hash__`, so they can't be
+    used as dictionary keys directly. Numbers are keyed together with their type,
+    so that e.g. `1` and `1.0` (which are printed differently in Quil) are distinct.
+    """
+    if isinstance(expression, quilatom.BinaryExp):
+        return (
+            type(expression),
+            pyquil_expression_key(expression.op1),
+            pyquil_expression_key(expression.op2),
+        )
+    elif isinstance(expression, quilatom.Function):
+        return (
+            quilatom.Function,
+            expression.name,
+            pyquil_expression_key(expression.expression),
+        )
+    else:
+        return (type(expression), expression)
+
+
 # Dialect defining conversion of intermediate expression tree to
 # the expression based on quil functions/parameters.
 # This is intended to be passed by a `dialect` argument of `translate_expression`.
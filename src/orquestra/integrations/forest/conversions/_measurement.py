@@ -0,0 +1,163 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Grouping of Pauli terms measurable together and programs measuring them.
+
+Terms are qubit-wise commuting (QWC) if on every qubit they act on with the same
+Pauli or with the identity. Expectation values of all terms in a QWC group can be
+estimated from the same measurement results, after rotating every qubit to the
+eigenbasis of the Pauli measured on it.
+
+Groups are found greedily, on bit matrices of the symplectic representation packed
+into bytes: terms acting on more qubits are placed first, each one in the first
+group it is compatible with. A term is checked against all groups at once.
+"""
+from typing import Dict, List, NamedTuple, Tuple, Union
+
+import numpy as np
+import pyquil
+from orquestra.quantum.operators import PauliSum, PauliTerm
+from pyquil.paulis import PauliSum as PyquilPauliSum
+from pyquil.paulis import PauliTerm as PyquilPauliTerm
+
+from ._pauli_conversions import (
+    _PAULIS_BY_BITS,
+    PauliOperator,
+    SymplecticPauliSum,
+    _to_symplectic,
+)
+
+
+class MeasurementGroup(NamedTuple):
+    """Qubit-wise commuting terms and the program measuring all of them.
+
+    Args:
+        terms: terms of the group, as a PauliSum of the same library as the grouped
+            operator.
+        program: basis rotations followed by measurements into the `ro` region.
+            It's meant to be appended to the program preparing the measured state.
+        qubits: measured qubits, `ro[i]` holds the result of measuring `qubits[i]`.
+    """
+
+    terms: Union[PauliSum, PyquilPauliSum]
+    program: pyquil.Program
+    qubits: Tuple[int, ...]
+
+
+def _operator_terms(pauli_operator: PauliOperator) -> list:
+    if isinstance(pauli_operator, (PauliTerm, PyquilPauliTerm)):
+        return [pauli_operator]
+    return list(pauli_operator.terms)
+
+
+def _sum_of_terms(pauli_operator: PauliOperator, terms: list):
+    if isinstance(pauli_operator, (PyquilPauliSum, PyquilPauliTerm)):
+        return PyquilPauliSum(terms)
+    return PauliSum(terms)
+
+
+def _qubitwise_commuting_groups(symplectic: SymplecticPauliSum) -> List[List[int]]:
+    x = np.packbits(symplectic.x, axis=1)
+    z = np.packbits(symplectic.z, axis=1)
+    support = x | z
+    # Bits of Paulis measured by every group. There are at most as many groups as
+    # terms, so rows are allocated upfront.
+    group_x = np.zeros_like(x)
+    group_z = np.zeros_like(z)
+    groups: List[List[int]] = []
+
+    weights = (symplectic.x | symplectic.z).sum(axis=1)
+    for term in np.argsort(-weights, kind="stable"):
+        n_groups = len(groups)
+        conflicts = (
+            (group_x[:n_groups] | group_z[:n_groups])
+            & support[term]
+            & ((group_x[:n_groups] ^ x[term]) | (group_z[:n_groups] ^ z[term]))
+        )
+        compatible = np.flatnonzero(~conflicts.any(axis=1))
+        if len(compatible):
+            group = compatible[0]
+        else:
+            group = n_groups
+            groups.append([])
+        groups[group].append(int(term))
+        group_x[group] |= x[term]
+        group_z[group] |= z[term]
+
+    return [sorted(group) for group in groups]
+
+
+def group_qubitwise_commuting(
+    pauli_operator: PauliOperator,
+) -> List[Union[PauliSum, PyquilPauliSum]]:
+    """Partition terms of an operator into qubit-wise commuting groups.
+
+    Args:
+        pauli_operator: Orquestra or pyQuil PauliSum or PauliTerm. Terms aren't
+            merged, simplify the operator first to avoid measuring duplicates.
+
+    Returns:
+        Groups of terms, as PauliSums of the same library as the operator. Terms
+        keep their relative order within each group. Terms acting only with
+        identities are placed in the first group.
+    """
+    terms = _operator_terms(pauli_operator)
+    return [
+        _sum_of_terms(pauli_operator, [terms[i] for i in group])
+        for group in _qubitwise_commuting_groups(_to_symplectic(pauli_operator))
+    ]
+
+
+def _measured_paulis(
+    symplectic: SymplecticPauliSum, group: List[int]
+) -> Dict[int, str]:
+    # Terms of the group are qubit-wise commuting, so on each qubit they either act
+    # with identity or with the same Pauli.
+    x = symplectic.x[group]
+    z = symplectic.z[group]
+    return {
+        qubit: _PAULIS_BY_BITS[int(x[:, qubit].any()) + 2 * int(z[:, qubit].any())]
+        for qubit in np.flatnonzero((x | z).any(axis=0)).tolist()
+    }
+
+
+def _measurement_program(paulis: Dict[int, str]) -> pyquil.Program:
+    program = pyquil.Program()
+    ro = program.declare("ro", "BIT", len(paulis))
+    for qubit, pauli in paulis.items():
+        if pauli == "X":
+            program += pyquil.gates.RY(-np.pi / 2, qubit)
+        elif pauli == "Y":
+            program += pyquil.gates.RX(np.pi / 2, qubit)
+    for i, qubit in enumerate(paulis):
+        program += pyquil.gates.MEASURE(qubit, ro[i])
+    return program
+
+
+def measurement_groups(pauli_operator: PauliOperator) -> List[MeasurementGroup]:
+    """Group qubit-wise commuting terms and build programs measuring every group.
+
+    Each program rotates qubits measured with X and Y to their eigenbases, with
+    RY(-pi/2) and RX(pi/2) respectively, and then measures every qubit the group
+    acts on into `ro`. See `group_qubitwise_commuting` for details of grouping.
+
+    Identity terms are kept in the first group, unless no group measures any qubit,
+    e.g. for `2 * I` or an empty pyquil PauliSum, which has a `0 * I` term. Such
+    groups are skipped, as expectation values of their terms are their
+    coefficients and there is nothing to measure.
+    """
+    terms = _operator_terms(pauli_operator)
+    symplectic = _to_symplectic(pauli_operator)
+    result = []
+    for group in _qubitwise_commuting_groups(symplectic):
+        paulis = _measured_paulis(symplectic, group)
+        if not paulis:
+            continue
+        result.append(
+            MeasurementGroup(
+                terms=_sum_of_terms(pauli_operator, [terms[i] for i in group]),
+                program=_measurement_program(paulis),
+                qubits=tuple(paulis),
+            )
+        )
+    return result
@@ -0,0 +1,82 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Converting large batches of objects on a pool of processes."""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from typing import Callable, Iterable, List, Optional, Sequence, TypeVar
+
+from ._circuit_conversions import export_many_to_pyquil, export_to_pyquil
+
+T = TypeVar("T")
+S = TypeVar("S")
+
+# Below this number of objects, the cost of starting worker processes and pickling
+# outweighs the gain from parallel conversion.
+DEFAULT_SERIAL_THRESHOLD = 64
+
+# Number of chunks submitted per worker. More than one chunk per worker evens out
+# the load if conversion times vary between objects.
+_CHUNKS_PER_WORKER = 4
+
+
+def _convert_chunk(conversion: Callable[[T], S], chunk: Sequence[T]) -> List[S]:
+    # Exporting circuits within a chunk can share gate definitions.
+    if conversion is export_to_pyquil:
+        return list(export_many_to_pyquil(chunk))  # type: ignore
+    return [conversion(obj) for obj in chunk]
+
+
+def _split_into_chunks(objects: Sequence[T], chunk_size: int) -> List[Sequence[T]]:
+    return [objects[i : i + chunk_size] for i in range(0, len(objects), chunk_size)]
+
+
+def convert_many(
+    conversion: Callable[[T], S],
+    objects: Iterable[T],
+    max_workers: Optional[int] = 1,
+    chunk_size: Optional[int] = None,
+    serial_threshold: int = DEFAULT_SERIAL_THRESHOLD,
+) -> List[S]:
+    """Apply conversion to each of the objects, optionally using multiple processes.
+
+    Intended to be used with `export_to_pyquil`, `import_from_pyquil`,
+    `orq_to_pyquil` and `pyquil_to_orq`, but any picklable function (i.e. defined
+    at the top level of a module) will do.
+
+    Args:
+        conversion: function converting single object.
+        objects: objects to convert. They are pickled when sent to worker processes.
+        max_workers: number of worker processes. The default of 1 converts objects
+            serially in the current process, None uses all available CPUs.
+        chunk_size: number of objects sent to a worker at once. By default, objects
+            are split into a few chunks per worker.
+        serial_threshold: batches smaller than this are converted serially,
+            regardless of `max_workers`.
+
+    Returns:
+        List of converted objects, in the same order as `objects`.
+    """
+    objects = list(objects)
+    n_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+
+    if n_workers < 1:
+        raise ValueError(f"Number of workers has to be positive, got {max_workers}.")
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"Chunk size has to be positive, got {chunk_size}.")
+
+    if n_workers == 1 or len(objects) < max(serial_threshold, 1):
+        return _convert_chunk(conversion, objects)
+
+    if chunk_size is None:
+        chunk_size = math.ceil(len(objects) / (n_workers * _CHUNKS_PER_WORKER))
+
+    chunks = _split_into_chunks(objects, chunk_size)
+    with ProcessPoolExecutor(max_workers=min(n_workers, len(chunks))) as executor:
+        return list(
+            chain.from_iterable(
+                executor.map(_convert_chunk, repeat(conversion), chunks)
+            )
+        )
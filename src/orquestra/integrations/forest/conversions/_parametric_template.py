@@ -0,0 +1,102 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Exporting parametric circuits once and rebinding their parameters numerically."""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyquil
+import sympy
+from numpy.typing import ArrayLike
+from orquestra.quantum.circuits import _circuit
+
+from ._circuit_conversions import export_to_pyquil
+
+MemoryMap = Dict[str, List[float]]
+
+
+@dataclass(frozen=True)
+class ParametricTemplate:
+    """Exported parametric program together with a plan for binding its parameters.
+
+    Parameters of the program are declared as REAL memory regions, and hence values
+    can be supplied at execution time via memory map, without rebuilding the program.
+
+    Args:
+        program: exported program, containing a DECLARE for every symbol.
+        symbols: order in which values of parameter vectors are interpreted.
+    """
+
+    program: pyquil.Program
+    symbols: Tuple[sympy.Symbol, ...]
+
+    @property
+    def memory_region_names(self) -> Tuple[str, ...]:
+        return tuple(map(str, self.symbols))
+
+    def memory_map(self, params: ArrayLike) -> MemoryMap:
+        """Construct memory map binding given parameter vector.
+
+        Args:
+            params: 1-D vector of values, ordered the same way as `self.symbols`.
+
+        Returns:
+            Mapping of memory region names to their values, suitable for passing
+            as `memory_map` when running the program.
+        """
+        params_vector = np.asarray(params, dtype=float)
+        if params_vector.ndim != 1:
+            raise ValueError(
+                "Expected 1-D parameter vector, got array of shape "
+                f"{params_vector.shape}."
+            )
+        return self.memory_maps(params_vector[np.newaxis, :])[0]
+
+    def memory_maps(self, params_batch: ArrayLike) -> List[MemoryMap]:
+        """Construct memory maps binding each row of a 2-D batch of parameters.
+
+        Args:
+            params_batch: 2-D array, in which each row is a parameter vector ordered
+                the same way as `self.symbols`.
+
+        Returns:
+            List of memory maps, one per row of `params_batch`.
+        """
+        params_array = np.asarray(params_batch, dtype=float)
+        if params_array.ndim != 2 or params_array.shape[1] != len(self.symbols):
+            raise ValueError(
+                f"Expected parameter array with {len(self.symbols)} columns, got "
+                f"array of shape {params_array.shape}."
+            )
+        names = self.memory_region_names
+        return [
+            {name: [value] for name, value in zip(names, row)}
+            for row in params_array.tolist()
+        ]
+
+
+def export_parametric_template(
+    circuit: _circuit.Circuit, symbols: Optional[Sequence[sympy.Symbol]] = None
+) -> ParametricTemplate:
+    """Export parametric circuit to pyquil once, for repeated numeric binding.
+
+    Args:
+        circuit: circuit to export, possibly containing free symbols.
+        symbols: order in which parameter vectors will be given. Defaults to
+            `circuit.free_symbols`. Has to contain every free symbol of the circuit.
+
+    Returns:
+        Template holding exported program and a plan of binding its parameters.
+    """
+    free_symbols = circuit.free_symbols
+    symbols_ordering = tuple(free_symbols if symbols is None else symbols)
+
+    has_duplicates = len(set(symbols_ordering)) != len(symbols_ordering)
+    if has_duplicates or set(symbols_ordering) != set(free_symbols):
+        raise ValueError(
+            f"Symbols {symbols_ordering} don't match free symbols of the circuit "
+            f"{free_symbols}."
+        )
+
+    return ParametricTemplate(export_to_pyquil(circuit), symbols_ordering)
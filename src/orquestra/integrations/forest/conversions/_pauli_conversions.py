@@ -19,13 +19,31 @@
 ############################################################################
 """
 Translates Orquestra pauli representation objects to pyQuil objects and vice versa.
+
+Both can also be converted to and from `SymplecticPauliSum`, which stores the whole
+operator in NumPy arrays, so that it can be processed without per-term loops.
 """
-from typing import Union
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+import numpy as np
 from orquestra.quantum.operators import PauliRepresentation, PauliSum, PauliTerm
 from pyquil.paulis import PauliSum as PyquilPauliSum
 from pyquil.paulis import PauliTerm as PyquilPauliTerm
 
+PauliOperator = Union[PauliRepresentation, PyquilPauliTerm, PyquilPauliSum]
+
 
 def orq_to_pyquil(
     pauli_operator: PauliRepresentation,
@@ -39,7 +57,9 @@ def orq_to_pyquil(
             or PauliTerm
 
     Returns:
-        PauliSum or PauliTerm representing the input pauli operator
+        PauliSum or PauliTerm representing the input pauli operator. Operators in
+        its terms are in the same order as in the Orquestra terms (for merged
+        duplicates, as in the first one).
     """
     if not isinstance(pauli_operator, (PauliSum, PauliTerm)):
         raise TypeError(
@@ -49,10 +69,7 @@ def orq_to_pyquil(
     if isinstance(pauli_operator, PauliTerm):
         return _orq_to_pyquil_term(pauli_operator)
 
-    terms = [_orq_to_pyquil_term(term) for term in pauli_operator.terms]
-    paulisum = PyquilPauliSum(terms)
-
-    return paulisum.simplify()
+    return PyquilPauliSum(_merged_pyquil_terms(pauli_operator.terms))
 
 
 def pyquil_to_orq(
@@ -76,21 +93,64 @@ def pyquil_to_orq(
     if isinstance(pyquil_pauli, PyquilPauliTerm):
         return _pyquil_to_orq_term(pyquil_pauli)
 
-    transformed_term = PauliSum()
-    # iterate through the PauliTerms of PauliSum
-    for pauli_term in pyquil_pauli.terms:
-        transformed_term += _pyquil_to_orq_term(pauli_term)
+    return PauliSum(_merged_orq_terms(pyquil_pauli.terms))
+
 
-    return transformed_term
+# Coefficients with absolute value at most this are dropped when merging terms, the
+# same as with np.isclose(coefficient, 0.0) used by simplify() of pyquil and orquestra.
+_ZERO_COEFFICIENT_TOLERANCE = 1e-8
+
+
+def _pyquil_term(ops: Mapping[int, str], coefficient: complex) -> PyquilPauliTerm:
+    # Orquestra terms have valid and distinct qubit indices, so the term can be built
+    # directly, bypassing validation done by the constructor and multiplication of
+    # single-qubit terms. Attributes are the same as set by PyquilPauliTerm.__init__.
+    term = PyquilPauliTerm.__new__(PyquilPauliTerm)
+    term._ops = OrderedDict(ops)  # type: ignore
+    term.coefficient = complex(coefficient)
+    return term
 
 
 def _orq_to_pyquil_term(orq_term: PauliTerm) -> PyquilPauliTerm:
-    base_term = PyquilPauliTerm("I", 0)
-    for idx, op in orq_term.operations:
-        product = base_term * PyquilPauliTerm(op, idx)
-        assert isinstance(product, PyquilPauliTerm)
-        base_term = product
-    return orq_term.coefficient * base_term
+    return _pyquil_term(orq_term._ops, orq_term.coefficient)
+
+
+def _merged_pyquil_terms(orq_terms: Iterable[PauliTerm]) -> List[PyquilPauliTerm]:
+    # Equivalent to PyquilPauliSum(terms).simplify(): terms with the same operations
+    # are merged, keeping the order of their first occurrences, and terms with zero
+    # coefficients are dropped. Every pyquil term is built only once.
+    merged: Dict[FrozenSet[Tuple[int, str]], Tuple[Mapping[int, str], complex]] = {}
+    for term in orq_terms:
+        key = term.operations
+        if key in merged:
+            ops, coefficient = merged[key]
+            merged[key] = (ops, coefficient + term.coefficient)
+        else:
+            merged[key] = (term._ops, term.coefficient)
+    return [
+        _pyquil_term(ops, coefficient)
+        for ops, coefficient in merged.values()
+        if abs(coefficient) > _ZERO_COEFFICIENT_TOLERANCE
+    ]
+
+
+def _merged_orq_terms(pyquil_terms: Iterable[PyquilPauliTerm]) -> List[PauliTerm]:
+    # Equivalent to adding the converted terms one by one, but linear in the number
+    # of terms: duplicates are merged once, with the same zero tolerance as in
+    # PauliSum.simplify(). Converted terms are new objects, so they can be updated.
+    merged: Dict[FrozenSet[Tuple[int, str]], PauliTerm] = {}
+    for pyquil_term in pyquil_terms:
+        term = _pyquil_to_orq_term(pyquil_term)
+        key = term.operations
+        if key in merged:
+            merged[key].coefficient += term.coefficient
+        else:
+            merged[key] = term
+    return [
+        term
+        for term in merged.values()
+        if abs(term.coefficient) > _ZERO_COEFFICIENT_TOLERANCE
+    ]
 
 
 def _pyquil_to_orq_term(pyquil_term: PyquilPauliTerm) -> PauliTerm:
@@ -101,3 +161,194 @@ def _pyquil_to_orq_term(pyquil_term: PyquilPauliTerm) -> PauliTerm:
             "All qubit indices of pyQuil pauli must be integers. "
             "Offending term: {}".format(pyquil_term)
         )
+
+
+@dataclass(frozen=True, eq=False)
+class SymplecticPauliSum:
+    """Sum of Pauli terms stored as bit matrices, in the symplectic representation.
+
+    Row i describes i-th term: qubit q is acted upon with X if only `x[i, q]` is set,
+    with Z if only `z[i, q]` is set, with Y if both are set and with identity
+    otherwise. The term is `coefficients[i]` times the product of these Paulis, i.e.
+    Y is not expanded to iXZ and coefficients are the same as in PauliSums.
+
+    Args:
+        x: boolean matrix of shape `(n_terms, n_qubits)` of X bits.
+        z: boolean matrix of shape `(n_terms, n_qubits)` of Z bits.
+        coefficients: complex coefficients of all terms.
+    """
+
+    x: np.ndarray
+    z: np.ndarray
+    coefficients: np.ndarray
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.coefficients)
+
+    @property
+    def n_qubits(self) -> int:
+        """Number of columns of bit matrices, including qubits no term acts on."""
+        return self.x.shape[1]
+
+    @property
+    def qubits(self) -> np.ndarray:
+        """Sorted indices of qubits acted upon by at least one term."""
+        return np.flatnonzero((self.x | self.z).any(axis=0))
+
+    def commutation_matrix(self) -> np.ndarray:
+        """Boolean matrix whose entry (i, j) tells if i-th and j-th terms commute.
+
+        Two Pauli terms commute iff the number of qubits on which they act with
+        different non-identity Paulis is even.
+        """
+        x = self.x.astype(np.int64)
+        z = self.z.astype(np.int64)
+        return (x @ z.T + z @ x.T) % 2 == 0
+
+    def simplify(self) -> "SymplecticPauliSum":
+        """Merge terms with the same Paulis and drop terms with zero coefficients.
+
+        Like `PauliSum.simplify()`, merged terms are ordered by their first occurrence.
+        """
+        rows = np.packbits(np.concatenate([self.x, self.z], axis=1), axis=1)
+        _, first, inverse = np.unique(
+            rows, axis=0, return_index=True, return_inverse=True
+        )
+        coefficients = np.zeros(len(first), dtype=complex)
+        np.add.at(coefficients, inverse.ravel(), self.coefficients)
+        order = np.argsort(first)
+        kept = order[np.abs(coefficients[order]) > _ZERO_COEFFICIENT_TOLERANCE]
+        return SymplecticPauliSum(
+            self.x[first[kept]], self.z[first[kept]], coefficients[kept]
+        )
+
+
+# Pauli of every combination of (x, z) bits, indexed by x + 2 * z.
+_PAULIS_BY_BITS = ("I", "X", "Z", "Y")
+
+
+def _terms_to_symplectic(
+    terms_ops: Sequence[Mapping[int, str]],
+    coefficients: Sequence[complex],
+    n_qubits: Optional[int],
+) -> SymplecticPauliSum:
+    term_indices = [i for i, ops in enumerate(terms_ops) for _ in range(len(ops))]
+    qubits = np.array(
+        [qubit for ops in terms_ops for qubit in ops], dtype=np.int64
+    ).reshape(-1)
+    paulis = np.array([op for ops in terms_ops for op in ops.values()], dtype="<U1")
+    used_qubits = int(qubits.max(initial=-1)) + 1
+    if n_qubits is None:
+        n_qubits = used_qubits
+    elif n_qubits < used_qubits:
+        raise ValueError(
+            f"Operator acts on {used_qubits} qubits, can't represent it with "
+            f"{n_qubits}."
+        )
+
+    x = np.zeros((len(terms_ops), n_qubits), dtype=bool)
+    z = np.zeros((len(terms_ops), n_qubits), dtype=bool)
+    x[term_indices, qubits] = (paulis == "X") | (paulis == "Y")
+    z[term_indices, qubits] = (paulis == "Z") | (paulis == "Y")
+    return SymplecticPauliSum(x, z, np.array(coefficients, dtype=complex).reshape(-1))
+
+
+def _symplectic_terms_ops(symplectic: SymplecticPauliSum) -> List[Dict[int, str]]:
+    term_indices, qubits = np.nonzero(symplectic.x | symplectic.z)
+    codes = (
+        symplectic.x[term_indices, qubits] + 2 * symplectic.z[term_indices, qubits]
+    ).tolist()
+    terms_ops: List[Dict[int, str]] = [{} for _ in range(symplectic.n_terms)]
+    for term_index, qubit, code in zip(term_indices.tolist(), qubits.tolist(), codes):
+        terms_ops[term_index][qubit] = _PAULIS_BY_BITS[code]
+    return terms_ops
+
+
+def orq_to_symplectic(
+    pauli_operator: PauliRepresentation, n_qubits: Optional[int] = None
+) -> SymplecticPauliSum:
+    """Convert an Orquestra PauliSum or PauliTerm to the symplectic representation.
+
+    Terms are neither merged nor reordered, use `simplify()` to merge them.
+
+    Args:
+        pauli_operator: Orquestra PauliSum or PauliTerm to convert.
+        n_qubits: number of columns of bit matrices. Defaults to the largest qubit
+            index used by the operator plus one.
+
+    Raises:
+        ValueError: if the operator acts on more than `n_qubits` qubits.
+    """
+    if not isinstance(pauli_operator, (PauliSum, PauliTerm)):
+        raise TypeError(
+            "pauli_operator must be an Orquestra PauliSum or PauliTerm object"
+        )
+    terms = (
+        [pauli_operator] if isinstance(pauli_operator, PauliTerm) else pauli_operator
+    )
+    return _terms_to_symplectic(
+        [term._ops for term in terms], [term.coefficient for term in terms], n_qubits
+    )
+
+
+def pyquil_to_symplectic(
+    pyquil_pauli: Union[PyquilPauliTerm, PyquilPauliSum],
+    n_qubits: Optional[int] = None,
+) -> SymplecticPauliSum:
+    """Convert a pyQuil PauliSum or PauliTerm to the symplectic representation.
+
+    See `orq_to_symplectic` for details.
+
+    Raises:
+        ValueError: if the operator acts on more than `n_qubits` qubits or any of its
+            qubit indices isn't an integer.
+    """
+    if not isinstance(pyquil_pauli, (PyquilPauliSum, PyquilPauliTerm)):
+        raise TypeError("pyquil_pauli must be a pyquil PauliSum or PauliTerm object")
+    terms = (
+        [pyquil_pauli]
+        if isinstance(pyquil_pauli, PyquilPauliTerm)
+        else pyquil_pauli.terms
+    )
+    for term in terms:
+        if not all(isinstance(qubit, int) for qubit in term._ops):
+            raise ValueError(
+                "All qubit indices of pyQuil pauli must be integers. "
+                "Offending term: {}".format(term)
+            )
+    return _terms_to_symplectic(
+        [term._ops for term in terms],  # type: ignore
+        [term.coefficient for term in terms],  # type: ignore
+        n_qubits,
+    )
+
+
+def symplectic_to_orq(symplectic: SymplecticPauliSum) -> PauliSum:
+    """Convert a symplectic representation to an Orquestra PauliSum, term by term."""
+    return PauliSum(
+        [
+            PauliTerm(ops, coefficient)
+            for ops, coefficient in zip(
+                _symplectic_terms_ops(symplectic), symplectic.coefficients.tolist()
+            )
+        ]
+    )
+
+
+def symplectic_to_pyquil(symplectic: SymplecticPauliSum) -> PyquilPauliSum:
+    """Convert a symplectic representation to a pyQuil PauliSum, term by term."""
+    return PyquilPauliSum(
+        [
+            _pyquil_term(ops, coefficient)
+            for ops, coefficient in zip(
+                _symplectic_terms_ops(symplectic), symplectic.coefficients.tolist()
+            )
+        ]
+    )
+
+
+def _to_symplectic(pauli_operator: PauliOperator) -> SymplecticPauliSum:
+    if isinstance(pauli_operator, (PyquilPauliSum, PyquilPauliTerm)):
+        return pyquil_to_symplectic(pauli_operator)
+    return orq_to_symplectic(pauli_operator)
@@ -0,0 +1,174 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Matrices of Pauli operators, built from bit masks of their terms.
+
+Following pyquil conventions, qubit q corresponds to bit q of basis-state indices,
+i.e. qubit 0 is the least significant one. A Pauli term with X bits `x` and Z bits
+`z` (Y sets both of them) maps basis state |b> to
+
+    i^popcount(x & z) * (-1)^popcount(b & z) * |b ^ x>,
+
+so every term has a single non-zero entry in each column, and terms with the same
+X bits share their non-zero positions. Terms are grouped by X bits, and entries of
+every group are computed for all basis states at once, without Kronecker products.
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ._pauli_conversions import PauliOperator, SymplecticPauliSum, _to_symplectic
+
+
+class _TermsWithXBits(NamedTuple):
+    """Terms sharing X bits, with coefficients including the phase of their Ys."""
+
+    x_mask: int
+    z_masks: np.ndarray
+    coefficients: np.ndarray
+
+
+def _bit_masks(bits: np.ndarray) -> np.ndarray:
+    return bits.astype(np.int64) @ (np.int64(1) << np.arange(bits.shape[1]))
+
+
+def _odd_parity(values: np.ndarray) -> np.ndarray:
+    # Fold bits of 64-bit integers onto the least significant one. Values are
+    # overwritten, so that only a single temporary array is used.
+    shifted = np.empty_like(values)
+    for shift in (32, 16, 8, 4, 2, 1):
+        np.right_shift(values, shift, out=shifted)
+        values ^= shifted
+    values &= 1
+    return values.astype(bool)
+
+
+def _grouped_terms(symplectic: SymplecticPauliSum) -> List[_TermsWithXBits]:
+    x_masks = _bit_masks(symplectic.x)
+    z_masks = _bit_masks(symplectic.z)
+    coefficients = symplectic.coefficients * 1j ** (
+        (symplectic.x & symplectic.z).sum(axis=1) % 4
+    )
+    unique_x_masks, group_ids = np.unique(x_masks, return_inverse=True)
+    return [
+        _TermsWithXBits(
+            int(x_mask), z_masks[group_ids == i], coefficients[group_ids == i]
+        )
+        for i, x_mask in enumerate(unique_x_masks)
+    ]
+
+
+def _column_entries(group: _TermsWithXBits, basis: np.ndarray) -> np.ndarray:
+    """Entries of group's matrix in all columns, i.e. <b ^ x| group |b> for all b."""
+    entries = np.zeros(len(basis), dtype=complex)
+    masked = np.empty_like(basis)
+    for z_mask, coefficient in zip(group.z_masks.tolist(), group.coefficients):
+        np.bitwise_and(basis, z_mask, out=masked)
+        odd = _odd_parity(masked)
+        np.add(entries, coefficient, out=entries, where=~odd)
+        np.subtract(entries, coefficient, out=entries, where=odd)
+    return entries
+
+
+def _symplectic_and_n_qubits(
+    pauli_operator: PauliOperator, n_qubits: Optional[int]
+) -> Tuple[SymplecticPauliSum, int]:
+    symplectic = _to_symplectic(pauli_operator)
+    used_qubits = int(symplectic.qubits.max(initial=-1)) + 1
+    if n_qubits is None:
+        n_qubits = used_qubits
+    elif n_qubits < used_qubits:
+        raise ValueError(
+            f"Operator acts on {used_qubits} qubits, can't build its matrix for "
+            f"{n_qubits} qubits."
+        )
+    return symplectic, n_qubits
+
+
+def pauli_to_sparse(
+    pauli_operator: PauliOperator, n_qubits: Optional[int] = None
+) -> sparse.csr_matrix:
+    """Build sparse matrix of an Orquestra or pyQuil PauliSum or PauliTerm.
+
+    Args:
+        pauli_operator: operator to build matrix of.
+        n_qubits: number of qubits the matrix acts on. Defaults to the largest qubit
+            index used by the operator plus one.
+
+    Returns:
+        CSR matrix of shape `(2 ** n_qubits, 2 ** n_qubits)`, with qubit 0
+        corresponding to the least significant bit of row and column indices, as in
+        pyquil's wavefunctions.
+
+    Raises:
+        ValueError: if the operator acts on qubits with indices `n_qubits` or larger.
+    """
+    symplectic, n_qubits = _symplectic_and_n_qubits(pauli_operator, n_qubits)
+    basis = np.arange(2**n_qubits, dtype=np.int64)
+    groups = _grouped_terms(symplectic)
+
+    # Every group has exactly one entry in each row r, in column r ^ x_mask.
+    columns = np.empty((len(basis), len(groups)), dtype=np.int64)
+    data = np.empty((len(basis), len(groups)), dtype=complex)
+    for i, group in enumerate(groups):
+        columns[:, i] = basis ^ group.x_mask
+        data[:, i] = _column_entries(group, basis)[columns[:, i]]
+    indptr = np.arange(len(basis) + 1, dtype=np.int64) * len(groups)
+
+    matrix = sparse.csr_matrix(
+        (data.ravel(), columns.ravel(), indptr), shape=(len(basis), len(basis))
+    )
+    matrix.sort_indices()
+    matrix.eliminate_zeros()
+    return matrix
+
+
+def _apply_group(group: _TermsWithXBits, state: np.ndarray, out: np.ndarray):
+    # Row r of the product gets the entry of column r ^ x_mask, so entries are
+    # computed for permuted columns and the state is permuted to match them. Arrays
+    # allocated here are freed before the next group is applied.
+    columns = np.arange(len(state), dtype=np.int64)
+    columns ^= group.x_mask
+    # Indices are valid, and with mode "raise" NumPy would buffer the output.
+    np.take(state, columns, axis=0, out=out, mode="wrap")
+    entries = _column_entries(group, columns)
+    out *= entries[:, np.newaxis] if state.ndim > 1 else entries
+
+
+def apply_pauli_operator(
+    pauli_operator: PauliOperator, state: np.ndarray
+) -> np.ndarray:
+    """Multiply state by the matrix of an operator, without building the matrix.
+
+    Terms are applied group by group (see module docstring), into a single buffer as
+    large as the state, which is reused by all groups. Apart from it, only a few
+    arrays as long as a single column of the state are allocated, so this works for
+    registers whose matrices, even sparse, wouldn't fit in memory.
+
+    Args:
+        pauli_operator: Orquestra or pyQuil PauliSum or PauliTerm.
+        state: array of shape `(2 ** n_qubits,)` or `(2 ** n_qubits, k)`, with k
+            states as columns. Qubits are ordered as in `pauli_to_sparse`. States
+            which aren't complex are copied to a complex array first.
+
+    Returns:
+        Array of the same shape as the state, equal to
+        `pauli_to_sparse(pauli_operator, n_qubits) @ state`.
+
+    Raises:
+        ValueError: if the length of the state isn't a power of two, or the operator
+            acts on qubits the state doesn't have.
+    """
+    state = np.asarray(state, dtype=complex)
+    n_qubits = len(state).bit_length() - 1
+    if len(state) != 2**n_qubits:
+        raise ValueError(f"Length of state has to be a power of 2, got {len(state)}.")
+    symplectic, _ = _symplectic_and_n_qubits(pauli_operator, n_qubits)
+
+    result = np.zeros_like(state)
+    group_product = np.empty_like(state)
+    for group in _grouped_terms(symplectic):
+        _apply_group(group, state, out=group_product)
+        result += group_product
+    return result
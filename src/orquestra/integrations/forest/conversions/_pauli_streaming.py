@@ -0,0 +1,113 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Converting Pauli operators term by term, without keeping whole operators in memory.
+
+Terms are taken from any iterable, e.g. a generator reading them from a file, and
+converted terms are yielded in chunks of fixed size. Unless duplicates are merged
+across all chunks, at most a single chunk of input and converted terms is kept in
+memory at any time.
+"""
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from orquestra.quantum.operators import PauliTerm
+from pyquil.paulis import PauliTerm as PyquilPauliTerm
+
+from ._pauli_conversions import (
+    _merged_orq_terms,
+    _merged_pyquil_terms,
+    _orq_to_pyquil_term,
+    _pyquil_to_orq_term,
+)
+
+DEFAULT_CHUNK_SIZE = 10000
+
+_MERGE_MODES = (None, "chunk", "all")
+
+T = TypeVar("T")
+S = TypeVar("S")
+
+
+def iter_orq_to_pyquil(
+    terms: Iterable[PauliTerm],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    merge_duplicates: Optional[str] = None,
+) -> Iterator[List[PyquilPauliTerm]]:
+    """Lazily convert Orquestra PauliTerms to pyQuil PauliTerms, in chunks.
+
+    Args:
+        terms: Orquestra PauliTerms to convert, e.g. a PauliSum or a generator.
+        chunk_size: number of converted terms in every chunk but the last one.
+        merge_duplicates: how terms acting with the same Paulis are merged.
+            None: terms are not merged and are converted one to one.
+            "chunk": terms are merged within each chunk of `chunk_size` input terms,
+                so chunks may be shorter than `chunk_size`.
+            "all": terms are merged across all chunks. Result is the same as
+                converting the simplified sum of all terms, but memory proportional
+                to the number of distinct terms is used, and the first chunk is
+                yielded only after all terms were read.
+            Merged terms with zero coefficients are dropped.
+
+    Returns:
+        Iterator yielding lists of converted terms.
+    """
+    _validate_streaming_args(chunk_size, merge_duplicates)
+    return _iter_converted(
+        terms, chunk_size, merge_duplicates, _orq_to_pyquil_term, _merged_pyquil_terms
+    )
+
+
+def iter_pyquil_to_orq(
+    terms: Iterable[PyquilPauliTerm],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    merge_duplicates: Optional[str] = None,
+) -> Iterator[List[PauliTerm]]:
+    """Lazily convert pyQuil PauliTerms to Orquestra PauliTerms, in chunks.
+
+    See `iter_orq_to_pyquil` for description of arguments.
+
+    Returns:
+        Iterator yielding lists of converted terms. ValueError is raised while
+        iterating if qubit indices of a term aren't integers.
+    """
+    _validate_streaming_args(chunk_size, merge_duplicates)
+    return _iter_converted(
+        terms, chunk_size, merge_duplicates, _pyquil_to_orq_term, _merged_orq_terms
+    )
+
+
+def _validate_streaming_args(chunk_size: int, merge_duplicates: Optional[str]):
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size has to be positive, got {chunk_size}.")
+    if merge_duplicates not in _MERGE_MODES:
+        raise ValueError(
+            f"Unsupported merge mode {merge_duplicates}, "
+            f"expected one of {_MERGE_MODES}."
+        )
+
+
+def _iter_converted(
+    terms: Iterable[T],
+    chunk_size: int,
+    merge_duplicates: Optional[str],
+    convert: Callable[[T], S],
+    merge: Callable[[Iterable[T]], List[S]],
+) -> Iterator[List[S]]:
+    if merge_duplicates == "all":
+        yield from _chunked(merge(terms), chunk_size)
+        return
+
+    for chunk in _chunked(terms, chunk_size):
+        if merge_duplicates == "chunk":
+            merged = merge(chunk)
+            if merged:
+                yield merged
+        else:
+            yield [convert(term) for term in chunk]
+
+
+def _chunked(items: Iterable[T], chunk_size: int) -> Iterator[List[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
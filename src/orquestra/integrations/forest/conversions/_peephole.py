@@ -0,0 +1,120 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Peephole optimization of circuits, applied before exporting them.
+
+Operations are scanned once, and every operation is compared only with the last
+kept operation on its qubits. For each qubit we keep a stack of positions of kept
+operations acting on it, so that when two operations cancel out, the operation
+preceding them becomes a candidate for further simplification, e.g. `RZ(a) X X RZ(b)`
+is reduced to `RZ(a + b)`.
+"""
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from orquestra.quantum.circuits import _circuit, _gates
+
+# Gates of the form exp(-i * angle * G) for a fixed generator G, for which applying
+# the gate twice amounts to adding the angles.
+_ADDITIVE_ROTATIONS = {"RX", "RY", "RZ", "PHASE", "CPHASE", "XX", "YY", "ZZ", "XY"}
+
+
+class PeepholeResult(NamedTuple):
+    """Optimized circuit together with the number of operations removed from it."""
+
+    circuit: _circuit.Circuit
+    n_removed: int
+
+
+def _is_builtin(gate: _gates.Gate, names) -> bool:
+    return (
+        isinstance(gate, _gates.MatrixFactoryGate)
+        and gate.name in names
+        and not isinstance(gate.matrix_factory, _gates.CustomGateMatrixFactory)
+    )
+
+
+def _is_zero(param) -> bool:
+    return param == 0
+
+
+def _is_identity(gate: _gates.Gate) -> bool:
+    if _is_builtin(gate, {"I"}):
+        return True
+    return _is_builtin(gate, _ADDITIVE_ROTATIONS) and _is_zero(gate.params[0])
+
+
+def _combine(
+    first: _gates.Gate, second: _gates.Gate
+) -> Optional[Sequence[_gates.Gate]]:
+    """Gates equivalent to `first` followed by `second`, or None if they don't
+    simplify."""
+    if (
+        first.name == second.name
+        and _is_builtin(first, _ADDITIVE_ROTATIONS)
+        and _is_builtin(second, _ADDITIVE_ROTATIONS)
+    ):
+        merged = first.replace_params(  # type: ignore
+            (first.params[0] + second.params[0],)  # type: ignore
+        )
+        return [] if _is_identity(merged) else [merged]
+    if second == first.dagger:
+        return []
+    return None
+
+
+def _last_position_on_all_qubits(
+    stacks: Dict[int, List[int]], qubits: Sequence[int]
+) -> Optional[int]:
+    """Position of the last kept operation if it is the last one on all qubits."""
+    positions = {stacks[qubit][-1] if stacks.get(qubit) else None for qubit in qubits}
+    return positions.pop() if len(positions) == 1 else None
+
+
+def peephole_optimize(circuit: _circuit.Circuit) -> PeepholeResult:
+    """Simplify adjacent operations acting on the same qubits.
+
+    The following simplifications are made, in a single linear-time pass:
+    - identity gates, including rotations by a zero angle, are dropped,
+    - consecutive rotations of the same kind, e.g. `RZ(a)` and `RZ(b)`, are merged
+      into a single rotation by the sum of their angles, which can be symbolic,
+    - gates followed by their inverse, e.g. `X X` or `G` and `G.dagger`, cancel out.
+
+    Only operations acting on the same qubits, in the same order, are combined.
+
+    Args:
+        circuit: circuit to optimize.
+
+    Returns:
+        Optimized circuit, acting on the same number of qubits as the original one,
+        and the number of operations removed.
+    """
+    kept: List[Optional[_gates.GateOperation]] = []
+    stacks: Dict[int, List[int]] = {}
+
+    for op in circuit.operations:
+        if _is_identity(op.gate):
+            continue
+        position = _last_position_on_all_qubits(stacks, op.qubit_indices)
+        previous = kept[position] if position is not None else None
+        if (
+            position is not None
+            and previous is not None
+            and previous.qubit_indices == op.qubit_indices
+        ):
+            combined = _combine(previous.gate, op.gate)
+            if combined is not None:
+                if combined:
+                    kept[position] = combined[0](*op.qubit_indices)
+                else:
+                    kept[position] = None
+                    for qubit in op.qubit_indices:
+                        stacks[qubit].pop()
+                continue
+        for qubit in op.qubit_indices:
+            stacks.setdefault(qubit, []).append(len(kept))
+        kept.append(op)
+
+    ops = [op for op in kept if op is not None]
+    return PeepholeResult(
+        _circuit.Circuit(ops, circuit.n_qubits), len(circuit.operations) - len(ops)
+    )
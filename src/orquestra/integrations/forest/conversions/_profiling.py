@@ -0,0 +1,109 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Opt-in recording of time spent in stages of conversions.
+
+Stages are marked with the `stage` context manager. When no profile is being
+recorded (the default), marking a stage amounts to a single context variable lookup.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+
+@dataclass
+class StageStats:
+    """Number of times a stage was entered and total wall time spent in it."""
+
+    calls: int = 0
+    wall_time: float = 0.0
+
+
+@dataclass
+class CacheStats:
+    """Number of cache hits and misses."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        """Fraction of lookups that were hits, or None if there were no lookups."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+
+@dataclass
+class ConversionProfile:
+    """Statistics of conversions executed while the profile was being recorded.
+
+    Args:
+        stages: statistics of stages, keyed by stage names. Stages can be nested,
+            e.g. time of "export.gates" includes the time of "expression.export"
+            spent on translating gate parameters.
+        caches: hits and misses of the expression caches, keyed the same way as in
+            `expression_cache_info`.
+        counters: other quantities reported by conversions, e.g.
+            "export.peephole.removed" is the number of operations removed by
+            peephole optimization.
+    """
+
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    caches: Dict[str, CacheStats] = field(default_factory=dict)
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Profile as a dictionary of plain values, e.g. for logging it as JSON."""
+        return {
+            "stages": {
+                name: {"calls": stats.calls, "wall_time": stats.wall_time}
+                for name, stats in self.stages.items()
+            },
+            "caches": {
+                name: {
+                    "hits": stats.hits,
+                    "misses": stats.misses,
+                    "hit_rate": stats.hit_rate,
+                }
+                for name, stats in self.caches.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+
+_ACTIVE_PROFILE: ContextVar[Optional[ConversionProfile]] = ContextVar(
+    "_ACTIVE_PROFILE", default=None
+)
+
+
+@contextmanager
+def recording(profile: ConversionProfile) -> Iterator[ConversionProfile]:
+    token = _ACTIVE_PROFILE.set(profile)
+    try:
+        yield profile
+    finally:
+        _ACTIVE_PROFILE.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    profile = _ACTIVE_PROFILE.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = profile.stages.setdefault(name, StageStats())
+        stats.calls += 1
+        stats.wall_time += time.perf_counter() - start
+
+
+def count(name: str, value: int):
+    profile = _ACTIVE_PROFILE.get()
+    if profile is not None:
+        profile.counters[name] = profile.counters.get(name, 0) + value
@@ -0,0 +1,94 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Compaction of sparse qubit indices into a dense range and back.
+
+Programs targeting hardware often act on a few qubits with large indices, e.g.
+100-107. Orquestra circuits have as many qubits as the largest index plus one,
+so such programs are compacted to act on qubits 0-7 instead, and expanded back to
+the original (physical) qubits when exported.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, NamedTuple, Tuple
+
+from orquestra.quantum.circuits import _circuit
+
+
+@dataclass(frozen=True)
+class QubitMapping:
+    """Bijection between physical qubits and a dense range of qubits.
+
+    Args:
+        to_dense: forward mapping, from physical qubits to dense ones.
+        to_physical: inverse mapping, i-th element is the physical qubit that was
+            mapped to dense qubit i.
+    """
+
+    to_dense: Dict[int, int]
+    to_physical: Tuple[int, ...]
+
+    @classmethod
+    def from_physical_qubits(cls, qubits: Iterable[int]) -> "QubitMapping":
+        """Map distinct physical qubits to 0, 1, ..., in ascending order."""
+        to_physical = tuple(sorted(set(qubits)))
+        return cls(
+            to_dense={qubit: index for index, qubit in enumerate(to_physical)},
+            to_physical=to_physical,
+        )
+
+    @property
+    def n_qubits(self) -> int:
+        return len(self.to_physical)
+
+
+class CompactedCircuit(NamedTuple):
+    """Circuit acting on a dense range of qubits and its mapping to physical ones."""
+
+    circuit: _circuit.Circuit
+    qubit_mapping: QubitMapping
+
+
+def _remap_qubits(
+    circuit: _circuit.Circuit, mapping: Mapping[int, int], n_qubits: int
+) -> _circuit.Circuit:
+    return _circuit.Circuit(
+        [
+            op.gate(*(mapping[qubit] for qubit in op.qubit_indices))
+            for op in circuit.operations
+        ],
+        n_qubits,
+    )
+
+
+def compact_circuit(circuit: _circuit.Circuit) -> CompactedCircuit:
+    """Renumber qubits used by circuit's operations to 0, 1, ..., keeping their order.
+
+    Qubits that aren't acted upon are dropped, so the compacted circuit has as many
+    qubits as its operations use.
+    """
+    mapping = QubitMapping.from_physical_qubits(
+        qubit for op in circuit.operations for qubit in op.qubit_indices
+    )
+    return CompactedCircuit(
+        _remap_qubits(circuit, mapping.to_dense, mapping.n_qubits), mapping
+    )
+
+
+def expand_circuit(
+    circuit: _circuit.Circuit, qubit_mapping: QubitMapping
+) -> _circuit.Circuit:
+    """Map qubits of a compacted circuit back to physical qubits.
+
+    Raises:
+        ValueError: if the circuit acts on qubits missing from the mapping.
+    """
+    if circuit.n_qubits > qubit_mapping.n_qubits:
+        raise ValueError(
+            f"Can't expand circuit acting on {circuit.n_qubits} qubits with mapping "
+            f"of {qubit_mapping.n_qubits} qubits."
+        )
+    return _remap_qubits(
+        circuit,
+        dict(enumerate(qubit_mapping.to_physical)),
+        max(qubit_mapping.to_physical, default=-1) + 1,
+    )
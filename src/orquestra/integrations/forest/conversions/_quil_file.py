@@ -0,0 +1,124 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Importing orquestra circuits from Quil files, without loading whole files at once.
+
+The file is read twice: first to collect gate definitions, then to convert gate
+instructions in batches of statements. Hence, at any time only a single batch of
+pyquil instructions is kept in memory.
+"""
+import os
+from typing import Dict, Iterable, Iterator, List, TextIO, Union
+
+import pyquil
+from orquestra.quantum.circuits import _circuit, _gates
+
+from ._circuit_conversions import _import_gate, _import_gate_def, _import_handlers
+
+DEFAULT_BATCH_SIZE = 1000
+
+_INDENTATION = (" ", "\t")
+
+
+def import_from_quil_file(
+    path: Union[str, os.PathLike], batch_size: int = DEFAULT_BATCH_SIZE
+) -> _circuit.Circuit:
+    """Import circuit from a Quil file, reading it incrementally.
+
+    The result is the same as importing the program parsed from the whole file
+    with `import_from_pyquil`.
+
+    Args:
+        path: path to the Quil file.
+        batch_size: number of statements parsed by pyquil at once.
+    """
+    return _circuit.Circuit(iter_operations_from_quil_file(path, batch_size))
+
+
+def iter_operations_from_quil_file(
+    path: Union[str, os.PathLike], batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[_gates.GateOperation]:
+    """Lazily import gate operations from a Quil file.
+
+    Args:
+        path: path to the Quil file.
+        batch_size: number of statements parsed by pyquil at once.
+
+    Returns:
+        Iterator yielding gate operations in the order they appear in the file.
+        Instructions other than gates are skipped, like in `import_from_pyquil`.
+    """
+    if batch_size < 1:
+        raise ValueError(f"Batch size has to be positive, got {batch_size}.")
+
+    return _iter_operations(path, batch_size)
+
+
+def _iter_operations(
+    path: Union[str, os.PathLike], batch_size: int
+) -> Iterator[_gates.GateOperation]:
+    with open(path) as f:
+        custom_defs = _import_gate_defs(
+            statement for statement in _read_statements(f) if _is_gate_def(statement)
+        )
+
+    import_handlers = _import_handlers(custom_defs)
+    with open(path) as f:
+        statements = (
+            statement
+            for statement in _read_statements(f)
+            if not _is_gate_def(statement)
+        )
+        for batch in _batched(statements, batch_size):
+            for instr in pyquil.Program("".join(batch)).instructions:
+                if isinstance(instr, pyquil.gates.Gate):
+                    yield _import_gate(instr, import_handlers)
+
+
+def _read_statements(file: TextIO) -> Iterator[str]:
+    # Statement is a non-indented line, followed by indented lines of its body
+    # (e.g. rows of a DEFGATE matrix).
+    statement_lines: List[str] = []
+    for line in file:
+        if not line.strip():
+            continue
+        if not line.endswith("\n"):
+            line += "\n"
+        if line.startswith(_INDENTATION) and statement_lines:
+            statement_lines.append(line)
+        else:
+            if statement_lines:
+                yield "".join(statement_lines)
+            statement_lines = [line]
+    if statement_lines:
+        yield "".join(statement_lines)
+
+
+def _is_gate_def(statement: str) -> bool:
+    return statement.startswith("DEFGATE")
+
+
+def _import_gate_defs(
+    statements: Iterable[str],
+) -> Dict[str, _gates.CustomGateDefinition]:
+    custom_defs: Dict[str, _gates.CustomGateDefinition] = {}
+    for statement in statements:
+        for gate_def in pyquil.Program(statement).defined_gates:
+            if gate_def.name in custom_defs:
+                raise ValueError(
+                    "Can't import circuits with non-unique gate definition names to "
+                    f"orquestra: {gate_def.name}"
+                )
+            custom_defs[gate_def.name] = _import_gate_def(gate_def)
+    return custom_defs
+
+
+def _batched(statements: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    batch = []
+    for statement in statements:
+        batch.append(statement)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
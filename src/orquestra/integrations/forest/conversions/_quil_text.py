@@ -0,0 +1,90 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Exporting orquestra circuits directly to Quil text.
+
+The text produced here is the same as `export_to_pyquil(circuit).out()`, but it is
+emitted without constructing pyquil instructions for every gate operation. If
+`pyquil.Program` is needed, it can be obtained with a single parse of the text,
+i.e. `pyquil.Program(export_to_quil_string(circuit))`. Note that the parser reads
+complex numbers in DEFGATE matrices as equivalent arithmetic expressions.
+"""
+import os
+from functools import singledispatch
+from typing import Collection, Iterator, TextIO, Union
+
+from orquestra.quantum.circuits import _circuit, _gates
+
+from ._circuit_conversions import (
+    _export_expression_as_quil_text,
+    _export_gate_definitions,
+    _GateDefinitionsCache,
+    _is_supported_by_pyquil,
+)
+
+
+def export_to_quil_string(circuit: _circuit.Circuit) -> str:
+    """Export circuit to Quil text, equal to `export_to_pyquil(circuit).out()`."""
+    return "".join(_quil_lines(circuit, _GateDefinitionsCache()))
+
+
+def write_quil(circuit: _circuit.Circuit, file: Union[str, os.PathLike, TextIO]):
+    """Write Quil text of the circuit, streaming it line by line.
+
+    Args:
+        circuit: circuit to export.
+        file: path of the file to write to, or a file-like object opened for writing
+            text.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "w") as f:
+            f.writelines(_quil_lines(circuit, _GateDefinitionsCache()))
+    else:
+        file.writelines(_quil_lines(circuit, _GateDefinitionsCache()))
+
+
+def _quil_lines(
+    circuit: _circuit.Circuit, gate_defs_cache: _GateDefinitionsCache
+) -> Iterator[str]:
+    for param_name in sorted(map(str, circuit.free_symbols)):
+        yield f"DECLARE {param_name} REAL[1]\n"
+
+    pyquil_gate_definitions, _ = _export_gate_definitions(circuit, gate_defs_cache)
+    for pyquil_gate_def in pyquil_gate_definitions.values():
+        yield pyquil_gate_def.out() + "\n"
+
+    custom_gate_names = pyquil_gate_definitions.keys()
+    for op in circuit.operations:
+        yield (
+            _gate_quil_text(op.gate, custom_gate_names)
+            + " "
+            + " ".join(map(str, op.qubit_indices))
+            + "\n"
+        )
+
+
+@singledispatch
+def _gate_quil_text(gate: _gates.Gate, custom_gate_names: Collection[str]) -> str:
+    if not _is_supported_by_pyquil(gate) and gate.name not in custom_gate_names:
+        raise ValueError(
+            f"Can't export {gate} as custom gate, custom gate definition is missing"
+        )
+    if not gate.params:
+        return gate.name
+    return (
+        f"{gate.name}({', '.join(map(_export_expression_as_quil_text, gate.params))})"
+    )
+
+
+@_gate_quil_text.register
+def _controlled_gate_quil_text(
+    gate: _gates.ControlledGate, custom_gate_names: Collection[str]
+) -> str:
+    return "CONTROLLED " * gate.num_control_qubits + _gate_quil_text(
+        gate.wrapped_gate, custom_gate_names
+    )
+
+
+@_gate_quil_text.register
+def _dagger_quil_text(gate: _gates.Dagger, custom_gate_names: Collection[str]) -> str:
+    return "DAGGER " + _gate_quil_text(gate.wrapped_gate, custom_gate_names)
@@ -0,0 +1,4 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+from ._statevector import simulate_wavefunction, simulate_wavefunctions
@@ -0,0 +1,275 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+"""Local statevector simulation of pyquil programs, implemented with NumPy.
+
+The state of n qubits is kept as an array of shape `(batch, 2, ..., 2)`, with one
+axis per qubit. Gates are applied by contracting their matrices with the axes of
+the qubits they act on. Following pyquil conventions,
+qubit 0 is the least significant bit of amplitude indices.
+
+Parameters of gates are evaluated for all parameter sets of a batch at once. Gates
+with parameters that are the same for every parameter set (e.g. numbers) are
+applied as a single matrix, otherwise a stack of matrices, one per parameter set,
+is used.
+"""
+from functools import singledispatch
+from numbers import Number
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pyquil
+from pyquil import quilatom
+from pyquil.simulation.matrices import QUANTUM_GATES
+
+MemoryMap = Mapping[str, Sequence[float]]
+
+
+class _Memory:
+    """Values of classical memory regions, one row per parameter set."""
+
+    def __init__(self, memory_maps: Sequence[MemoryMap]):
+        self.batch_size = len(memory_maps)
+        self._memory_maps = memory_maps
+        self._regions: Dict[str, np.ndarray] = {}
+
+    def region(self, name: str) -> np.ndarray:
+        if name not in self._regions:
+            try:
+                rows = [memory_map[name] for memory_map in self._memory_maps]
+            except KeyError:
+                raise ValueError(
+                    f"Memory map doesn't contain values of memory region {name}."
+                )
+            self._regions[name] = np.array(rows, dtype=float).reshape(
+                self.batch_size, -1
+            )
+        return self._regions[name]
+
+
+@singledispatch
+def _evaluate(expression, memory: _Memory, parameters: Mapping[str, np.ndarray]):
+    raise NotImplementedError(
+        f"Expression {expression} of type {type(expression)} is currently not supported"
+    )
+
+
+@_evaluate.register
+def _evaluate_number(number: Number, memory, parameters):
+    return number
+
+
+@_evaluate.register
+def _evaluate_parameter(parameter: quilatom.Parameter, memory, parameters):
+    # This package declares a memory region for every symbol and refers to it as a
+    # parameter with the same name.
+    if parameter.name in parameters:
+        return parameters[parameter.name]
+    return memory.region(parameter.name)[:, 0]
+
+
+@_evaluate.register
+def _evaluate_memory_reference(reference: quilatom.MemoryReference, memory, parameters):
+    return memory.region(reference.name)[:, reference.offset]
+
+
+@_evaluate.register
+def _evaluate_function(function: quilatom.Function, memory, parameters):
+    return function.fn(_evaluate(function.expression, memory, parameters))
+
+
+@_evaluate.register
+def _evaluate_binary_expression(expression: quilatom.BinaryExp, memory, parameters):
+    return expression.fn(
+        _evaluate(expression.op1, memory, parameters),
+        _evaluate(expression.op2, memory, parameters),
+    )
+
+
+def _real_if_close(value):
+    # Numbers in pyquil instructions are complex, even if they were given as floats.
+    return np.real_if_close(np.asarray(value, dtype=complex))
+
+
+def _stack_if_varying(values: Sequence, batch_size: int):
+    """Return single value if all values are the same, otherwise (batch, ...) array."""
+    arrays = [np.broadcast_to(value, (batch_size,)) for value in values]
+    if all((array == array[0]).all() for array in arrays):
+        return [array[0] for array in arrays], False
+    return arrays, True
+
+
+def _builtin_matrix(name: str, params: Sequence, batch_size: int) -> np.ndarray:
+    factory = QUANTUM_GATES[name]
+    if not params:
+        return np.asarray(factory, dtype=complex)
+    values, is_varying = _stack_if_varying(params, batch_size)
+    if not is_varying:
+        return np.asarray(factory(*values), dtype=complex)
+    return np.stack([np.asarray(factory(*row), dtype=complex) for row in zip(*values)])
+
+
+def _defined_gate_matrix(
+    gate_def: pyquil.quilbase.DefGate, params: Sequence, memory: _Memory
+) -> np.ndarray:
+    parameters = {
+        parameter.name: value for parameter, value in zip(gate_def.parameters, params)
+    }
+    elements = [
+        np.broadcast_to(
+            _real_if_close(_evaluate(element, memory, parameters)),
+            (memory.batch_size,),
+        )
+        for element in gate_def.matrix.flat
+    ]
+    matrices = np.stack(elements, axis=-1).reshape(
+        memory.batch_size, *gate_def.matrix.shape
+    )
+    if (matrices == matrices[0]).all():
+        return matrices[0]
+    return matrices
+
+
+def _dagger(matrix: np.ndarray) -> np.ndarray:
+    return np.conj(np.swapaxes(matrix, -1, -2))
+
+
+def _controlled(matrix: np.ndarray) -> np.ndarray:
+    dim = matrix.shape[-1]
+    result = np.zeros(matrix.shape[:-2] + (2 * dim, 2 * dim), dtype=complex)
+    result[..., :dim, :dim] = np.eye(dim)
+    result[..., dim:, dim:] = matrix
+    return result
+
+
+def _gate_matrix(
+    gate: pyquil.gates.Gate,
+    gate_defs: Mapping[str, pyquil.quilbase.DefGate],
+    memory: _Memory,
+) -> np.ndarray:
+    if not set(gate.modifiers) <= {"CONTROLLED", "DAGGER"}:
+        raise NotImplementedError(f"Simulating gate {gate} is unsupported.")
+    params = [_real_if_close(_evaluate(param, memory, {})) for param in gate.params]
+    if gate.name in gate_defs:
+        matrix = _defined_gate_matrix(gate_defs[gate.name], params, memory)
+    elif gate.name in QUANTUM_GATES:
+        matrix = _builtin_matrix(gate.name, params, memory.batch_size)
+    else:
+        raise ValueError(f"Gate {gate.name} is neither built-in nor defined.")
+
+    # Modifiers are listed from the outermost one.
+    for modifier in reversed(gate.modifiers):
+        if modifier == "DAGGER":
+            matrix = _dagger(matrix)
+        else:
+            matrix = _controlled(matrix)
+    return matrix
+
+
+def _apply_matrix(
+    state: np.ndarray, matrix: np.ndarray, qubits: Sequence[int], n_qubits: int
+) -> np.ndarray:
+    k = len(qubits)
+    # Axis 0 is the batch, the last axis corresponds to qubit 0. Axes of target
+    # qubits are moved to the end, in the order of gate's qubits, so that they
+    # form the index of the gate's matrix.
+    target_axes = [n_qubits - qubit for qubit in qubits]
+    moved_axes = list(range(n_qubits + 1 - k, n_qubits + 1))
+    moved = np.moveaxis(state, target_axes, moved_axes)
+    # Matrix of shape (2**k, 2**k) is shared by the whole batch, while a stack of
+    # shape (batch, 2**k, 2**k) has a matrix for each parameter set.
+    result = np.matmul(
+        moved.reshape(len(state), -1, 2**k), np.swapaxes(matrix, -1, -2)
+    )
+    return np.moveaxis(result.reshape(moved.shape), moved_axes, target_axes)
+
+
+def _n_qubits(gates: Sequence[pyquil.gates.Gate]) -> int:
+    return (
+        max((qubit for gate in gates for qubit in gate.get_qubit_indices()), default=-1)
+        + 1
+    )
+
+
+def _gates_to_simulate(program: pyquil.Program) -> List[pyquil.gates.Gate]:
+    gates = []
+    for instruction in program.instructions:
+        if isinstance(instruction, pyquil.gates.Gate):
+            gates.append(instruction)
+        elif not isinstance(
+            instruction, (pyquil.quilbase.Declare, pyquil.quilbase.Pragma)
+        ):
+            raise NotImplementedError(
+                f"Simulating instruction {instruction} is unsupported."
+            )
+    return gates
+
+
+def simulate_wavefunctions(
+    program: pyquil.Program,
+    memory_maps: Sequence[MemoryMap],
+    n_qubits: Optional[int] = None,
+) -> np.ndarray:
+    """Simulate program for a batch of parameter sets, starting from |0...0>.
+
+    Supported are gates, either built into Quil or defined with DEFGATE, optionally
+    with CONTROLLED and DAGGER modifiers, declarations of memory and pragmas, which
+    are ignored. Gate parameters can refer to memory regions (e.g. `theta[1]`), and
+    parameters named after memory regions (e.g. `%theta`) refer to their first
+    element, as in programs exported by `export_to_pyquil`.
+
+    Args:
+        program: program to simulate.
+        memory_maps: values of memory regions, one mapping per parameter set, as in
+            `memory_map` of pyquil's `QAM.run`.
+        n_qubits: number of qubits to simulate. Defaults to the largest qubit index
+            used by the program plus one.
+
+    Returns:
+        Array of shape `(len(memory_maps), 2 ** n_qubits)` of final wavefunctions.
+        Qubit 0 corresponds to the least significant bit of amplitude indices. For
+        an empty batch, the array has no rows and nothing is simulated.
+
+    Raises:
+        NotImplementedError: if program contains unsupported instructions, e.g.
+            measurements.
+    """
+    gates = _gates_to_simulate(program)
+    gate_defs = {gate_def.name: gate_def for gate_def in program.defined_gates}
+    used_qubits = _n_qubits(gates)
+    if n_qubits is None:
+        n_qubits = used_qubits
+    elif n_qubits < used_qubits:
+        raise ValueError(
+            f"Program acts on {used_qubits} qubits, can't simulate it on {n_qubits}."
+        )
+
+    if not memory_maps:
+        return np.zeros((0, 2**n_qubits), dtype=complex)
+
+    memory = _Memory(memory_maps)
+    state = np.zeros((memory.batch_size,) + (2,) * n_qubits, dtype=complex)
+    state[(slice(None),) + (0,) * n_qubits] = 1
+    for gate in gates:
+        state = _apply_matrix(
+            state,
+            _gate_matrix(gate, gate_defs, memory),
+            gate.get_qubit_indices(),
+            n_qubits,
+        )
+    return state.reshape(memory.batch_size, 2**n_qubits)
+
+
+def simulate_wavefunction(
+    program: pyquil.Program,
+    memory_map: Optional[MemoryMap] = None,
+    n_qubits: Optional[int] = None,
+) -> np.ndarray:
+    """Simulate program for a single parameter set, starting from |0...0>.
+
+    See `simulate_wavefunctions` for details.
+
+    Returns:
+        Final wavefunction as an array of `2 ** n_qubits` amplitudes.
+    """
+    return simulate_wavefunctions(program, [memory_map or {}], n_qubits)[0]
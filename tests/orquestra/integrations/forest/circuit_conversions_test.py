@@ -1,6 +1,8 @@
 ################################################################################
 # © Copyright 2021-2022 Zapata Computing Inc.
 ################################################################################
+import pickle
+
 import numpy as np
 import pyquil
 import pytest
@@ -8,8 +10,13 @@ import sympy
 from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
 
 from orquestra.integrations.forest.conversions import (
+    LazyCircuit,
+    _circuit_conversions,
+    clear_gate_definition_cache,
+    export_many_to_pyquil,
     export_to_pyquil,
     import_from_pyquil,
+    prewarm_gate_definitions,
 )
 
 SYMPY_GAMMA = sympy.Symbol("gamma")
@@ -380,6 +387,67 @@ class TestExportingToPyQuil:
         )
 
 
+class TestExportingManyToPyQuil:
+    def test_exporting_many_circuits_gives_equivalent_circuits(self):
+        circuits, pyquil_circuits = zip(
+            *EQUIVALENT_CIRCUITS, *EQUIVALENT_PARAMETRIZED_CIRCUITS
+        )
+
+        exported = list(export_many_to_pyquil(circuits))
+
+        assert exported == list(pyquil_circuits)
+
+    def test_gate_definitions_are_exported_once_per_batch(self, monkeypatch):
+        clear_gate_definition_cache()
+        calls = []
+        export_gate_def = _circuit_conversions._export_orquestra_gate_definition
+
+        def _spy(gate_def):
+            calls.append(gate_def.gate_name)
+            return export_gate_def(gate_def)
+
+        monkeypatch.setattr(
+            _circuit_conversions, "_export_orquestra_gate_definition", _spy
+        )
+        circuits = [
+            _circuit.Circuit(
+                [SQRT_X_DEF()(0), _builtin_gates.XX(0.1 * i)(0, 1), SQRT_X_DEF()(1)]
+            )
+            for i in range(5)
+        ]
+
+        exported = list(export_many_to_pyquil(circuits))
+
+        assert sorted(calls) == ["SQRT-X", "XX"]
+        assert exported == [export_to_pyquil(circuit) for circuit in circuits]
+
+    def test_different_definitions_with_the_same_name_are_not_mixed_up(self):
+        other_sqrt_x_def = _gates.CustomGateDefinition(
+            "SQRT-X",
+            sympy.Matrix([[0.5 - 0.5j, 0.5 + 0.5j], [0.5 + 0.5j, 0.5 - 0.5j]]),
+            tuple(),
+        )
+        circuits = [
+            _circuit.Circuit([SQRT_X_DEF()(0)]),
+            _circuit.Circuit([other_sqrt_x_def()(0)]),
+            _circuit.Circuit([SQRT_X_DEF()(0)]),
+        ]
+
+        exported = list(export_many_to_pyquil(circuits))
+
+        assert exported == [export_to_pyquil(circuit) for circuit in circuits]
+        assert exported[0] != exported[1]
+
+    def test_circuits_are_exported_lazily(self):
+        def _circuits():
+            yield _circuit.Circuit([_builtin_gates.X(0)])
+            raise RuntimeError("Second circuit should not be requested")
+
+        exported = export_many_to_pyquil(_circuits())
+
+        assert next(exported) == pyquil.Program([pyquil.gates.X(0)])
+
+
 class TestImportingFromPyQuil:
     @pytest.mark.parametrize(
         "orquestra_circuit, pyquil_circuit",
@@ -390,3 +458,265 @@ class TestImportingFromPyQuil:
     ):
         imported = import_from_pyquil(pyquil_circuit)
         assert imported == orquestra_circuit
+
+
+class TestImportingLazily:
+    @pytest.fixture
+    def imported_gates(self, monkeypatch):
+        imported = []
+        import_gate = _circuit_conversions._import_gate
+
+        def _spy(instruction, import_handlers):
+            imported.append(instruction.name)
+            return import_gate(instruction, import_handlers)
+
+        monkeypatch.setattr(_circuit_conversions, "_import_gate", _spy)
+        return imported
+
+    @pytest.mark.parametrize(
+        "orquestra_circuit, pyquil_circuit",
+        [*EQUIVALENT_CIRCUITS, *EQUIVALENT_PARAMETRIZED_CIRCUITS],
+    )
+    def test_lazily_imported_circuit_is_equal_to_eagerly_imported_one(
+        self, orquestra_circuit, pyquil_circuit
+    ):
+        imported = import_from_pyquil(pyquil_circuit, lazy=True)
+
+        assert isinstance(imported, LazyCircuit)
+        assert imported == orquestra_circuit
+        assert orquestra_circuit == imported
+        assert imported.free_symbols == orquestra_circuit.free_symbols
+
+    def test_n_qubits_and_free_symbols_dont_require_importing_gates(
+        self, imported_gates
+    ):
+        program = pyquil.Program(
+            pyquil.quil.Declare("gamma", "REAL"),
+            pyquil.gates.RX(2 * QUIL_GAMMA, 0),
+            pyquil.gates.CNOT(0, 4),
+        )
+
+        imported = import_from_pyquil(program, lazy=True)
+
+        assert imported.n_qubits == 5
+        assert imported.free_symbols == [SYMPY_GAMMA]
+        assert imported_gates == []
+
+    def test_operations_are_imported_once_on_first_access(self, imported_gates):
+        program = pyquil.Program(
+            [pyquil.gates.X(0), pyquil.gates.Y(1), pyquil.gates.Z(2)]
+        )
+        imported = import_from_pyquil(program, lazy=True)
+
+        first = imported.operations[1]
+        assert imported.operations[1] is first
+        assert imported.operations[-1] == _builtin_gates.Z(2)
+        assert imported.operations[:2] == [_builtin_gates.X(0), first]
+
+        assert imported_gates == ["Y", "Z", "X"]
+        assert len(imported.operations) == 3
+
+    def test_gate_definitions_are_imported_only_when_used(self, monkeypatch):
+        imported_defs = []
+        import_gate_def = _circuit_conversions._import_gate_def
+
+        def _spy(gate_def):
+            imported_defs.append(gate_def.name)
+            return import_gate_def(gate_def)
+
+        monkeypatch.setattr(_circuit_conversions, "_import_gate_def", _spy)
+        program = export_to_pyquil(
+            _circuit.Circuit(
+                [_builtin_gates.X(0), SQRT_X_DEF()(0), CUSTOM_PARAMETRIC_DEF(0.5)(1)]
+            )
+        )
+        imported = import_from_pyquil(program, lazy=True)
+
+        imported.operations[1]
+
+        assert imported_defs == ["SQRT-X"]
+
+    def test_derived_circuits_are_regular_circuits(self):
+        program = pyquil.Program(
+            pyquil.quil.Declare("gamma", "REAL"), pyquil.gates.RX(QUIL_GAMMA, 0)
+        )
+        imported = import_from_pyquil(program, lazy=True)
+        expected = _circuit.Circuit([_builtin_gates.RX(SYMPY_GAMMA)(0)])
+
+        for derived, expected_circuit in [
+            (imported.bind({SYMPY_GAMMA: 0.5}), expected.bind({SYMPY_GAMMA: 0.5})),
+            (imported.inverse(), expected.inverse()),
+            (imported + _builtin_gates.X(1), expected + _builtin_gates.X(1)),
+            (pickle.loads(pickle.dumps(imported)), expected),
+            (imported.to_circuit(), expected),
+        ]:
+            assert type(derived) is _circuit.Circuit
+            assert derived == expected_circuit
+
+    def test_empty_program_gives_empty_circuit(self):
+        imported = import_from_pyquil(pyquil.Program(), lazy=True)
+
+        assert imported.n_qubits == 0
+        assert imported == _circuit.Circuit()
+
+
+class TestGateDispatch:
+    @pytest.mark.parametrize(
+        "resolver_name, convert",
+        [
+            ("_resolve_export_handler", export_to_pyquil),
+            (
+                "_resolve_import_handler",
+                lambda circuit: import_from_pyquil(export_to_pyquil(circuit)),
+            ),
+        ],
+    )
+    def test_handlers_are_resolved_once_per_gate_name(
+        self, monkeypatch, resolver_name, convert
+    ):
+        resolved = []
+        resolve = getattr(_circuit_conversions, resolver_name)
+
+        def _spy(name, *args):
+            resolved.append(name)
+            return resolve(name, *args)
+
+        monkeypatch.setattr(_circuit_conversions, resolver_name, _spy)
+        circuit = _circuit.Circuit(
+            [
+                op
+                for i in range(10)
+                for op in (
+                    SQRT_X_DEF()(i),
+                    _builtin_gates.X(i),
+                    _builtin_gates.X.controlled(1)(i, i + 1),
+                )
+            ]
+        )
+
+        convert(circuit)
+
+        assert sorted(resolved) == ["SQRT-X", "X"]
+
+    def test_exporting_different_definitions_with_the_same_name_raises(self):
+        other_sqrt_x_def = _gates.CustomGateDefinition(
+            "SQRT-X",
+            sympy.Matrix([[0.5 - 0.5j, 0.5 + 0.5j], [0.5 + 0.5j, 0.5 - 0.5j]]),
+            tuple(),
+        )
+        circuit = _circuit.Circuit([SQRT_X_DEF()(0), other_sqrt_x_def()(1)])
+
+        with pytest.raises(ValueError):
+            export_to_pyquil(circuit)
+
+    def test_importing_gate_without_definition_raises(self):
+        program = pyquil.Program([pyquil.gates.Gate("UNKNOWN", [], [0])])
+
+        with pytest.raises(NotImplementedError):
+            import_from_pyquil(program)
+
+
+class TestUnsupportedBuiltinGateDefinitions:
+    @pytest.fixture
+    def computed_defs(self, monkeypatch):
+        clear_gate_definition_cache()
+        computed = []
+        compute = _circuit_conversions._gate_definition_from_matrix_factory_gate
+
+        def _spy(gate):
+            computed.append(gate.name)
+            return compute(gate)
+
+        monkeypatch.setattr(
+            _circuit_conversions, "_gate_definition_from_matrix_factory_gate", _spy
+        )
+        yield computed
+        clear_gate_definition_cache()
+
+    def test_definitions_are_computed_once_per_process(self, computed_defs):
+        circuit = _circuit.Circuit(
+            [_builtin_gates.XX(0.1)(0, 1), _builtin_gates.U3(0.1, 0.2, 0.3)(1)]
+        )
+
+        first = export_to_pyquil(circuit)
+        second = export_to_pyquil(circuit)
+
+        assert sorted(computed_defs) == ["U3", "XX"]
+        assert first == second
+
+    def test_prewarming_computes_all_unsupported_builtin_gates(self, computed_defs):
+        prewarm_gate_definitions()
+        prewarmed = sorted(computed_defs)
+
+        export_to_pyquil(_circuit.Circuit([_builtin_gates.ZZ(0.5)(0, 1)]))
+
+        assert {"MS", "RH", "SX", "U3", "XX", "YY", "ZZ"} <= set(prewarmed)
+        assert sorted(computed_defs) == prewarmed
+
+    def test_prewarming_given_gates_skips_supported_ones(self, computed_defs):
+        prewarm_gate_definitions(
+            [
+                _builtin_gates.X,
+                _builtin_gates.RX(0.1),
+                _builtin_gates.YY(0.2).controlled(1),
+                SQRT_X_DEF(),
+            ]
+        )
+
+        assert computed_defs == ["YY"]
+
+    def test_export_with_prewarmed_definitions_is_unchanged(self):
+        clear_gate_definition_cache()
+        prewarm_gate_definitions()
+
+        exported = export_to_pyquil(
+            _circuit.Circuit([_builtin_gates.U3(np.pi / 2, np.pi / 4, 0)(3)])
+        )
+
+        assert exported == pyquil.Program(
+            [PYQUIL_U3, PYQUIL_U3.get_constructor()(np.pi / 2, np.pi / 4, 0)(3)]
+        )
+
+
+class TestConvertingGateDefinitionMatrices:
+    @pytest.mark.parametrize(
+        "number",
+        [0j, -0j, 1 + 0j, -0.5 + 0j, 1j, -1j, 0.25j, 0.5 + 0.5j, -0.3 - 1j, 1e-20 + 3j],
+    )
+    def test_imported_numbers_are_identical_to_sympified_ones(self, number):
+        imported = _circuit_conversions._import_matrix(np.array([[number]]))
+
+        assert sympy.srepr(imported[0, 0]) == sympy.srepr(sympy.sympify(number))
+
+    def test_numeric_matrix_is_exported_as_complex_array(self):
+        matrix = sympy.Matrix(
+            [[sympy.sqrt(2) / 2, sympy.I * sympy.sqrt(2) / 2], [0.5 - 0.5j, 1]]
+        )
+
+        exported = _circuit_conversions._export_matrix(matrix)
+
+        assert exported.dtype == complex
+        np.testing.assert_allclose(exported, np.array(matrix, dtype=complex))
+
+    def test_only_elements_with_parameters_are_exported_as_expressions(self):
+        matrix = sympy.Matrix([[sympy.cos(SYMPY_GAMMA), 0.5 + 0.5j], [1, 2 * sympy.I]])
+
+        exported = _circuit_conversions._export_matrix(matrix)
+
+        assert exported == [
+            [pyquil.quilatom.quil_cos(QUIL_GAMMA), 0.5 + 0.5j],
+            [1 + 0j, 2j],
+        ]
+
+    def test_numeric_gate_definition_round_trips(self):
+        matrix = np.linalg.qr(
+            np.arange(16).reshape(4, 4) + 1j * np.arange(16).reshape(4, 4).T
+        )[0]
+        gate_def = _gates.CustomGateDefinition(
+            "NUMERIC", sympy.Matrix(matrix.tolist()), tuple()
+        )
+        circuit = _circuit.Circuit([gate_def()(0, 1)])
+
+        imported = import_from_pyquil(export_to_pyquil(circuit))
+
+        assert imported == circuit
@@ -0,0 +1,191 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import pickle
+
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from orquestra.integrations.forest.conversions import (
+    CircuitColumns,
+    GateKind,
+    circuit_to_columns,
+    columns_to_pyquil,
+    export_to_pyquil,
+    import_from_pyquil,
+    pyquil_to_columns,
+)
+
+THETA, GAMMA = sympy.symbols("theta, gamma")
+
+SQRT_X_DEF = _gates.CustomGateDefinition(
+    "SQRT-X",
+    sympy.Matrix([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]]),
+    tuple(),
+)
+
+CUSTOM_PARAMETRIC_DEF = _gates.CustomGateDefinition(
+    "CUSTOM-PARAMETRIC",
+    sympy.Matrix(
+        [
+            [sympy.cos(GAMMA), sympy.sin(GAMMA)],
+            [-sympy.sin(GAMMA), sympy.cos(GAMMA)],
+        ]
+    ),
+    (GAMMA,),
+)
+
+CIRCUITS = [
+    _circuit.Circuit([], 0),
+    _circuit.Circuit([_builtin_gates.X(2), _builtin_gates.Y(0)]),
+    _circuit.Circuit([_builtin_gates.RX(np.pi)(1), _builtin_gates.CNOT(3, 1)]),
+    _circuit.Circuit([_builtin_gates.RX(0.5).dagger.controlled(2)(3, 1, 2)]),
+    _circuit.Circuit([_builtin_gates.RX(0.5).controlled(2).dagger(3, 1, 2)]),
+    _circuit.Circuit([SQRT_X_DEF()(3), _builtin_gates.XX(np.pi)(2, 0)]),
+    _circuit.Circuit([_builtin_gates.U3(np.pi / 2, np.pi / 4, 0).controlled(1)(2, 3)]),
+    _circuit.Circuit(
+        [
+            _builtin_gates.RZ(2 * THETA + 1)(1),
+            _builtin_gates.RY(THETA / 3)(0),
+            _builtin_gates.RX(THETA - GAMMA)(2),
+            _builtin_gates.PHASE(3 * np.pi / 4)(0),
+            _builtin_gates.XY(sympy.Rational(1, 3))(0, 1),
+            _builtin_gates.RX(2)(0),
+        ]
+    ),
+    _circuit.Circuit(
+        [
+            CUSTOM_PARAMETRIC_DEF(THETA**2)(0),
+            SQRT_X_DEF()(1),
+            _builtin_gates.ZZ(GAMMA).controlled(1)(0, 2, 1),
+            _builtin_gates.U3(THETA, 0.1, GAMMA).dagger(3),
+            _builtin_gates.SWAP.controlled(2)(4, 3, 0, 1),
+        ]
+    ),
+]
+
+
+class TestCircuitToColumns:
+    def test_operations_are_stored_in_columns(self):
+        circuit = _circuit.Circuit(
+            [
+                _builtin_gates.RX(0.5)(0),
+                _builtin_gates.CNOT(0, 2),
+                _builtin_gates.U3(0.1, THETA, 0.3).dagger.controlled(1)(1, 0),
+                _builtin_gates.RX(0.25)(2),
+            ]
+        )
+
+        columns = circuit_to_columns(circuit)
+
+        assert columns.gate_kinds == (
+            GateKind("RX"),
+            GateKind("CNOT"),
+            GateKind("U3", ("CONTROLLED", "DAGGER")),
+        )
+        np.testing.assert_array_equal(columns.gate_ids, [0, 1, 2, 0])
+        np.testing.assert_array_equal(columns.qubit_offsets, [0, 1, 3, 5, 6])
+        np.testing.assert_array_equal(columns.qubits, [0, 0, 2, 1, 0, 2])
+        np.testing.assert_array_equal(columns.param_offsets, [0, 1, 1, 4, 5])
+        np.testing.assert_array_equal(columns.params, [0.5, 0.1, np.nan, 0.3, 0.25])
+        np.testing.assert_array_equal(columns.symbolic_param_positions, [2])
+        assert columns.symbolic_params == (THETA,)
+        assert columns.n_qubits == 3
+        assert columns.n_operations == 4
+        assert columns.free_symbols == [THETA]
+
+    def test_custom_gate_definitions_are_collected(self):
+        circuit = _circuit.Circuit(
+            [SQRT_X_DEF()(0), CUSTOM_PARAMETRIC_DEF(0.5)(1), SQRT_X_DEF()(1)]
+        )
+
+        columns = circuit_to_columns(circuit)
+
+        assert columns.gate_definitions == (CUSTOM_PARAMETRIC_DEF, SQRT_X_DEF)
+
+
+@pytest.mark.parametrize("circuit", CIRCUITS)
+class TestRoundTrips:
+    def test_columns_of_circuit_are_exported_like_circuit(self, circuit):
+        exported = columns_to_pyquil(circuit_to_columns(circuit))
+
+        assert exported == export_to_pyquil(circuit), exported.out()
+
+    def test_columns_of_exported_program_are_the_same_as_of_circuit(self, circuit):
+        program = export_to_pyquil(circuit)
+
+        columns = pyquil_to_columns(program)
+
+        assert columns_to_pyquil(columns) == program
+        np.testing.assert_array_equal(
+            columns.qubits, circuit_to_columns(circuit).qubits
+        )
+
+    def test_columns_survive_pickling(self, circuit):
+        columns = circuit_to_columns(circuit)
+
+        assert pickle.loads(pickle.dumps(columns)) == columns
+
+
+class TestPyquilToColumns:
+    def test_number_of_qubits_is_inferred_from_gates(self):
+        program = pyquil.Program(
+            pyquil.gates.X(0), pyquil.gates.CNOT(0, 5), pyquil.gates.MEASURE(0, None)
+        )
+
+        columns = pyquil_to_columns(program)
+
+        assert columns.n_qubits == 6
+        assert columns.n_operations == 2
+
+    def test_columns_describe_the_same_circuit_as_import(self):
+        program = export_to_pyquil(CIRCUITS[-1])
+
+        columns = pyquil_to_columns(program)
+
+        assert columns.n_qubits == import_from_pyquil(program).n_qubits
+        assert columns.free_symbols == sorted(
+            import_from_pyquil(program).free_symbols, key=str
+        )
+
+    def test_builtin_gates_missing_in_pyquil_round_trip_textually(self):
+        circuit = _circuit.Circuit(
+            [
+                _builtin_gates.XX(0.5)(0, 1),
+                _builtin_gates.MS(0.1, THETA)(1, 2),
+                SQRT_X_DEF()(0),
+            ]
+        )
+        program = export_to_pyquil(circuit)
+
+        columns = pyquil_to_columns(program)
+
+        assert columns == circuit_to_columns(circuit)
+        assert columns.gate_definitions == (SQRT_X_DEF,)
+        assert columns_to_pyquil(columns).out() == program.out()
+
+    def test_unsupported_modifiers_are_rejected(self):
+        program = pyquil.Program(pyquil.gates.RX(0.5, 0).forked(1, [0.25]))
+
+        with pytest.raises(NotImplementedError):
+            pyquil_to_columns(program)
+
+
+def test_exporting_gate_without_definition_raises_error():
+    gate = _gates.MatrixFactoryGate(
+        "UNKNOWN", lambda: sympy.Matrix([[1, 0], [0, 1]]), (), 1
+    )
+
+    with pytest.raises(ValueError):
+        columns_to_pyquil(circuit_to_columns(_circuit.Circuit([gate(0)])))
+
+
+def test_columns_with_different_params_are_not_equal():
+    first = circuit_to_columns(_circuit.Circuit([_builtin_gates.RX(0.5)(0)]))
+    second = circuit_to_columns(_circuit.Circuit([_builtin_gates.RX(0.25)(0)]))
+
+    assert first != second
+    assert isinstance(first, CircuitColumns)
@@ -0,0 +1,196 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import threading
+
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from orquestra.integrations.forest.conversions import (
+    ConversionCache,
+    ConversionCacheInfo,
+    export_to_pyquil,
+    import_from_pyquil,
+)
+
+THETA = sympy.Symbol("theta")
+
+
+def _circuit_with_rx(angle, qubit=0):
+    return _circuit.Circuit(
+        [_builtin_gates.RX(angle)(qubit), _builtin_gates.CNOT(0, 1)]
+    )
+
+
+def _custom_gate_circuit(matrix):
+    gate_def = _gates.CustomGateDefinition("CUSTOM", sympy.Matrix(matrix), tuple())
+    return _circuit.Circuit([gate_def()(0)])
+
+
+class TestExportingWithCache:
+    def test_equal_circuits_are_exported_once(self):
+        cache = ConversionCache()
+
+        first = export_to_pyquil(_circuit_with_rx(THETA), cache=cache)
+        second = export_to_pyquil(_circuit_with_rx(THETA), cache=cache)
+
+        assert first == second == export_to_pyquil(_circuit_with_rx(THETA))
+        assert cache.cache_info() == ConversionCacheInfo(
+            hits=1,
+            misses=1,
+            evictions=0,
+            maxsize=128,
+            currsize=1,
+            max_operations=None,
+            curroperations=3,
+        )
+
+    @pytest.mark.parametrize(
+        "first, second",
+        [
+            (_circuit_with_rx(0.5), _circuit_with_rx(0.25)),
+            (_circuit_with_rx(0.5), _circuit_with_rx(0.5, qubit=2)),
+            (_circuit_with_rx(THETA), _circuit_with_rx(2 * THETA)),
+            (
+                _custom_gate_circuit([[0, 1], [1, 0]]),
+                _custom_gate_circuit([[1, 0], [0, -1]]),
+            ),
+        ],
+    )
+    def test_circuits_with_different_content_are_cached_separately(self, first, second):
+        cache = ConversionCache()
+
+        export_to_pyquil(first, cache=cache)
+        exported = export_to_pyquil(second, cache=cache)
+
+        assert exported == export_to_pyquil(second)
+        assert cache.cache_info().misses == 2
+
+    def test_circuits_differing_only_in_number_of_qubits_share_result(self):
+        cache = ConversionCache()
+
+        export_to_pyquil(_circuit.Circuit([_builtin_gates.X(0)], 1), cache=cache)
+        export_to_pyquil(_circuit.Circuit([_builtin_gates.X(0)], 2), cache=cache)
+
+        assert cache.cache_info().hits == 1
+
+    def test_modifying_exported_program_does_not_affect_cache(self):
+        cache = ConversionCache()
+        circuit = _circuit_with_rx(0.5)
+
+        export_to_pyquil(circuit, cache=cache).inst(pyquil.gates.X(3))
+        export_to_pyquil(circuit, cache=cache).inst(pyquil.gates.Y(3))
+
+        assert export_to_pyquil(circuit, cache=cache) == export_to_pyquil(circuit)
+
+
+class TestImportingWithCache:
+    def test_programs_with_equal_text_are_imported_once(self):
+        cache = ConversionCache()
+        program = export_to_pyquil(_circuit_with_rx(THETA))
+
+        first = import_from_pyquil(program, cache=cache)
+        second = import_from_pyquil(program.copy(), cache=cache)
+
+        assert first == second == _circuit_with_rx(THETA)
+        assert cache.cache_info().hits == 1
+
+    def test_modifying_imported_circuit_does_not_affect_cache(self):
+        cache = ConversionCache()
+        program = export_to_pyquil(_circuit_with_rx(0.5))
+
+        import_from_pyquil(program, cache=cache).operations.append(_builtin_gates.X(0))
+
+        assert import_from_pyquil(program, cache=cache) == _circuit_with_rx(0.5)
+
+    def test_imports_and_exports_are_cached_separately(self):
+        cache = ConversionCache()
+        circuit = _circuit_with_rx(0.5)
+
+        import_from_pyquil(export_to_pyquil(circuit, cache=cache), cache=cache)
+
+        assert cache.cache_info().misses == 2
+        assert cache.cache_info().currsize == 2
+
+    def test_lazy_import_cannot_be_cached(self):
+        with pytest.raises(ValueError):
+            import_from_pyquil(pyquil.Program(), lazy=True, cache=ConversionCache())
+
+
+class TestEviction:
+    def test_least_recently_used_result_is_evicted_first(self):
+        cache = ConversionCache(maxsize=2)
+        circuits = [_circuit_with_rx(angle) for angle in (0.1, 0.2, 0.3)]
+
+        export_to_pyquil(circuits[0], cache=cache)
+        export_to_pyquil(circuits[1], cache=cache)
+        export_to_pyquil(circuits[0], cache=cache)
+        export_to_pyquil(circuits[2], cache=cache)
+        export_to_pyquil(circuits[0], cache=cache)
+        export_to_pyquil(circuits[1], cache=cache)
+
+        info = cache.cache_info()
+        assert (info.hits, info.misses, info.evictions) == (2, 4, 2)
+        assert info.currsize == 2
+
+    def test_results_are_evicted_when_total_size_is_exceeded(self):
+        cache = ConversionCache(max_operations=3)
+
+        export_to_pyquil(_circuit_with_rx(0.1), cache=cache)
+        export_to_pyquil(_circuit_with_rx(0.2), cache=cache)
+
+        info = cache.cache_info()
+        assert (info.currsize, info.curroperations, info.evictions) == (1, 2, 1)
+
+    def test_results_larger_than_total_size_are_not_cached(self):
+        cache = ConversionCache(max_operations=1)
+        circuit = _circuit_with_rx(0.1)
+
+        assert export_to_pyquil(circuit, cache=cache) == export_to_pyquil(circuit)
+        assert cache.cache_info().currsize == 0
+
+    def test_zero_sized_cache_does_not_cache(self):
+        cache = ConversionCache(maxsize=0)
+
+        export_to_pyquil(_circuit_with_rx(0.1), cache=cache)
+        export_to_pyquil(_circuit_with_rx(0.1), cache=cache)
+
+        assert cache.cache_info().misses == 2
+        assert cache.cache_info().currsize == 0
+
+    @pytest.mark.parametrize("kwargs", [{"maxsize": -1}, {"max_operations": -1}])
+    def test_negative_limits_are_rejected(self, kwargs):
+        with pytest.raises(ValueError):
+            ConversionCache(**kwargs)
+
+
+def test_clearing_cache_removes_results_and_statistics():
+    cache = ConversionCache()
+    export_to_pyquil(_circuit_with_rx(0.1), cache=cache)
+
+    cache.cache_clear()
+
+    assert cache.cache_info() == ConversionCacheInfo(0, 0, 0, 128, 0, None, 0)
+
+
+def test_cache_can_be_shared_between_threads():
+    cache = ConversionCache()
+    circuits = [_circuit_with_rx(angle) for angle in np.linspace(0, 1, 5)]
+    results = {}
+
+    def _export_all(thread_id):
+        results[thread_id] = [export_to_pyquil(c, cache=cache) for c in circuits]
+
+    threads = [threading.Thread(target=_export_all, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = [export_to_pyquil(circuit) for circuit in circuits]
+    assert all(programs == expected for programs in results.values())
+    assert cache.cache_info().currsize == 5
+    assert cache.cache_info().hits + cache.cache_info().misses == 20
@@ -0,0 +1,148 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import multiprocessing
+
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from orquestra.integrations.forest.conversions import (
+    DiskConversionCache,
+    _disk_cache,
+    export_to_pyquil,
+    import_from_pyquil,
+)
+
+THETA = sympy.Symbol("theta")
+
+SQRT_X_DEF = _gates.CustomGateDefinition(
+    "SQRT-X",
+    sympy.Matrix([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]]),
+    tuple(),
+)
+
+CIRCUITS = [
+    _circuit.Circuit([_builtin_gates.RX(angle)(0), _builtin_gates.CNOT(0, 1)])
+    for angle in (0.1, 0.2, 0.3)
+]
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = _FakeClock()
+    monkeypatch.setattr(_disk_cache.time, "time", fake_clock)
+    return fake_clock
+
+
+def _export_all(directory):
+    cache = DiskConversionCache(directory)
+    return [export_to_pyquil(circuit, cache=cache).out() for circuit in CIRCUITS]
+
+
+class TestDiskConversionCache:
+    @pytest.mark.parametrize(
+        "circuit",
+        [
+            CIRCUITS[0],
+            _circuit.Circuit(
+                [
+                    _builtin_gates.RY(2 * THETA)(1),
+                    SQRT_X_DEF()(0),
+                    _builtin_gates.RZ(0.5).controlled(1).dagger(0, 2),
+                ]
+            ),
+        ],
+    )
+    def test_programs_are_shared_between_cache_instances(self, tmp_path, circuit):
+        export_to_pyquil(circuit, cache=DiskConversionCache(tmp_path))
+        cache = DiskConversionCache(tmp_path)
+
+        program = export_to_pyquil(circuit, cache=cache)
+
+        assert import_from_pyquil(program) == circuit
+        assert cache.cache_info().hits == 1
+        assert cache.cache_info().misses == 0
+
+    def test_programs_exported_with_other_pyquil_version_are_not_used(
+        self, tmp_path, monkeypatch
+    ):
+        export_to_pyquil(CIRCUITS[0], cache=DiskConversionCache(tmp_path))
+        monkeypatch.setattr(
+            _disk_cache, "_distribution_version", lambda name: f"{name}-next"
+        )
+        cache = DiskConversionCache(tmp_path)
+
+        export_to_pyquil(CIRCUITS[0], cache=cache)
+
+        assert cache.cache_info().misses == 1
+        assert cache.cache_info().currsize == 2
+
+    def test_expired_programs_are_exported_again_and_evicted(self, tmp_path, clock):
+        cache = DiskConversionCache(tmp_path, max_age=60)
+        export_to_pyquil(CIRCUITS[0], cache=cache)
+        clock.now += 61
+
+        export_to_pyquil(CIRCUITS[0], cache=cache)
+        export_to_pyquil(CIRCUITS[1], cache=cache)
+
+        info = cache.cache_info()
+        assert (info.hits, info.misses, info.evictions) == (0, 3, 0)
+        assert info.currsize == 2
+
+        clock.now += 61
+        export_to_pyquil(CIRCUITS[2], cache=cache)
+
+        assert cache.cache_info().evictions == 2
+        assert cache.cache_info().currsize == 1
+
+    def test_oldest_programs_are_evicted_when_size_is_exceeded(self, tmp_path, clock):
+        program_size = len(export_to_pyquil(CIRCUITS[0]).out().encode())
+        cache = DiskConversionCache(tmp_path, max_bytes=2 * program_size)
+
+        for circuit in CIRCUITS:
+            export_to_pyquil(circuit, cache=cache)
+            clock.now += 1
+        export_to_pyquil(CIRCUITS[2], cache=cache)
+        export_to_pyquil(CIRCUITS[0], cache=cache)
+
+        info = cache.cache_info()
+        assert (info.hits, info.misses, info.evictions) == (1, 4, 2)
+        assert info.currbytes == 2 * program_size
+
+    def test_programs_larger_than_max_size_are_not_stored(self, tmp_path):
+        cache = DiskConversionCache(tmp_path, max_bytes=1)
+
+        program = export_to_pyquil(CIRCUITS[0], cache=cache)
+
+        assert program == export_to_pyquil(CIRCUITS[0])
+        assert cache.cache_info().currsize == 0
+
+    def test_clearing_cache_removes_programs_and_statistics(self, tmp_path):
+        cache = DiskConversionCache(tmp_path)
+        export_to_pyquil(CIRCUITS[0], cache=cache)
+
+        cache.cache_clear()
+
+        assert cache.cache_info() == (0, 0, 0, 0, 0)
+
+    @pytest.mark.parametrize("kwargs", [{"max_age": -1}, {"max_bytes": -1}])
+    def test_negative_limits_are_rejected(self, tmp_path, kwargs):
+        with pytest.raises(ValueError):
+            DiskConversionCache(tmp_path, **kwargs)
+
+    def test_cache_can_be_shared_between_processes(self, tmp_path):
+        with multiprocessing.Pool(4) as pool:
+            results = pool.map(_export_all, [tmp_path] * 8)
+
+        expected = [export_to_pyquil(circuit).out() for circuit in CIRCUITS]
+        assert all(programs == expected for programs in results)
+        assert DiskConversionCache(tmp_path).cache_info().currsize == len(CIRCUITS)
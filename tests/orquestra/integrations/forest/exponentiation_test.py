@@ -0,0 +1,170 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.operators import PauliSum as OrqPauliSum
+from orquestra.quantum.operators import PauliTerm as OrqPauliTerm
+from pyquil import gates as pyquil_gates
+from pyquil.paulis import exponential_map
+from pyquil.simulation.tools import lifted_pauli
+from scipy.linalg import expm
+
+from orquestra.integrations.forest.conversions import (
+    exponentiate_to_pyquil,
+    orq_to_pyquil,
+)
+from orquestra.integrations.forest.simulation import simulate_wavefunction
+
+HAMILTONIAN = OrqPauliSum(
+    "0.5*Z0*Z1*Z2 + -0.3*Z0*Z1*X3 + 0.7*X1*Y2 + 0.2*Y0 + 1.1*X0*X1 + 0.4*I0"
+)
+
+N_QUBITS = 4
+
+STATE_PREPARATION = pyquil.Program(
+    pyquil_gates.RY(0.3, 0),
+    pyquil_gates.RX(0.8, 1),
+    pyquil_gates.RY(1.3, 2),
+    pyquil_gates.RX(0.5, 3),
+    pyquil_gates.CNOT(0, 3),
+)
+
+
+def _evolved_state(program, memory_map=None):
+    return simulate_wavefunction(
+        STATE_PREPARATION + program, memory_map, n_qubits=N_QUBITS
+    )
+
+
+def _matrix(operator):
+    return lifted_pauli(orq_to_pyquil(operator), list(range(N_QUBITS)))
+
+
+def _product_formula_state(time, steps, order):
+    exponentials = [
+        expm(-1j * _matrix(term) * time / steps / order) for term in HAMILTONIAN.terms
+    ]
+    step = np.eye(2**N_QUBITS)
+    for exponential in exponentials + (exponentials[::-1] if order == 2 else []):
+        step = exponential @ step
+    return np.linalg.matrix_power(step, steps) @ _evolved_state(pyquil.Program())
+
+
+def _fidelity(first, second):
+    return np.abs(np.vdot(first, second)) ** 2
+
+
+@pytest.mark.parametrize("order", [1, 2])
+@pytest.mark.parametrize("steps", [1, 3])
+def test_program_implements_product_formula(steps, order):
+    program = exponentiate_to_pyquil(HAMILTONIAN, 0.9, steps, order)
+
+    # Identity term is skipped, so states are equal only up to a global phase.
+    np.testing.assert_allclose(
+        _fidelity(_evolved_state(program), _product_formula_state(0.9, steps, order)),
+        1.0,
+    )
+
+
+def test_higher_order_formulas_approximate_evolution_better():
+    exact = expm(-1j * 0.9 * _matrix(HAMILTONIAN)) @ _evolved_state(pyquil.Program())
+
+    errors = [
+        1
+        - _fidelity(
+            _evolved_state(exponentiate_to_pyquil(HAMILTONIAN, 0.9, 2, o)), exact
+        )
+        for o in [1, 2, 4]
+    ]
+
+    assert errors[0] > errors[1] > errors[2]
+    assert errors[2] < 1e-8
+
+
+def test_program_is_the_same_as_of_pyquil_exponential_map():
+    operator = OrqPauliSum("0.5*Z0*Y1*Z2 + -0.3*X0*Z3 + 0.7*X1")
+    pyquil_program = pyquil.Program(
+        *[exponential_map(term)(1.0) for term in orq_to_pyquil(operator).terms]
+    )
+
+    np.testing.assert_allclose(
+        _evolved_state(exponentiate_to_pyquil(operator)),
+        _evolved_state(pyquil_program),
+        atol=1e-12,
+    )
+
+
+def test_pyquil_operators_are_exponentiated_like_orquestra_ones():
+    assert exponentiate_to_pyquil(
+        orq_to_pyquil(HAMILTONIAN), 0.5, 2, 2
+    ) == exponentiate_to_pyquil(HAMILTONIAN, 0.5, 2, 2)
+
+
+class TestSharingGatesBetweenTerms:
+    def test_cnots_acting_on_the_same_paulis_are_not_undone(self):
+        program = exponentiate_to_pyquil(OrqPauliSum("Z0*Z1*Z2 + Z0*Z1*Z3"))
+
+        assert [str(instruction) for instruction in program.instructions] == [
+            "CNOT 0 1",
+            "CNOT 1 2",
+            "RZ(2) 2",
+            "CNOT 1 2",
+            "CNOT 1 3",
+            "RZ(2) 3",
+            "CNOT 1 3",
+            "CNOT 0 1",
+        ]
+
+    def test_basis_changes_of_qubits_with_the_same_paulis_cancel_out(self):
+        program = exponentiate_to_pyquil(OrqPauliSum("X0*Y1 + X0*Z1"))
+
+        assert [instruction.name for instruction in program.instructions].count(
+            "H"
+        ) == 2
+
+    def test_consecutive_exponentials_of_the_same_term_are_merged(self):
+        program = exponentiate_to_pyquil(OrqPauliTerm("X0*X1", 0.5), 1.0, 4, 2)
+
+        assert [instruction.name for instruction in program.instructions] == [
+            "H",
+            "H",
+            "CNOT",
+            "RZ",
+            "CNOT",
+            "H",
+            "H",
+        ]
+
+
+def test_symbolic_time_is_declared_and_bound_by_memory_map():
+    time = sympy.Symbol("time")
+
+    program = exponentiate_to_pyquil(HAMILTONIAN, 2 * time, 2, 2)
+
+    assert program.declarations["time"] == pyquil.quil.Declare("time", "REAL")
+    np.testing.assert_allclose(
+        _evolved_state(program, {"time": [0.45]}),
+        _evolved_state(exponentiate_to_pyquil(HAMILTONIAN, 0.9, 2, 2)),
+        atol=1e-12,
+    )
+
+
+def test_operator_acting_only_with_identities_gives_empty_program():
+    assert exponentiate_to_pyquil(OrqPauliSum("2*I0")) == pyquil.Program()
+
+
+@pytest.mark.parametrize(
+    "operator, kwargs",
+    [
+        (OrqPauliTerm("X0", 1j), {}),
+        (HAMILTONIAN, {"steps": 0}),
+        (HAMILTONIAN, {"order": 3}),
+        (HAMILTONIAN, {"order": 0}),
+    ],
+)
+def test_invalid_arguments_are_rejected(operator, kwargs):
+    with pytest.raises(ValueError):
+        exponentiate_to_pyquil(operator, **kwargs)
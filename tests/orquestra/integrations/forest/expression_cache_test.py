@@ -0,0 +1,165 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit
+from pyquil import quil, quilatom
+
+from orquestra.integrations.forest.conversions import (
+    clear_expression_cache,
+    export_to_pyquil,
+    expression_cache_info,
+    import_from_pyquil,
+    resize_expression_cache,
+)
+from orquestra.integrations.forest.conversions._circuit_conversions import (
+    _export_expression,
+    _import_expression,
+)
+from orquestra.integrations.forest.conversions._expression_cache import (
+    DEFAULT_EXPRESSION_CACHE_SIZE,
+    CacheInfo,
+    ExpressionCache,
+)
+
+THETA = sympy.Symbol("theta")
+GAMMA = sympy.Symbol("gamma")
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_expression_cache()
+    yield
+    resize_expression_cache(DEFAULT_EXPRESSION_CACHE_SIZE)
+    clear_expression_cache()
+
+
+class TestExpressionCache:
+    def test_repeated_translations_are_counted_as_hits(self):
+        cache = ExpressionCache(str, key=lambda x: x, maxsize=2)
+
+        assert cache(1) == "1"
+        assert cache(1) == "1"
+        assert cache(2) == "2"
+
+        assert cache.cache_info() == CacheInfo(hits=1, misses=2, maxsize=2, currsize=2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        calls = []
+        cache = ExpressionCache(
+            lambda x: calls.append(x) or x, key=lambda x: x, maxsize=2
+        )
+
+        cache(1)
+        cache(2)
+        cache(1)
+        cache(3)
+        cache(1)
+        cache(2)
+
+        assert calls == [1, 2, 3, 2]
+
+    def test_resizing_evicts_excess_entries(self):
+        cache = ExpressionCache(str, key=lambda x: x, maxsize=3)
+        for i in range(3):
+            cache(i)
+
+        cache.resize(1)
+
+        assert cache.cache_info().currsize == 1
+
+    def test_zero_size_disables_caching(self):
+        cache = ExpressionCache(str, key=lambda x: x, maxsize=0)
+
+        cache(1)
+        cache(1)
+
+        assert cache.cache_info() == CacheInfo(hits=0, misses=2, maxsize=0, currsize=0)
+
+    def test_unhashable_expressions_are_translated_without_caching(self):
+        cache = ExpressionCache(len, key=lambda x: x)
+
+        assert cache([1, 2]) == 2
+        assert cache.cache_info().currsize == 0
+
+    def test_negative_size_is_rejected(self):
+        with pytest.raises(ValueError):
+            ExpressionCache(str, key=lambda x: x, maxsize=-1)
+
+
+class TestFastPaths:
+    @pytest.mark.parametrize(
+        "sympy_expr, expected",
+        [
+            (THETA, quil.Parameter("theta")),
+            (sympy.Integer(2), 2),
+            (sympy.Float(0.5), 0.5),
+            (sympy.Rational(1, 4), 0.25),
+            (3.0, 3.0),
+            (1j, 1j),
+        ],
+    )
+    def test_exporting_numbers_and_symbols_bypasses_cache(self, sympy_expr, expected):
+        exported = _export_expression(sympy_expr)
+
+        assert exported == expected
+        assert type(exported) is type(expected)
+        assert expression_cache_info()["export"].misses == 0
+
+    @pytest.mark.parametrize(
+        "pyquil_expr, expected",
+        [(quil.Parameter("theta"), THETA), (2, 2), (0.5, 0.5), (1j, 1j)],
+    )
+    def test_importing_numbers_and_parameters_bypasses_cache(
+        self, pyquil_expr, expected
+    ):
+        assert _import_expression(pyquil_expr) == expected
+        assert expression_cache_info()["import"].misses == 0
+
+
+class TestCachedConversions:
+    def test_repeated_export_of_the_same_expression_hits_cache(self):
+        circuit = _circuit.Circuit([_builtin_gates.RX(2 * THETA)(i) for i in range(5)])
+
+        export_to_pyquil(circuit)
+
+        assert expression_cache_info()["export"].misses == 1
+        assert expression_cache_info()["export"].hits == 4
+
+    def test_repeated_import_of_the_same_expression_hits_cache(self):
+        circuit = _circuit.Circuit(
+            [_builtin_gates.RX(2 * THETA + GAMMA)(i) for i in range(5)]
+        )
+        program = export_to_pyquil(circuit)
+        clear_expression_cache()
+
+        imported = import_from_pyquil(program)
+
+        assert imported == circuit
+        assert expression_cache_info()["import"].misses == 1
+        assert expression_cache_info()["import"].hits == 4
+
+    def test_numbers_of_different_types_are_cached_separately(self):
+        exported_int = _export_expression(sympy.cos(THETA) * 2)
+        exported_float = _export_expression(sympy.cos(THETA) * 2.0)
+
+        assert exported_int.op1 == 2 and isinstance(exported_int.op1, int)
+        assert isinstance(exported_float.op1, float)
+
+    def test_pyquil_expressions_equal_up_to_structure_share_cache_entry(self):
+        first = _import_expression(quilatom.quil_cos(quil.Parameter("x")) * np.pi)
+        second = _import_expression(quilatom.quil_cos(quil.Parameter("x")) * np.pi)
+
+        assert first == second
+        assert expression_cache_info()["import"].hits == 1
+
+    def test_conversions_are_correct_with_caching_disabled(self):
+        resize_expression_cache(0)
+        circuit = _circuit.Circuit(
+            [_builtin_gates.RX(2 * THETA)(0), _builtin_gates.RY(2 * THETA)(1)]
+        )
+
+        assert import_from_pyquil(export_to_pyquil(circuit)) == circuit
+        assert expression_cache_info()["export"].currsize == 0
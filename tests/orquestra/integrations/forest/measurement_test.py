@@ -0,0 +1,135 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pyquil
+import pytest
+from orquestra.quantum.operators import PauliSum as OrqPauliSum
+from orquestra.quantum.operators import PauliTerm as OrqPauliTerm
+from pyquil import gates as pyquil_gates
+from pyquil.paulis import ID
+from pyquil.paulis import PauliSum as PyquilPauliSum
+from pyquil.simulation.tools import lifted_pauli
+
+from orquestra.integrations.forest.conversions import (
+    MeasurementGroup,
+    group_qubitwise_commuting,
+    measurement_groups,
+    orq_to_pyquil,
+)
+from orquestra.integrations.forest.simulation import simulate_wavefunction
+
+OPERATOR = OrqPauliSum(
+    "Z0*Z1 + 0.5*Z1*Z2 + -1*X0 + 0.25*X1*X2 + 2*Y0*Z2 + 0.5*Y2 + 3*I0 + X0*X1"
+)
+
+STATE_PREPARATION = pyquil.Program(
+    pyquil_gates.RY(0.3, 0),
+    pyquil_gates.RX(0.7, 1),
+    pyquil_gates.CNOT(0, 2),
+    pyquil_gates.RY(1.1, 2),
+    pyquil_gates.RZ(0.4, 0),
+    pyquil_gates.CNOT(2, 1),
+)
+
+
+def _qubitwise_commute(first, second):
+    return all(second._ops.get(qubit, op) == op for qubit, op in first._ops.items())
+
+
+@pytest.mark.parametrize(
+    "operator",
+    [OPERATOR, OrqPauliSum("X0 + X0*Z1 + Z1*Y3 + 2*I0"), OrqPauliTerm("Y1*Z2")],
+)
+class TestGroupingTerms:
+    def test_groups_partition_terms_of_operator(self, operator):
+        groups = group_qubitwise_commuting(operator)
+
+        assert sorted(str(term) for group in groups for term in group.terms) == (
+            sorted(str(term) for term in OrqPauliSum([]) + operator)
+        )
+
+    def test_terms_of_every_group_commute_qubitwise(self, operator):
+        for group in group_qubitwise_commuting(operator):
+            for first in group.terms:
+                for second in group.terms:
+                    assert _qubitwise_commute(first, second)
+
+
+def test_compatible_terms_are_placed_in_the_same_group():
+    groups = group_qubitwise_commuting(OPERATOR)
+
+    assert groups == [
+        OrqPauliSum("Z0*Z1 + 0.5*Z1*Z2 + 3*I0"),
+        OrqPauliSum("-1*X0 + 0.25*X1*X2 + X0*X1"),
+        OrqPauliSum("2*Y0*Z2"),
+        OrqPauliSum("0.5*Y2"),
+    ]
+
+
+def test_pyquil_operators_are_grouped_into_pyquil_paulisums():
+    groups = group_qubitwise_commuting(orq_to_pyquil(OPERATOR))
+
+    assert all(isinstance(group, PyquilPauliSum) for group in groups)
+    assert groups == [
+        orq_to_pyquil(group) for group in group_qubitwise_commuting(OPERATOR)
+    ]
+
+
+def test_operator_without_terms_has_no_groups():
+    assert measurement_groups(OrqPauliSum()) == []
+
+
+@pytest.mark.parametrize(
+    "operator", [OrqPauliSum("2*I0"), PyquilPauliSum([]), PyquilPauliSum([ID()])]
+)
+def test_operator_with_only_identity_terms_has_nothing_to_measure(operator):
+    assert measurement_groups(operator) == []
+
+
+def test_identity_terms_are_kept_with_measured_terms():
+    groups = measurement_groups(OrqPauliSum("2*I0 + Z1"))
+
+    assert [group.terms for group in groups] == [OrqPauliSum("2*I0 + Z1")]
+    assert groups[0].qubits == (1,)
+
+
+class TestMeasurementPrograms:
+    def test_program_measures_every_qubit_of_group_into_ro(self):
+        group = measurement_groups(OrqPauliSum("X0*Z3 + Z3"))[0]
+
+        assert group.qubits == (0, 3)
+        assert group.program.out() == (
+            "DECLARE ro BIT[2]\n"
+            f"RY({-np.pi / 2}) 0\n"
+            "MEASURE 0 ro[0]\n"
+            "MEASURE 3 ro[1]\n"
+        )
+
+    @pytest.mark.parametrize("group_index", range(4))
+    def test_measured_parities_give_expectation_values_of_terms(self, group_index):
+        group: MeasurementGroup = measurement_groups(OPERATOR)[group_index]
+        rotations = pyquil.Program(
+            [
+                instruction
+                for instruction in group.program.instructions
+                if isinstance(instruction, pyquil.gates.Gate)
+            ]
+        )
+        wavefunction = simulate_wavefunction(STATE_PREPARATION, n_qubits=3)
+        probabilities = (
+            np.abs(simulate_wavefunction(STATE_PREPARATION + rotations, n_qubits=3))
+            ** 2
+        )
+        bits = (np.arange(8)[:, None] >> np.arange(3)) & 1
+
+        for term in group.terms:
+            parities = (-1) ** bits[:, list(term._ops)].sum(axis=1)
+            expected = np.vdot(
+                wavefunction,
+                lifted_pauli(orq_to_pyquil(term), [0, 1, 2]) @ wavefunction,
+            )
+
+            np.testing.assert_allclose(
+                term.coefficient * probabilities @ parities, expected, atol=1e-12
+            )
@@ -0,0 +1,95 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit
+from orquestra.quantum.operators import PauliSum
+
+from orquestra.integrations.forest.conversions import (
+    convert_many,
+    export_to_pyquil,
+    import_from_pyquil,
+    orq_to_pyquil,
+    pyquil_to_orq,
+)
+
+CIRCUITS = [
+    _circuit.Circuit(
+        [
+            _builtin_gates.X(i % 3),
+            _builtin_gates.XX(sympy.Symbol("theta") * i)(0, 1),
+            _builtin_gates.RX(0.1 * i).controlled(1)(2, 0),
+        ]
+    )
+    for i in range(20)
+]
+
+OPERATORS = [PauliSum(f"{i}*X0*Z1 + 0.5*Y2 + {i}*X0*Z1") for i in range(1, 20)]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2, None])
+@pytest.mark.parametrize("chunk_size", [None, 1, 3])
+class TestConvertingMany:
+    def test_exported_circuits_are_in_input_order(self, max_workers, chunk_size):
+        exported = convert_many(
+            export_to_pyquil,
+            CIRCUITS,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            serial_threshold=2,
+        )
+
+        assert exported == [export_to_pyquil(circuit) for circuit in CIRCUITS]
+
+    def test_imported_circuits_are_in_input_order(self, max_workers, chunk_size):
+        programs = [export_to_pyquil(circuit) for circuit in CIRCUITS]
+
+        imported = convert_many(
+            import_from_pyquil,
+            programs,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            serial_threshold=2,
+        )
+
+        assert imported == CIRCUITS
+
+    def test_pauli_operators_round_trip(self, max_workers, chunk_size):
+        pyquil_operators = convert_many(
+            orq_to_pyquil,
+            OPERATORS,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            serial_threshold=2,
+        )
+        orq_operators = convert_many(
+            pyquil_to_orq,
+            pyquil_operators,
+            max_workers=max_workers,
+            chunk_size=chunk_size,
+            serial_threshold=2,
+        )
+
+        assert pyquil_operators == [orq_to_pyquil(op) for op in OPERATORS]
+        assert orq_operators == [pyquil_to_orq(orq_to_pyquil(op)) for op in OPERATORS]
+
+
+def test_empty_batch_gives_empty_list():
+    assert convert_many(export_to_pyquil, [], max_workers=2, serial_threshold=0) == []
+
+
+def test_batches_below_threshold_are_converted_in_current_process():
+    def _local_conversion(obj):
+        # Local functions can't be pickled, so this would fail in a process pool.
+        return obj * 2
+
+    converted = convert_many(_local_conversion, range(5), max_workers=4)
+
+    assert converted == [0, 2, 4, 6, 8]
+
+
+@pytest.mark.parametrize("kwargs", [{"max_workers": 0}, {"chunk_size": 0}])
+def test_invalid_arguments_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        convert_many(export_to_pyquil, CIRCUITS, **kwargs)
@@ -0,0 +1,77 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit
+
+from orquestra.integrations.forest.conversions import (
+    export_parametric_template,
+    export_to_pyquil,
+)
+
+ALPHA, BETA, GAMMA = sympy.symbols("alpha, beta, gamma")
+
+CIRCUIT = _circuit.Circuit(
+    [
+        _builtin_gates.RX(GAMMA)(0),
+        _builtin_gates.RZ(2 * ALPHA)(1),
+        _builtin_gates.XX(BETA)(0, 1),
+    ]
+)
+
+
+class TestExportingParametricTemplate:
+    def test_program_is_the_same_as_exported_one(self):
+        template = export_parametric_template(CIRCUIT)
+
+        assert template.program == export_to_pyquil(CIRCUIT)
+
+    def test_symbols_default_to_order_of_appearance_in_circuit(self):
+        assert export_parametric_template(CIRCUIT).symbols == (GAMMA, ALPHA, BETA)
+
+    def test_memory_regions_of_memory_map_are_declared_in_program(self):
+        template = export_parametric_template(CIRCUIT)
+
+        memory_map = template.memory_map([0.1, 0.2, 0.3])
+
+        assert set(memory_map) == set(template.program.declarations)
+
+    def test_memory_map_follows_given_symbols_ordering(self):
+        template = export_parametric_template(CIRCUIT, symbols=[ALPHA, BETA, GAMMA])
+
+        assert template.memory_map(np.array([0.1, 0.2, 0.3])) == {
+            "alpha": [0.1],
+            "beta": [0.2],
+            "gamma": [0.3],
+        }
+
+    def test_batch_of_parameters_gives_memory_map_per_row(self):
+        template = export_parametric_template(CIRCUIT)
+
+        memory_maps = template.memory_maps([[0.1, 0.2, 0.3], [1.0, 2.0, 3.0]])
+
+        assert memory_maps == [
+            {"gamma": [0.1], "alpha": [0.2], "beta": [0.3]},
+            {"gamma": [1.0], "alpha": [2.0], "beta": [3.0]},
+        ]
+
+    def test_circuit_without_symbols_gives_empty_memory_map(self):
+        circuit = _circuit.Circuit([_builtin_gates.X(0)])
+
+        assert export_parametric_template(circuit).memory_map([]) == {}
+
+    @pytest.mark.parametrize("symbols", [[ALPHA, BETA], [ALPHA, BETA, BETA, GAMMA]])
+    def test_symbols_not_matching_free_symbols_are_rejected(self, symbols):
+        with pytest.raises(ValueError):
+            export_parametric_template(CIRCUIT, symbols=symbols)
+
+    @pytest.mark.parametrize("params", [[0.1, 0.2], [[0.1, 0.2, 0.3]]])
+    def test_memory_map_rejects_parameters_of_wrong_shape(self, params):
+        with pytest.raises(ValueError):
+            export_parametric_template(CIRCUIT).memory_map(params)
+
+    def test_memory_maps_rejects_parameters_of_wrong_shape(self):
+        with pytest.raises(ValueError):
+            export_parametric_template(CIRCUIT).memory_maps([0.1, 0.2, 0.3])
@@ -26,7 +26,15 @@ from pyquil.paulis import PauliSum as PyquilPauliSum
 from pyquil.paulis import PauliTerm as PyquilPauliTerm
 from pyquil.quilatom import QubitPlaceholder
 
-from orquestra.integrations.forest.conversions import orq_to_pyquil, pyquil_to_orq
+from orquestra.integrations.forest.conversions import (
+    SymplecticPauliSum,
+    orq_to_pyquil,
+    orq_to_symplectic,
+    pyquil_to_orq,
+    pyquil_to_symplectic,
+    symplectic_to_orq,
+    symplectic_to_pyquil,
+)
 
 
 def test_translation_type_enforcement():
@@ -129,3 +137,172 @@ def test_pyquil_to_orq_raises_error_when_qubit_index_not_integer():
     with pytest.raises(ValueError) as e:
         pyquil_to_orq(PyquilPauliTerm("X", QubitPlaceholder()))
         assert "must be integer" in e.value
+
+
+def _multiplied_pyquil_term(orq_term):
+    term = PyquilPauliTerm("I", 0)
+    for idx, op in orq_term.operations:
+        term = term * PyquilPauliTerm(op, idx)
+    return orq_term.coefficient * term
+
+
+@pytest.mark.parametrize(
+    "orq_sum",
+    [
+        OrqPauliSum([OrqPauliTerm("X0*Z1", 0.5), OrqPauliTerm("Z1*X0", 0.25)]),
+        OrqPauliSum(
+            [
+                OrqPauliTerm("Y2", 1.5),
+                OrqPauliTerm("X0*Y1", -1),
+                OrqPauliTerm("Y2", -1.5),
+                OrqPauliTerm("I0", 2),
+            ]
+        ),
+        OrqPauliSum([OrqPauliTerm("Z3", 1e-9), OrqPauliTerm("X3", 2j)]),
+        OrqPauliSum([OrqPauliTerm("Z0", 1), OrqPauliTerm("Z0", -1)]),
+        OrqPauliSum(),
+    ],
+)
+def test_orq_paulisum_to_pyquil_is_equivalent_to_simplified_sum(orq_sum):
+    expected = PyquilPauliSum(
+        [_multiplied_pyquil_term(term) for term in orq_sum.terms]
+    ).simplify()
+
+    result = orq_to_pyquil(orq_sum)
+
+    assert result == expected
+    assert [term.operations_as_set() for term in result.terms] == [
+        term.operations_as_set() for term in expected.terms
+    ]
+
+
+def test_terms_of_converted_paulisum_are_independent():
+    result = orq_to_pyquil(OrqPauliSum("0.5*X0*Z1 + 0.5*Y0"))
+
+    result.terms[0]._ops[2] = "X"
+
+    assert orq_to_pyquil(OrqPauliSum("0.5*X0*Z1 + 0.5*Y0")) != result
+
+
+def test_operators_of_converted_terms_are_ordered_like_in_orquestra_terms():
+    orq_sum = OrqPauliSum([OrqPauliTerm("Y2*Y0*X1", 0.5), OrqPauliTerm("X1*Y0*Y2")])
+
+    assert str(orq_to_pyquil(orq_sum.terms[0])) == "(0.5+0j)*Y2*Y0*X1"
+    assert str(orq_to_pyquil(orq_sum)) == "(1.5+0j)*Y2*Y0*X1"
+
+
+def _summed_orq_terms(pyquil_sum):
+    result = OrqPauliSum()
+    for term in pyquil_sum.terms:
+        result += pyquil_to_orq(term)
+    return result
+
+
+@pytest.mark.parametrize(
+    "pyquil_sum",
+    [
+        PyquilPauliSum(
+            [
+                PyquilPauliTerm.from_list([("X", 0), ("Z", 1)], 0.5),
+                PyquilPauliTerm.from_list([("Z", 1), ("X", 0)], 0.25),
+                PyquilPauliTerm("Y", 2, 1j),
+            ]
+        ),
+        PyquilPauliSum(
+            [
+                PyquilPauliTerm("Y", 2, 1.5),
+                PyquilPauliTerm("Y", 2, -1.5),
+                PyquilPauliTerm("I", 0, 2),
+                PyquilPauliTerm("Y", 2, 3),
+            ]
+        ),
+        PyquilPauliSum([PyquilPauliTerm("Z", 3, 1e-9), PyquilPauliTerm("X", 3, 2)]),
+        PyquilPauliSum([PyquilPauliTerm("Z", 0, 1), PyquilPauliTerm("Z", 0, -1)]),
+    ],
+)
+def test_pyquil_paulisum_to_orq_is_equivalent_to_sum_of_converted_terms(pyquil_sum):
+    assert pyquil_to_orq(pyquil_sum) == _summed_orq_terms(pyquil_sum)
+
+
+def test_merging_terms_does_not_modify_converted_pyquil_paulisum():
+    pyquil_sum = PyquilPauliSum([PyquilPauliTerm("X", 0, 1), PyquilPauliTerm("X", 0)])
+
+    pyquil_to_orq(pyquil_sum)
+
+    assert [term.coefficient for term in pyquil_sum.terms] == [1, 1]
+
+
+class TestSymplecticPauliSum:
+    def test_bits_of_paulis_are_set_in_rows_of_their_terms(self):
+        symplectic = orq_to_symplectic(OrqPauliSum("X0*Y2 + 0.5*Z1 + I0"))
+
+        np.testing.assert_array_equal(
+            symplectic.x, [[True, False, True], [False] * 3, [False] * 3]
+        )
+        np.testing.assert_array_equal(
+            symplectic.z, [[False, False, True], [False, True, False], [False] * 3]
+        )
+        np.testing.assert_array_equal(symplectic.coefficients, [1, 0.5, 1])
+
+    @pytest.mark.parametrize(
+        "orq_operator",
+        [
+            OrqPauliSum("0.5*X0*Z1*X2 + 0.5j*Y0*Z1*Y2 + -2*I0"),
+            OrqPauliSum(),
+            OrqPauliTerm("Y3*Z0", 1.5),
+        ],
+    )
+    def test_orquestra_and_pyquil_operators_are_restored(self, orq_operator):
+        symplectic = orq_to_symplectic(orq_operator)
+        pyquil_operator = orq_to_pyquil(orq_operator)
+
+        assert symplectic_to_orq(symplectic) == orq_operator
+        assert symplectic_to_pyquil(symplectic) == pyquil_operator
+        assert symplectic_to_pyquil(pyquil_to_symplectic(pyquil_operator)) == (
+            pyquil_operator
+        )
+
+    def test_bit_matrices_can_include_idle_qubits(self):
+        symplectic = orq_to_symplectic(OrqPauliTerm("Z1"), n_qubits=4)
+
+        assert symplectic.n_qubits == 4
+        np.testing.assert_array_equal(symplectic.qubits, [1])
+
+    def test_too_few_qubits_are_rejected(self):
+        with pytest.raises(ValueError):
+            orq_to_symplectic(OrqPauliTerm("Z3"), n_qubits=3)
+
+    def test_non_integer_pyquil_qubits_are_rejected(self):
+        with pytest.raises(ValueError):
+            pyquil_to_symplectic(PyquilPauliTerm("X", QubitPlaceholder()))
+
+    def test_commutation_matrix_tells_which_terms_commute(self):
+        terms = [
+            OrqPauliTerm("X0*X1"),
+            OrqPauliTerm("Z0*Z1"),
+            OrqPauliTerm("Z0"),
+            OrqPauliTerm("Y1*Z2"),
+        ]
+
+        commutation_matrix = orq_to_symplectic(OrqPauliSum(terms)).commutation_matrix()
+
+        np.testing.assert_array_equal(
+            commutation_matrix,
+            [[(left * right) == (right * left) for right in terms] for left in terms],
+        )
+
+    @pytest.mark.parametrize(
+        "orq_sum",
+        [
+            OrqPauliSum("X0*Z1 + 2*Y2 + 0.5*Z1*X0 + -2*Y2 + I0 + 3*I0"),
+            OrqPauliSum([OrqPauliTerm("Z3", 1e-9), OrqPauliTerm("X3", 2j)]),
+            OrqPauliSum(),
+        ],
+    )
+    def test_simplifying_is_equivalent_to_simplifying_paulisum(self, orq_sum):
+        simplified = symplectic_to_orq(orq_to_symplectic(orq_sum).simplify())
+
+        assert simplified == orq_sum.simplify()
+        assert [term.operations for term in simplified.terms] == [
+            term.operations for term in orq_sum.simplify().terms
+        ]
@@ -0,0 +1,94 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pytest
+from orquestra.quantum.operators import PauliSum as OrqPauliSum
+from orquestra.quantum.operators import PauliTerm as OrqPauliTerm
+from pyquil.simulation.tools import lifted_pauli
+from scipy import sparse
+
+from orquestra.integrations.forest.conversions import (
+    apply_pauli_operator,
+    orq_to_pyquil,
+    pauli_to_sparse,
+)
+
+OPERATORS = [
+    OrqPauliSum(
+        "0.5*Z0*Z1*Y2 + -0.3*Z0*Z1*X3 + 0.7*X1*Y2 + 0.2*Y0 + 1.1*X0*X1 + 0.4*I0"
+    ),
+    OrqPauliSum("2j*Y0*Y1*Y3 + 0.3*X0*X1*Z2 + -1*Y0*Y1*Y3 + Z3"),
+    OrqPauliTerm("Y1*X3", -0.5),
+    orq_to_pyquil(OrqPauliSum("X0*Y2 + 0.5*Z1*Z3 + -2*Y0*Y2")),
+]
+
+
+def _pyquil_matrix(operator, n_qubits):
+    if isinstance(operator, (OrqPauliSum, OrqPauliTerm)):
+        operator = orq_to_pyquil(operator)
+    return lifted_pauli(operator, list(range(n_qubits)))
+
+
+@pytest.mark.parametrize("operator", OPERATORS)
+class TestSparseMatrices:
+    def test_matrix_is_the_same_as_lifted_by_pyquil(self, operator):
+        matrix = pauli_to_sparse(operator)
+
+        assert isinstance(matrix, sparse.csr_matrix)
+        assert matrix.has_sorted_indices
+        np.testing.assert_allclose(matrix.toarray(), _pyquil_matrix(operator, 4))
+
+    def test_matrix_can_act_on_idle_qubits(self, operator):
+        np.testing.assert_allclose(
+            pauli_to_sparse(operator, n_qubits=6).toarray(),
+            _pyquil_matrix(operator, 6),
+        )
+
+    @pytest.mark.parametrize("shape", [(16,), (16, 3)])
+    def test_applying_operator_is_equivalent_to_multiplying_by_matrix(
+        self, operator, shape
+    ):
+        rng = np.random.default_rng(0)
+        state = rng.normal(size=shape) + 1j * rng.normal(size=shape)
+
+        np.testing.assert_allclose(
+            apply_pauli_operator(operator, state),
+            pauli_to_sparse(operator, n_qubits=4) @ state,
+        )
+
+
+def test_real_states_are_not_modified_by_applying_operator():
+    state = np.arange(8.0)
+
+    result = apply_pauli_operator(OrqPauliSum("X0*Y2 + 0.5*Z1"), state)
+
+    np.testing.assert_array_equal(state, np.arange(8.0))
+    np.testing.assert_allclose(
+        result, pauli_to_sparse(OrqPauliSum("X0*Y2 + 0.5*Z1")) @ state
+    )
+
+
+def test_terms_cancelling_out_have_no_entries():
+    matrix = pauli_to_sparse(OrqPauliSum("X0*Z1 + Z1 + -1*Z1*X0"))
+
+    assert matrix.nnz == 4
+    np.testing.assert_allclose(matrix.diagonal(), [1, 1, -1, -1])
+
+
+def test_operator_without_terms_has_zero_matrix():
+    matrix = pauli_to_sparse(OrqPauliSum(), n_qubits=2)
+
+    assert matrix.shape == (4, 4)
+    assert matrix.nnz == 0
+
+
+def test_too_few_qubits_are_rejected():
+    with pytest.raises(ValueError):
+        pauli_to_sparse(OrqPauliTerm("X3"), n_qubits=3)
+
+
+@pytest.mark.parametrize("length", [6, 4])
+def test_states_of_invalid_lengths_are_rejected(length):
+    with pytest.raises(ValueError):
+        apply_pauli_operator(OrqPauliTerm("X3"), np.ones(length))
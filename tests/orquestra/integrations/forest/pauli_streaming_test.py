@@ -0,0 +1,100 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import pytest
+from orquestra.quantum.operators import PauliSum as OrqPauliSum
+from orquestra.quantum.operators import PauliTerm as OrqPauliTerm
+from pyquil.paulis import PauliSum as PyquilPauliSum
+from pyquil.paulis import PauliTerm as PyquilPauliTerm
+from pyquil.quilatom import QubitPlaceholder
+
+from orquestra.integrations.forest.conversions import (
+    iter_orq_to_pyquil,
+    iter_pyquil_to_orq,
+    orq_to_pyquil,
+    pyquil_to_orq,
+)
+
+ORQ_SUM = OrqPauliSum("X0*Z1 + 2*Y2 + 0.5*Z1*X0 + Z3 + -2*Y2 + 3*I0 + 0.25*X0*Z1")
+
+
+class _CountingIterable:
+    def __init__(self, items):
+        self.items = items
+        self.n_consumed = 0
+
+    def __iter__(self):
+        for item in self.items:
+            self.n_consumed += 1
+            yield item
+
+
+def test_terms_are_converted_one_to_one_in_chunks_of_given_size():
+    chunks = list(iter_orq_to_pyquil(ORQ_SUM, chunk_size=3))
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [term for chunk in chunks for term in chunk] == [
+        orq_to_pyquil(term) for term in ORQ_SUM.terms
+    ]
+
+
+def test_terms_are_read_only_when_their_chunk_is_needed():
+    terms = _CountingIterable(ORQ_SUM.terms)
+
+    chunks = iter_orq_to_pyquil(terms, chunk_size=2)
+    next(chunks)
+
+    assert terms.n_consumed == 2
+
+
+def test_merging_within_chunks_merges_only_terms_of_the_same_chunk():
+    chunks = list(iter_orq_to_pyquil(ORQ_SUM, chunk_size=3, merge_duplicates="chunk"))
+
+    assert [PyquilPauliSum(chunk) for chunk in chunks] == [
+        orq_to_pyquil(OrqPauliSum(ORQ_SUM.terms[i : i + 3])) for i in range(0, 7, 3)
+    ]
+
+
+def test_merging_across_chunks_gives_the_same_terms_as_converting_whole_sum():
+    chunks = list(iter_orq_to_pyquil(ORQ_SUM, chunk_size=2, merge_duplicates="all"))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert PyquilPauliSum([term for chunk in chunks for term in chunk]) == (
+        orq_to_pyquil(ORQ_SUM)
+    )
+
+
+@pytest.mark.parametrize("merge_duplicates", [None, "chunk", "all"])
+def test_pyquil_terms_are_converted_like_by_pyquil_to_orq(merge_duplicates):
+    pyquil_sum = orq_to_pyquil(ORQ_SUM)
+
+    chunks = iter_pyquil_to_orq(
+        pyquil_sum.terms, chunk_size=2, merge_duplicates=merge_duplicates
+    )
+
+    assert OrqPauliSum([term for chunk in chunks for term in chunk]) == (
+        pyquil_to_orq(pyquil_sum)
+    )
+
+
+def test_chunks_of_zero_terms_are_skipped_when_merging():
+    terms = [OrqPauliTerm("Z0"), OrqPauliTerm("Z0", -1), OrqPauliTerm("X1")]
+
+    chunks = list(iter_orq_to_pyquil(terms, chunk_size=2, merge_duplicates="chunk"))
+
+    assert chunks == [[PyquilPauliTerm("X", 1)]]
+
+
+def test_non_integer_pyquil_qubits_are_rejected_while_iterating():
+    chunks = iter_pyquil_to_orq([PyquilPauliTerm("X", QubitPlaceholder())])
+
+    with pytest.raises(ValueError):
+        next(chunks)
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"chunk_size": 0}, {"merge_duplicates": "everything"}]
+)
+def test_invalid_arguments_are_rejected_before_iterating(kwargs):
+    with pytest.raises(ValueError):
+        iter_orq_to_pyquil(ORQ_SUM, **kwargs)
@@ -0,0 +1,168 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from orquestra.integrations.forest.conversions import (
+    PeepholeResult,
+    export_to_pyquil,
+    peephole_optimize,
+    profile_conversions,
+)
+
+ALPHA, BETA = sympy.symbols("alpha, beta")
+
+SQRT_X_DEF = _gates.CustomGateDefinition(
+    "SQRT-X",
+    sympy.Matrix([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]]),
+    tuple(),
+)
+
+CUSTOM_RZ_DEF = _gates.CustomGateDefinition(
+    "RZ", sympy.Matrix([[1, 0], [0, -1]]), tuple()
+)
+
+
+def _unitary(circuit):
+    return np.array(circuit.to_unitary(), dtype=complex)
+
+
+class TestPeepholeOptimize:
+    @pytest.mark.parametrize(
+        "operations, expected_operations",
+        [
+            (
+                [_builtin_gates.RZ(0.25)(0), _builtin_gates.RZ(0.5)(0)],
+                [_builtin_gates.RZ(0.75)(0)],
+            ),
+            (
+                [_builtin_gates.RZ(ALPHA)(1), _builtin_gates.RZ(2 * BETA)(1)],
+                [_builtin_gates.RZ(ALPHA + 2 * BETA)(1)],
+            ),
+            (
+                [_builtin_gates.XX(ALPHA)(0, 1), _builtin_gates.XX(-ALPHA)(0, 1)],
+                [],
+            ),
+            ([_builtin_gates.X(2), _builtin_gates.X(2)], []),
+            ([_builtin_gates.CNOT(0, 1), _builtin_gates.CNOT(0, 1)], []),
+            ([_builtin_gates.T(0), _builtin_gates.T.dagger(0)], []),
+            ([_builtin_gates.RZ(0.5)(0), _builtin_gates.RZ(0.5).dagger(0)], []),
+            ([_builtin_gates.S.dagger(0), _builtin_gates.S(0)], []),
+            ([SQRT_X_DEF()(0), SQRT_X_DEF().dagger(0)], []),
+            (
+                [
+                    _builtin_gates.RX(0.5).controlled(1)(0, 1),
+                    _builtin_gates.RX(0.5).controlled(1).dagger(0, 1),
+                ],
+                [],
+            ),
+            ([_builtin_gates.I(0), _builtin_gates.RY(0)(1)], []),
+            (
+                [
+                    _builtin_gates.RZ(ALPHA)(0),
+                    _builtin_gates.X(0),
+                    _builtin_gates.Y(0),
+                    _builtin_gates.Y(0),
+                    _builtin_gates.X(0),
+                    _builtin_gates.RZ(BETA)(0),
+                ],
+                [_builtin_gates.RZ(ALPHA + BETA)(0)],
+            ),
+        ],
+    )
+    def test_adjacent_operations_are_simplified(self, operations, expected_operations):
+        circuit = _circuit.Circuit(operations, n_qubits=3)
+
+        result = peephole_optimize(circuit)
+
+        assert result == PeepholeResult(
+            _circuit.Circuit(expected_operations, n_qubits=3),
+            len(operations) - len(expected_operations),
+        )
+
+    @pytest.mark.parametrize(
+        "operations",
+        [
+            [_builtin_gates.RZ(0.5)(0), _builtin_gates.RX(0.5)(0)],
+            [_builtin_gates.RZ(0.5)(0), _builtin_gates.RZ(0.5)(1)],
+            [_builtin_gates.CNOT(0, 1), _builtin_gates.CNOT(1, 0)],
+            [
+                _builtin_gates.X(0),
+                _builtin_gates.CNOT(0, 1),
+                _builtin_gates.X(0),
+            ],
+            [CUSTOM_RZ_DEF()(0), CUSTOM_RZ_DEF()(0)],
+            [_builtin_gates.S(0), _builtin_gates.S(0)],
+        ],
+    )
+    def test_operations_that_do_not_simplify_are_kept(self, operations):
+        circuit = _circuit.Circuit(operations)
+
+        assert peephole_optimize(circuit) == (circuit, 0)
+
+    def test_optimized_circuit_has_the_same_unitary(self):
+        rng = np.random.default_rng(42)
+        gates = [
+            lambda: _builtin_gates.RZ(rng.uniform(-np.pi, np.pi)),
+            lambda: _builtin_gates.RX(rng.uniform(-np.pi, np.pi)),
+            lambda: _builtin_gates.X,
+            lambda: _builtin_gates.T,
+            lambda: _builtin_gates.T.dagger,
+        ]
+        operations = []
+        for _ in range(200):
+            qubit = int(rng.integers(3))
+            if rng.random() < 0.2:
+                operations.append(_builtin_gates.CNOT(qubit, (qubit + 1) % 3))
+            else:
+                operations.append(gates[rng.integers(len(gates))]()(qubit))
+        circuit = _circuit.Circuit(operations)
+
+        optimized, n_removed = peephole_optimize(circuit)
+
+        assert n_removed > 0
+        assert len(optimized.operations) == len(operations) - n_removed
+        np.testing.assert_allclose(_unitary(optimized), _unitary(circuit), atol=1e-10)
+
+
+class TestExportingWithOptimization:
+    def test_program_is_exported_from_optimized_circuit(self):
+        circuit = _circuit.Circuit(
+            [
+                _builtin_gates.RZ(ALPHA)(0),
+                _builtin_gates.RZ(BETA)(0),
+                _builtin_gates.X(1),
+                _builtin_gates.X(1),
+            ]
+        )
+
+        program = export_to_pyquil(circuit, optimization_level=1)
+
+        assert program == export_to_pyquil(
+            _circuit.Circuit([_builtin_gates.RZ(ALPHA + BETA)(0)])
+        )
+
+    def test_circuit_is_exported_unchanged_by_default(self):
+        circuit = _circuit.Circuit([_builtin_gates.X(0), _builtin_gates.X(0)])
+
+        assert export_to_pyquil(circuit) == pyquil.Program(
+            pyquil.gates.X(0), pyquil.gates.X(0)
+        )
+
+    def test_number_of_removed_operations_is_reported(self):
+        circuit = _circuit.Circuit([_builtin_gates.X(0), _builtin_gates.X(0)])
+
+        with profile_conversions() as profile:
+            export_to_pyquil(circuit, optimization_level=1)
+            export_to_pyquil(circuit, optimization_level=1)
+
+        assert profile.counters["export.peephole.removed"] == 4
+        assert profile.stages["export.peephole"].calls == 2
+
+    def test_unknown_optimization_level_is_rejected(self):
+        with pytest.raises(ValueError):
+            export_to_pyquil(_circuit.Circuit(), optimization_level=2)
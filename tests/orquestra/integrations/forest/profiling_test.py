@@ -0,0 +1,109 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import json
+import threading
+
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit
+
+from orquestra.integrations.forest.conversions import (
+    CacheStats,
+    clear_expression_cache,
+    export_to_pyquil,
+    import_from_pyquil,
+    profile_conversions,
+)
+from orquestra.integrations.forest.conversions._profiling import (
+    _ACTIVE_PROFILE,
+    stage,
+)
+
+THETA = sympy.Symbol("theta")
+
+CIRCUIT = _circuit.Circuit(
+    [
+        _builtin_gates.RX(2 * THETA)(0),
+        _builtin_gates.RY(2 * THETA)(1),
+        _builtin_gates.XX(0.5)(0, 1),
+    ]
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_expression_cache()
+    yield
+    clear_expression_cache()
+
+
+class TestProfilingConversions:
+    def test_export_stages_are_recorded(self):
+        with profile_conversions() as profile:
+            export_to_pyquil(CIRCUIT)
+            export_to_pyquil(CIRCUIT)
+
+        for name in [
+            "export.declarations",
+            "export.gate_definitions",
+            "export.gates",
+            "export.program",
+        ]:
+            assert profile.stages[name].calls == 2
+            assert profile.stages[name].wall_time > 0
+        assert profile.stages["expression.export"].calls == 1
+
+    def test_import_stages_are_recorded(self):
+        program = export_to_pyquil(CIRCUIT)
+
+        with profile_conversions() as profile:
+            import_from_pyquil(program)
+
+        for name in ["import.gate_definitions", "import.gates", "import.circuit"]:
+            assert profile.stages[name].calls == 1
+        assert profile.stages["expression.import"].calls > 0
+
+    def test_cache_statistics_cover_only_conversions_within_context(self):
+        export_to_pyquil(CIRCUIT)
+
+        with profile_conversions() as profile:
+            export_to_pyquil(CIRCUIT)
+
+        assert profile.caches["export"] == CacheStats(hits=2, misses=0)
+        assert profile.caches["export"].hit_rate == 1.0
+        assert profile.caches["import"].hit_rate is None
+
+    def test_conversions_outside_of_context_are_not_recorded(self):
+        with profile_conversions() as profile:
+            pass
+
+        export_to_pyquil(CIRCUIT)
+
+        assert profile.stages == {}
+        assert _ACTIVE_PROFILE.get() is None
+
+    def test_stages_in_other_threads_are_not_recorded(self):
+        with profile_conversions() as profile:
+            thread = threading.Thread(target=export_to_pyquil, args=(CIRCUIT,))
+            thread.start()
+            thread.join()
+
+        assert profile.stages == {}
+
+    def test_stage_raising_exception_is_recorded(self):
+        with profile_conversions() as profile:
+            with pytest.raises(RuntimeError):
+                with stage("failing"):
+                    raise RuntimeError()
+
+        assert profile.stages["failing"].calls == 1
+
+    def test_profile_can_be_serialized_to_json(self):
+        with profile_conversions() as profile:
+            import_from_pyquil(export_to_pyquil(CIRCUIT))
+
+        report = json.loads(json.dumps(profile.as_dict()))
+
+        assert report["stages"]["export.gates"]["calls"] == 1
+        assert set(report["caches"]) == {"import", "export", "quil_text"}
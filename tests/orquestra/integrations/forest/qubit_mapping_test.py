@@ -0,0 +1,90 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import pyquil
+import pytest
+from orquestra.quantum.circuits import _builtin_gates, _circuit
+
+from orquestra.integrations.forest.conversions import (
+    CompactedCircuit,
+    QubitMapping,
+    compact_circuit,
+    expand_circuit,
+    export_to_pyquil,
+    import_from_pyquil,
+)
+
+LATTICE_PROGRAM = pyquil.Program(
+    pyquil.gates.X(100),
+    pyquil.gates.CNOT(100, 107),
+    pyquil.gates.RZ(0.5, 103).controlled(107),
+    pyquil.gates.MEASURE(100, None),
+)
+
+
+class TestQubitMapping:
+    def test_physical_qubits_are_mapped_in_ascending_order(self):
+        mapping = QubitMapping.from_physical_qubits([107, 100, 103, 100])
+
+        assert mapping.to_physical == (100, 103, 107)
+        assert mapping.to_dense == {100: 0, 103: 1, 107: 2}
+        assert mapping.n_qubits == 3
+
+
+class TestCompactingCircuits:
+    def test_qubits_are_renumbered_keeping_their_order(self):
+        circuit = _circuit.Circuit(
+            [_builtin_gates.X(5), _builtin_gates.CNOT(9, 5), _builtin_gates.Y(2)]
+        )
+
+        compacted, mapping = compact_circuit(circuit)
+
+        assert compacted == _circuit.Circuit(
+            [_builtin_gates.X(1), _builtin_gates.CNOT(2, 1), _builtin_gates.Y(0)]
+        )
+        assert mapping.to_physical == (2, 5, 9)
+
+    def test_expanding_compacted_circuit_restores_qubits(self):
+        circuit = _circuit.Circuit(
+            [_builtin_gates.RX(0.5).controlled(1)(12, 3), _builtin_gates.Z(7)]
+        )
+
+        assert expand_circuit(*compact_circuit(circuit)) == circuit
+
+    def test_circuit_without_operations_is_compacted_to_no_qubits(self):
+        compacted = compact_circuit(_circuit.Circuit([], n_qubits=4))
+
+        assert compacted.circuit.n_qubits == 0
+        assert compacted.qubit_mapping.to_physical == ()
+
+    def test_circuits_larger_than_mapping_are_not_expanded(self):
+        mapping = QubitMapping.from_physical_qubits([3, 4])
+
+        with pytest.raises(ValueError):
+            expand_circuit(_circuit.Circuit([_builtin_gates.X(2)]), mapping)
+
+
+class TestCompactingOnImportAndExport:
+    def test_imported_circuit_acts_only_on_used_qubits(self):
+        circuit, mapping = import_from_pyquil(
+            LATTICE_PROGRAM.copy(), compact_qubits=True
+        )
+
+        assert circuit.n_qubits == 3
+        assert mapping.to_physical == (100, 103, 107)
+        assert circuit.operations[1] == _builtin_gates.CNOT(0, 2)
+
+    def test_compacted_circuit_is_exported_to_physical_qubits(self):
+        program = LATTICE_PROGRAM.copy()
+        compacted = import_from_pyquil(program, compact_qubits=True)
+
+        exported = export_to_pyquil(
+            compacted.circuit, qubit_mapping=compacted.qubit_mapping
+        )
+
+        assert isinstance(compacted, CompactedCircuit)
+        assert exported == export_to_pyquil(import_from_pyquil(program))
+
+    def test_compacting_cannot_be_combined_with_lazy_import(self):
+        with pytest.raises(ValueError):
+            import_from_pyquil(LATTICE_PROGRAM, lazy=True, compact_qubits=True)
@@ -0,0 +1,109 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from orquestra.integrations.forest.conversions import (
+    import_from_pyquil,
+    import_from_quil_file,
+    iter_operations_from_quil_file,
+    write_quil,
+)
+
+THETA, GAMMA = sympy.symbols("theta, gamma")
+
+CUSTOM_PARAMETRIC_DEF = _gates.CustomGateDefinition(
+    "CUSTOM-PARAMETRIC",
+    sympy.Matrix(
+        [
+            [sympy.cos(GAMMA), sympy.sin(GAMMA)],
+            [-sympy.sin(GAMMA), sympy.cos(GAMMA)],
+        ]
+    ),
+    (GAMMA,),
+)
+
+CIRCUIT = _circuit.Circuit(
+    [
+        _builtin_gates.X(2),
+        _builtin_gates.RX(THETA)(0),
+        CUSTOM_PARAMETRIC_DEF(2 * THETA)(1),
+        _builtin_gates.XX(np.pi / 2)(0, 3),
+        _builtin_gates.RX(0.5).dagger.controlled(2)(3, 1, 2),
+        _builtin_gates.CNOT(1, 0),
+        CUSTOM_PARAMETRIC_DEF(0.1)(4),
+    ]
+)
+
+QUIL_WITH_OTHER_INSTRUCTIONS = """# Comment preceding the program
+DECLARE ro BIT[2]
+DECLARE theta REAL[1]
+DEFGATE SQRT-X AS MATRIX:
+    0.5+0.5i, 0.5-0.5i
+    0.5-0.5i, 0.5+0.5i
+
+X 0
+SQRT-X 1
+
+RX(%theta) 1
+PRAGMA INITIAL_REWIRING "NAIVE"
+MEASURE 0 ro[0]
+CONTROLLED SQRT-X 0 1
+"""
+
+
+@pytest.fixture
+def quil_file(tmp_path):
+    path = tmp_path / "circuit.quil"
+    write_quil(CIRCUIT, path)
+    return path
+
+
+class TestImportingFromQuilFile:
+    @pytest.mark.parametrize("batch_size", [1, 2, 1000])
+    def test_imported_circuit_is_the_same_as_exported_one(self, quil_file, batch_size):
+        assert import_from_quil_file(quil_file, batch_size) == CIRCUIT
+
+    def test_operations_are_yielded_lazily_in_order(self, quil_file):
+        operations = iter_operations_from_quil_file(quil_file, batch_size=1)
+
+        assert next(operations) == CIRCUIT.operations[0]
+        assert list(operations) == CIRCUIT.operations[1:]
+
+    @pytest.mark.parametrize("batch_size", [1, 3, 1000])
+    def test_importing_file_gives_the_same_circuit_as_importing_program(
+        self, tmp_path, batch_size
+    ):
+        path = tmp_path / "program.quil"
+        path.write_text(QUIL_WITH_OTHER_INSTRUCTIONS)
+
+        imported = import_from_quil_file(path, batch_size)
+
+        assert imported == import_from_pyquil(
+            pyquil.Program(QUIL_WITH_OTHER_INSTRUCTIONS)
+        )
+
+    def test_importing_empty_file_gives_empty_circuit(self, tmp_path):
+        path = tmp_path / "empty.quil"
+        path.write_text("")
+
+        assert import_from_quil_file(path) == _circuit.Circuit()
+
+    def test_non_unique_gate_definitions_raise_error(self, tmp_path):
+        path = tmp_path / "program.quil"
+        path.write_text(
+            "DEFGATE A AS MATRIX:\n    1, 0\n    0, 1\n"
+            "DEFGATE A AS MATRIX:\n    0, 1\n    1, 0\n"
+            "A 0\n"
+        )
+
+        with pytest.raises(ValueError):
+            import_from_quil_file(path)
+
+    def test_non_positive_batch_size_is_rejected(self, quil_file):
+        with pytest.raises(ValueError):
+            iter_operations_from_quil_file(quil_file, batch_size=0)
@@ -0,0 +1,112 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import io
+
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+
+from orquestra.integrations.forest.conversions import (
+    export_to_pyquil,
+    export_to_quil_string,
+    write_quil,
+)
+
+THETA, GAMMA = sympy.symbols("theta, gamma")
+
+SQRT_X_DEF = _gates.CustomGateDefinition(
+    "SQRT-X",
+    sympy.Matrix([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]]),
+    tuple(),
+)
+
+CUSTOM_PARAMETRIC_DEF = _gates.CustomGateDefinition(
+    "CUSTOM-PARAMETRIC",
+    sympy.Matrix(
+        [
+            [sympy.cos(GAMMA), sympy.sin(GAMMA)],
+            [-sympy.sin(GAMMA), sympy.exp(sympy.I * GAMMA)],
+        ]
+    ),
+    (GAMMA,),
+)
+
+CIRCUITS = [
+    _circuit.Circuit([], 0),
+    _circuit.Circuit([_builtin_gates.X(2), _builtin_gates.Y(0)]),
+    _circuit.Circuit([_builtin_gates.RX(np.pi)(1), _builtin_gates.CNOT(3, 1)]),
+    _circuit.Circuit([_builtin_gates.RX(0.5).dagger.controlled(2)(3, 1, 2)]),
+    _circuit.Circuit([_builtin_gates.RX(0.5).controlled(2).dagger(3, 1, 2)]),
+    _circuit.Circuit([SQRT_X_DEF()(3), _builtin_gates.XX(np.pi)(2, 0)]),
+    _circuit.Circuit([_builtin_gates.U3(np.pi / 2, np.pi / 4, 0).controlled(1)(2, 3)]),
+    _circuit.Circuit([_builtin_gates.RX(THETA * GAMMA)(1)]),
+    _circuit.Circuit(
+        [
+            _builtin_gates.RZ(2 * THETA + 1)(1),
+            _builtin_gates.RY(THETA / 3)(0),
+            _builtin_gates.RX(THETA - GAMMA)(2),
+            _builtin_gates.RX(-THETA)(0),
+            _builtin_gates.RX(sympy.sqrt(THETA) * GAMMA * 2.5)(0),
+            _builtin_gates.PHASE(3 * np.pi / 4)(0),
+            _builtin_gates.CPHASE(1e-20)(0, 1),
+            _builtin_gates.XY(sympy.Rational(1, 3))(0, 1),
+            _builtin_gates.RX(2)(0),
+        ]
+    ),
+    _circuit.Circuit(
+        [
+            CUSTOM_PARAMETRIC_DEF(THETA**2)(0),
+            SQRT_X_DEF()(1),
+            _builtin_gates.ZZ(GAMMA).controlled(1)(0, 2, 1),
+            _builtin_gates.U3(THETA, 0.1, GAMMA).dagger(3),
+            _builtin_gates.SWAP.controlled(2)(4, 3, 0, 1),
+        ]
+    ),
+]
+
+
+def _gates_of(program):
+    return [
+        instr for instr in program.instructions if isinstance(instr, pyquil.gates.Gate)
+    ]
+
+
+@pytest.mark.parametrize("circuit", CIRCUITS)
+class TestExportingToQuilString:
+    def test_quil_string_is_the_same_as_output_of_exported_program(self, circuit):
+        assert export_to_quil_string(circuit) == export_to_pyquil(circuit).out()
+
+    def test_parsing_quil_string_gives_the_same_instructions(self, circuit):
+        # Complex numbers in DEFGATE matrices are parsed back as equivalent
+        # expressions, hence only gates and declarations are compared.
+        program = pyquil.Program(export_to_quil_string(circuit))
+        exported = export_to_pyquil(circuit)
+
+        assert _gates_of(program) == _gates_of(exported)
+        assert program.declarations == exported.declarations
+
+    def test_writing_quil_to_file_object_writes_quil_string(self, circuit):
+        buffer = io.StringIO()
+
+        write_quil(circuit, buffer)
+
+        assert buffer.getvalue() == export_to_quil_string(circuit)
+
+    def test_writing_quil_to_path_writes_quil_string(self, circuit, tmp_path):
+        path = tmp_path / "circuit.quil"
+
+        write_quil(circuit, path)
+
+        assert path.read_text() == export_to_quil_string(circuit)
+
+
+def test_exporting_gate_without_definition_raises_error():
+    gate = _gates.MatrixFactoryGate(
+        "UNKNOWN", lambda: sympy.Matrix([[1, 0], [0, 1]]), (), 1
+    )
+
+    with pytest.raises(ValueError):
+        export_to_quil_string(_circuit.Circuit([gate(0)]))
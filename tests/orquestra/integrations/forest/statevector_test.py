@@ -0,0 +1,172 @@
+################################################################################
+# © Copyright 2022 Zapata Computing Inc.
+################################################################################
+import numpy as np
+import pyquil
+import pytest
+import sympy
+from orquestra.quantum.circuits import _builtin_gates, _circuit, _gates
+from pyquil import gates as pyquil_gates
+from pyquil.simulation import ReferenceWavefunctionSimulator
+
+from orquestra.integrations.forest.conversions import export_to_pyquil
+from orquestra.integrations.forest.simulation import (
+    simulate_wavefunction,
+    simulate_wavefunctions,
+)
+
+THETA, GAMMA = sympy.symbols("theta, gamma")
+
+SQRT_X_DEF = _gates.CustomGateDefinition(
+    "SQRT-X",
+    sympy.Matrix([[0.5 + 0.5j, 0.5 - 0.5j], [0.5 - 0.5j, 0.5 + 0.5j]]),
+    tuple(),
+)
+
+CUSTOM_PARAMETRIC_DEF = _gates.CustomGateDefinition(
+    "CUSTOM-PARAMETRIC",
+    sympy.Matrix(
+        [
+            [sympy.cos(GAMMA), sympy.sin(GAMMA)],
+            [-sympy.sin(GAMMA), sympy.cos(GAMMA)],
+        ]
+    ),
+    (GAMMA,),
+)
+
+PARAMETRIC_CIRCUIT = _circuit.Circuit(
+    [
+        _builtin_gates.RY(THETA)(0),
+        _builtin_gates.RX(2 * THETA + 1).controlled(1)(0, 2),
+        CUSTOM_PARAMETRIC_DEF(sympy.sin(THETA))(1),
+        SQRT_X_DEF()(2),
+        _builtin_gates.U3(THETA, 0.1, 0.2)(1),
+        _builtin_gates.XY(THETA).dagger(2, 0),
+    ]
+)
+
+
+def _reference_wavefunction(program, n_qubits):
+    return ReferenceWavefunctionSimulator(n_qubits).do_program(program).wf
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize(
+    "program",
+    [
+        pyquil.Program(pyquil_gates.X(0), pyquil_gates.CNOT(0, 2)),
+        pyquil.Program(
+            pyquil_gates.RY(0.3, 1),
+            pyquil_gates.CNOT(1, 2),
+            pyquil_gates.RZ(0.7, 2).controlled(0),
+            pyquil_gates.PHASE(0.2, 1).dagger(),
+            pyquil_gates.SWAP(0, 2),
+            pyquil_gates.XY(0.4, 0, 1),
+        ),
+        pyquil.Program(
+            pyquil_gates.RX(0.5, 3).controlled(1).dagger().controlled(0),
+            pyquil_gates.CPHASE(1.2, 3, 0),
+            pyquil_gates.ISWAP(1, 2),
+        ),
+    ],
+)
+def test_wavefunction_is_the_same_as_of_reference_simulator(program):
+    n_qubits = max(program.get_qubit_indices()) + 1
+
+    np.testing.assert_allclose(
+        simulate_wavefunction(program),
+        _reference_wavefunction(program, n_qubits),
+        atol=1e-12,
+    )
+
+
+class TestSimulatingExportedPrograms:
+    @pytest.mark.parametrize("theta", [0.0, 0.3, -1.7])
+    def test_memory_map_binds_symbols_of_exported_circuit(self, theta):
+        program = export_to_pyquil(PARAMETRIC_CIRCUIT)
+        bound_program = export_to_pyquil(PARAMETRIC_CIRCUIT.bind({THETA: theta}))
+
+        np.testing.assert_allclose(
+            simulate_wavefunction(program, {"theta": [theta]}),
+            simulate_wavefunction(bound_program),
+            atol=1e-12,
+        )
+
+    def test_batch_of_parameter_sets_is_simulated_at_once(self):
+        program = export_to_pyquil(PARAMETRIC_CIRCUIT)
+        thetas = [0.1, 0.2, 0.7, 0.1]
+
+        wavefunctions = simulate_wavefunctions(
+            program, [{"theta": [theta]} for theta in thetas]
+        )
+
+        assert wavefunctions.shape == (4, 8)
+        for wavefunction, theta in zip(wavefunctions, thetas):
+            np.testing.assert_allclose(
+                wavefunction, simulate_wavefunction(program, {"theta": [theta]})
+            )
+
+    def test_wavefunctions_are_normalized(self):
+        wavefunctions = simulate_wavefunctions(
+            export_to_pyquil(PARAMETRIC_CIRCUIT),
+            [{"theta": [theta]} for theta in np.linspace(0, np.pi, 5)],
+        )
+
+        np.testing.assert_allclose(np.linalg.norm(wavefunctions, axis=1), 1.0)
+
+    @pytest.mark.parametrize(
+        "program",
+        [
+            pyquil.Program(pyquil_gates.X(0), pyquil_gates.CNOT(0, 2)),
+            export_to_pyquil(PARAMETRIC_CIRCUIT),
+        ],
+    )
+    def test_empty_batch_gives_no_wavefunctions(self, program):
+        wavefunctions = simulate_wavefunctions(program, [])
+
+        assert wavefunctions.shape == (0, 8)
+
+
+class TestMemory:
+    def test_gates_can_refer_to_elements_of_memory_regions(self):
+        program = pyquil.Program(
+            "DECLARE angles REAL[2]\nRX(angles[1]) 0\nRY(2*angles[0]) 1"
+        )
+
+        np.testing.assert_allclose(
+            simulate_wavefunction(program, {"angles": [0.25, 0.5]}),
+            simulate_wavefunction(
+                pyquil.Program(pyquil_gates.RX(0.5, 0), pyquil_gates.RY(0.5, 1))
+            ),
+        )
+
+    def test_missing_memory_region_raises_error(self):
+        program = pyquil.Program("DECLARE theta REAL[1]\nRX(theta[0]) 0")
+
+        with pytest.raises(ValueError):
+            simulate_wavefunction(program, {"gamma": [0.5]})
+
+
+class TestNumberOfQubits:
+    def test_wavefunction_can_include_idle_qubits(self):
+        wavefunction = simulate_wavefunction(
+            pyquil.Program(pyquil_gates.X(0)), n_qubits=3
+        )
+
+        np.testing.assert_array_equal(wavefunction, [0, 1, 0, 0, 0, 0, 0, 0])
+
+    def test_too_few_qubits_are_rejected(self):
+        with pytest.raises(ValueError):
+            simulate_wavefunction(pyquil.Program(pyquil_gates.X(2)), n_qubits=2)
+
+
+@pytest.mark.parametrize(
+    "program",
+    [
+        pyquil.Program(pyquil_gates.X(0), pyquil_gates.MEASURE(0, None)),
+        pyquil.Program(pyquil_gates.RX(0.5, 0).forked(1, [0.25])),
+    ],
+)
+def test_unsupported_instructions_are_rejected(program):
+    with pytest.raises(NotImplementedError):
+        simulate_wavefunction(program)